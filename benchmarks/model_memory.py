@@ -0,0 +1,79 @@
+"""Memory benchmark of the model dataclasses against their compact variants.
+
+Usage:
+    python benchmarks/model_memory.py [--count 100000]
+
+Prints one JSON document with the bytes allocated per instance for every representation.
+"""
+import argparse
+import json
+import tracemalloc
+
+from pypas.model.compact import slotted, struct
+from pypas.model.safe import Safe, SafeCreator
+from pypas.model.safe_member import SafeMemberPermissions
+
+
+def build_safes(safe_class, creator_class, count: int) -> list:
+    return [
+        safe_class(
+            f"safe{number}",
+            f"safe{number}",
+            number,
+            "description",
+            "\\",
+            creator_class("1", "Administrator"),
+            False,
+            "PasswordManager",
+            None,
+            7,
+            False,
+            1700000000,
+            1700000000,
+            [],
+            False,
+        )
+        for number in range(count)
+    ]
+
+
+def build_permissions(permissions_class, count: int) -> list:
+    return [permissions_class(*(bool(number >> bit & 1) for bit in range(22))) for number in range(count)]
+
+
+def measure(build, count: int) -> float:
+    tracemalloc.start()
+    try:
+        objects = build(count)
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return allocated / count
+
+
+def run(count: int) -> dict:
+    results = {
+        "Safe/dataclass": measure(lambda n: build_safes(Safe, SafeCreator, n), count),
+        "Safe/slotted": measure(lambda n: build_safes(slotted(Safe), slotted(SafeCreator), n), count),
+        "SafeMemberPermissions/dataclass": measure(lambda n: build_permissions(SafeMemberPermissions, n), count),
+        "SafeMemberPermissions/slotted": measure(lambda n: build_permissions(slotted(SafeMemberPermissions), n), count),
+        "SafeMemberPermissions/bitmask": measure(
+            lambda n: [permissions.to_bitmask() for permissions in build_permissions(SafeMemberPermissions, n)],
+            count,
+        ),
+    }
+    try:
+        results["Safe/struct"] = measure(lambda n: build_safes(struct(Safe), struct(SafeCreator), n), count)
+        results["SafeMemberPermissions/struct"] = measure(
+            lambda n: build_permissions(struct(SafeMemberPermissions), n), count
+        )
+    except ImportError:
+        pass
+    return {"count": count, "bytes_per_instance": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    print(json.dumps(run(parser.parse_args().count), indent=2))
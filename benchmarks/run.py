@@ -0,0 +1,246 @@
+"""Offline performance benchmarks of pypas against the local mock PVWA and AIMWebService.
+
+Usage:
+    python benchmarks/run.py [--scenario NAME ...] [--latency 0.001] [--error-rate 0] [--payload-size 0]
+                             [--output results.json]
+
+Scenarios:
+    get_credential  Credential lookups from concurrent threads.
+    safes_list      Listing all safes of a vault with 10k safes.
+    logon_storm     Concurrent requests hitting an expired session token.
+    cert_auth       Credential lookups authenticated with a client certificate, requires openssl.
+    member_audit    Streaming the members of all safes of a vault with 10k safes to an NDJSON file.
+
+Prints one JSON document with the p50/p99 request latency, the requests per second and the peak RSS of every
+scenario, so results can be compared between pypas versions.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import platform
+import shutil
+import ssl
+import subprocess  # nosec B404 - generates a throwaway certificate with the openssl CLI
+import sys
+import tempfile
+import threading
+import time
+
+import pypas
+from pypas.audit import write_audit
+from pypas.central_credential_provider import CentralCredentialProvider
+from pypas.instrumentation import Hooks, RequestTiming
+from pypas.resilience import RetryPolicy
+from pypas.testing import MockServer, MockServerConfig
+from pypas.token_manager import TokenManager
+from pypas.vault import Vault
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+class LatencyRecorder(Hooks):
+    """Records the total time of every request."""
+
+    enabled = True
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def on_request(self, timing: RequestTiming):
+        with self._lock:
+            self.latencies.append(timing.total)
+            if timing.error is not None or (timing.status or 0) >= 500:
+                self.errors += 1
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Get a percentile of the values using the nearest-rank method."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def peak_rss_kb() -> int:
+    """Get the peak resident set size of the process in kilobytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def report(name: str, recorder: LatencyRecorder, elapsed: float, **extra) -> dict:
+    return {
+        "scenario": name,
+        "requests": len(recorder.latencies),
+        "errors": recorder.errors,
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(recorder.latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(recorder.latencies, 0.50) * 1000,
+        "p99_ms": percentile(recorder.latencies, 0.99) * 1000,
+        "peak_rss_kb": peak_rss_kb(),
+        **extra,
+    }
+
+
+def retry_policy() -> RetryPolicy:
+    return RetryPolicy(backoff_factor=0.01, failure_threshold=1_000_000)
+
+
+def get_credential(config: MockServerConfig, requests: int, threads: int) -> dict:
+    recorder = LatencyRecorder()
+    with MockServer(config) as server, CentralCredentialProvider(
+        server.url, hooks=recorder, retry=retry_policy()
+    ) as ccp:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(
+                executor.map(
+                    lambda number: ccp.credentials.get_credential("app", "safe", object=str(number)), range(requests)
+                )
+            )
+        elapsed = time.perf_counter() - started
+    return report("get_credential", recorder, elapsed, threads=threads)
+
+
+def safes_list(config: MockServerConfig, safes: int, page_size: int) -> dict:
+    recorder = LatencyRecorder()
+    config = MockServerConfig(**{**vars(config), "number_of_safes": safes})
+    with MockServer(config) as server, Vault(server.url, hooks=recorder, retry=retry_policy()) as vault:
+        started = time.perf_counter()
+        count = sum(1 for _ in vault.Safes.iter_safes(page_size=page_size, prefetch=True))
+        elapsed = time.perf_counter() - started
+    return report("safes_list", recorder, elapsed, safes=count, page_size=page_size)
+
+
+def logon_storm(config: MockServerConfig, rounds: int, threads: int) -> dict:
+    recorder = LatencyRecorder()
+    now = [0.0]
+    token_manager = TokenManager(session_timeout=1200, clock=lambda: now[0])
+    config = MockServerConfig(**{**vars(config), "require_auth": True})
+    with MockServer(config) as server, Vault(
+        server.url, token_manager=token_manager, hooks=recorder, retry=retry_policy()
+    ) as vault:
+        vault.Authentication.logon("user", "password")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            for _ in range(rounds):
+                now[0] += 1200
+                list(executor.map(lambda number: vault.Safes.get(f"safe{number % 10}"), range(threads)))
+        elapsed = time.perf_counter() - started
+        logons = server.logons
+    return report("logon_storm", recorder, elapsed, threads=threads, rounds=rounds, logons=logons)
+
+
+def _self_signed(directory: str, name: str):
+    certificate_path = os.path.join(directory, f"{name}.pem")
+    key_path = os.path.join(directory, f"{name}.key")
+    subprocess.run(  # nosec B603 B607 - fixed arguments
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-subj", "/CN=localhost", "-days", "1"]
+        + ["-keyout", key_path, "-out", certificate_path],
+        check=True,
+        capture_output=True,
+    )
+    return certificate_path, key_path
+
+
+def cert_auth(config: MockServerConfig, requests: int, threads: int) -> dict:
+    if shutil.which("openssl") is None:
+        return {"scenario": "cert_auth", "skipped": "openssl is not available"}
+    recorder = LatencyRecorder()
+    with tempfile.TemporaryDirectory() as directory:
+        server_certificate, server_key = _self_signed(directory, "server")
+        client_certificate, client_key = _self_signed(directory, "client")
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(server_certificate, server_key)
+        context.load_verify_locations(client_certificate)
+        context.verify_mode = ssl.CERT_REQUIRED
+
+        with MockServer(config, ssl_context=context) as server, CentralCredentialProvider(
+            server.url, ccp_verify_requests=False, hooks=recorder, retry=retry_policy()
+        ) as ccp:
+
+            def lookup(number: int):
+                return ccp.credentials.get_credential(
+                    "app",
+                    "safe",
+                    object=str(number),
+                    certificate_path=client_certificate,
+                    certificate_key_path=client_key,
+                )
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(threads) as executor:
+                list(executor.map(lookup, range(requests)))
+            elapsed = time.perf_counter() - started
+    return report("cert_auth", recorder, elapsed, threads=threads)
+
+
+def member_audit(config: MockServerConfig, safes: int, threads: int) -> dict:
+    recorder = LatencyRecorder()
+    config = MockServerConfig(**{**vars(config), "number_of_safes": safes, "members_per_safe": 10})
+    with tempfile.TemporaryDirectory() as directory, MockServer(config) as server, Vault(
+        server.url, hooks=recorder, retry=retry_policy()
+    ) as vault:
+        started = time.perf_counter()
+        rows = write_audit(vault, os.path.join(directory, "audit.ndjson"), max_concurrency=threads)
+        elapsed = time.perf_counter() - started
+    return report("member_audit", recorder, elapsed, safes=safes, rows=rows, threads=threads)
+
+
+def run(scenarios: list, config: MockServerConfig, requests: int, threads: int, safes: int) -> dict:
+    benchmarks = {
+        "get_credential": lambda: get_credential(config, requests, threads),
+        "safes_list": lambda: safes_list(config, safes, page_size=100),
+        "logon_storm": lambda: logon_storm(config, rounds=max(1, requests // threads), threads=threads),
+        "cert_auth": lambda: cert_auth(config, requests, threads),
+        "member_audit": lambda: member_audit(config, safes, threads),
+    }
+    return {
+        "pypas": pypas.__version__,
+        "python": platform.python_version(),
+        "config": vars(config),
+        "scenarios": [benchmarks[name]() for name in scenarios],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["get_credential", "safes_list", "logon_storm", "cert_auth", "member_audit"],
+    )
+    parser.add_argument("--latency", type=float, default=0.001, help="Server latency per request in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--payload-size", type=int, default=0, help="Padding characters per safe and credential.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--safes", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Write the results to a file instead of stdout.")
+    arguments = parser.parse_args()
+
+    results = run(
+        arguments.scenario or ["get_credential", "safes_list", "logon_storm", "cert_auth", "member_audit"],
+        MockServerConfig(
+            latency=arguments.latency,
+            error_rate=arguments.error_rate,
+            payload_size=arguments.payload_size,
+            seed=arguments.seed,
+        ),
+        arguments.requests,
+        arguments.threads,
+        arguments.safes,
+    )
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
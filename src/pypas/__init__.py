@@ -2,7 +2,83 @@
 #   Copyright (c) Microsoft Corporation. All rights reserved.
 #   Licensed under the MIT License. See LICENSE in project root for information.
 #   -------------------------------------------------------------
-"""Python wrapper for CyberArk Core PAS REST-API"""
+"""Python wrapper for CyberArk Core PAS REST-API
+
+The clients and models are importable from the package, the modules defining them are only
+imported on first access, so ``import pypas`` stays cheap for short-lived processes.
+"""
 from __future__ import annotations
 
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 __version__ = "0.0.2"
+
+_EXPORTS = {
+    "Vault": "pypas.vault",
+    "AsyncVault": "pypas.vault",
+    "CentralCredentialProvider": "pypas.central_credential_provider",
+    "AsyncCentralCredentialProvider": "pypas.central_credential_provider",
+    "CredentialCache": "pypas.cache",
+    "PersistentCredentialCache": "pypas.cache",
+    "PoolConfig": "pypas.transport",
+    "RetryPolicy": "pypas.resilience",
+    "Throttle": "pypas.throttle",
+    "Hooks": "pypas.instrumentation",
+    "Credential": "pypas.model.credential",
+    "Group": "pypas.model.group",
+    "Safe": "pypas.model.safe",
+    "SafeMember": "pypas.model.safe_member",
+    "SafeMemberPermissions": "pypas.model.safe_member",
+    "SafeMemberType": "pypas.model.safe_member",
+    "User": "pypas.model.user",
+}
+
+__all__ = [
+    "__version__",
+    "Vault",
+    "AsyncVault",
+    "CentralCredentialProvider",
+    "AsyncCentralCredentialProvider",
+    "CredentialCache",
+    "PersistentCredentialCache",
+    "PoolConfig",
+    "RetryPolicy",
+    "Throttle",
+    "Hooks",
+    "Credential",
+    "Group",
+    "Safe",
+    "SafeMember",
+    "SafeMemberPermissions",
+    "SafeMemberType",
+    "User",
+]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pypas.cache import CredentialCache, PersistentCredentialCache
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider, CentralCredentialProvider
+    from pypas.instrumentation import Hooks
+    from pypas.model.credential import Credential
+    from pypas.model.group import Group
+    from pypas.model.safe import Safe
+    from pypas.model.safe_member import SafeMember, SafeMemberPermissions, SafeMemberType
+    from pypas.model.user import User
+    from pypas.resilience import RetryPolicy
+    from pypas.throttle import Throttle
+    from pypas.transport import PoolConfig
+    from pypas.vault import AsyncVault, Vault
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,4 @@
+"""Entry point of ``python -m pypas``."""
+from pypas.cli import main
+
+main()
@@ -0,0 +1,255 @@
+"""Local credential agent serving CCP lookups to other processes over a Unix domain socket.
+
+The agent owns one ``AsyncCentralCredentialProvider`` with a shared cache. Processes on the same host
+send their lookups to the agent instead of the CCP, so every secret is fetched upstream once per TTL,
+no matter how many processes need it.
+
+The protocol is newline-delimited JSON. A request is an object of the arguments of
+``Credentials.get_credential``, the response is either ``{"credential": {...}}`` or
+``{"error": {"type": ..., "message": ..., "status_code": ...}}``.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict
+from typing import Iterable, List, Optional, Union
+import asyncio
+import inspect
+import json
+import logging
+import os
+import queue
+import socket
+
+import httpx
+
+from pypas.api.central_credential_provider_api import CredentialQuery, _cache_key, _credential_params
+from pypas.cache import CredentialCache
+from pypas.central_credential_provider import AsyncCentralCredentialProvider
+from pypas.model.credential import Credential
+from pypas.singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+_LIMIT = 1024 * 1024
+_QUERY_FIELDS = set(inspect.signature(_credential_params).parameters)
+
+
+class AgentError(Exception):
+    """Raised by an agent client when the agent failed to get a credential."""
+
+    def __init__(self, message: str, type: str = None, status_code: int = None):
+        super().__init__(message)
+        self.type = type
+        self.status_code = status_code
+
+
+def _error(ex: Exception) -> dict:
+    status_code = ex.response.status_code if isinstance(ex, httpx.HTTPStatusError) else None
+    return {"error": {"type": type(ex).__name__, "message": str(ex), "status_code": status_code}}
+
+
+def _credential(response: dict) -> Credential:
+    if "error" in response:
+        raise AgentError(**response["error"])
+    return Credential(**response["credential"])
+
+
+class CredentialAgent:
+    """
+    Asyncio server answering credential lookups over a Unix domain socket.
+
+    Concurrent identical lookups are coalesced into one upstream request. The credentials of the
+    prefetch list are fetched on start and refreshed every ``prefetch_interval`` seconds, so they
+    are always served from the cache.
+
+    Args:
+        ccp (AsyncCentralCredentialProvider): The CCP client, a ``CredentialCache`` is added if it has none.
+        socket_path (str): The path of the Unix domain socket.
+        prefetch (Iterable[Union[CredentialQuery, dict]]): The lookups to keep in the cache.
+        prefetch_interval (float): The seconds between refreshes of the prefetch list, defaults to 80% of the cache TTL.
+        socket_mode (int): The file mode of the socket, by default only the owner may connect.
+    """
+
+    def __init__(
+        self,
+        ccp: AsyncCentralCredentialProvider,
+        socket_path: str,
+        prefetch: Iterable[Union[CredentialQuery, dict]] = (),
+        prefetch_interval: float = None,
+        socket_mode: int = 0o600,
+    ):
+        if ccp.cache is None:
+            ccp.cache = CredentialCache()
+        self.ccp = ccp
+        self.socket_path = socket_path
+        self.prefetch = [query if isinstance(query, dict) else asdict(query) for query in prefetch]
+        self.prefetch_interval = prefetch_interval or ccp.cache.ttl * 0.8
+        self.socket_mode = socket_mode
+        self._flight = AsyncSingleFlight()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._prefetcher: Optional[asyncio.Task] = None
+
+    async def get_credential(self, refresh: bool = False, **kwargs) -> Credential:
+        """Get a credential, joining an identical lookup in flight."""
+        key = tuple(sorted((name, value) for name, value in kwargs.items() if value is not None))
+        return await self._flight.do(key, lambda: self._fetch(refresh, **kwargs))
+
+    async def _fetch(self, refresh: bool, **kwargs) -> Credential:
+        if refresh:
+            params = _credential_params(**{name: value for name, value in kwargs.items() if name in _QUERY_FIELDS})
+            self.ccp.cache.invalidate(_cache_key(self.ccp, params, kwargs.get("certificate_path")))
+        return await self.ccp.credentials.get_credential(**kwargs)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = {"credential": asdict(await self.get_credential(**json.loads(line)))}
+                except Exception as ex:
+                    response = _error(ex)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _prefetch(self):
+        while True:
+            for query in self.prefetch:
+                try:
+                    await self.get_credential(refresh=True, **query)
+                except Exception:
+                    logger.exception("Prefetching %s failed", query)
+            await asyncio.sleep(self.prefetch_interval)
+
+    async def start(self):
+        """Start listening on the socket and prefetching."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # The socket is created owner-only and widened to the configured mode afterwards, never the reverse.
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path, limit=_LIMIT)
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, self.socket_mode)
+        if self.prefetch:
+            self._prefetcher = asyncio.ensure_future(self._prefetch())
+
+    async def stop(self):
+        """Stop serving, remove the socket and close the CCP client."""
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+            self._prefetcher = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        await self.ccp.close()
+
+    async def serve_forever(self):
+        """Serve until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+
+class AgentClient:
+    """
+    Thread-safe client of a ``CredentialAgent``.
+
+    Connections to the agent are pooled, every thread with a lookup in flight uses its own connection.
+
+    Args:
+        socket_path (str): The path of the agent's Unix domain socket.
+        timeout (float): The seconds to wait for a response.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[socket.socket]" = queue.LifoQueue()
+
+    @contextmanager
+    def _connection(self):
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            connection.connect(self.socket_path)
+        try:
+            yield connection
+        except BaseException:
+            connection.close()
+            raise
+        self._idle.put(connection)
+
+    def get_credential(self, **kwargs) -> Credential:
+        """Get a credential from the agent, see ``Credentials.get_credential`` for the arguments."""
+        with self._connection() as connection:
+            connection.sendall(json.dumps(kwargs).encode() + b"\n")
+            buffer = b""
+            while not buffer.endswith(b"\n"):
+                chunk = connection.recv(65536)
+                if not chunk:
+                    raise ConnectionError("The agent closed the connection.")
+                buffer += chunk
+        return _credential(json.loads(buffer))
+
+    def close(self):
+        """Close all pooled connections to the agent."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class AsyncAgentClient:
+    """
+    Client of a ``CredentialAgent`` for asyncio applications.
+
+    Args:
+        socket_path (str): The path of the agent's Unix domain socket.
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self._idle: List[tuple] = []
+
+    @asynccontextmanager
+    async def _connection(self):
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=_LIMIT)
+        try:
+            yield reader, writer
+        except BaseException:
+            writer.close()
+            raise
+        self._idle.append((reader, writer))
+
+    async def get_credential(self, **kwargs) -> Credential:
+        """Get a credential from the agent, see ``Credentials.get_credential`` for the arguments."""
+        async with self._connection() as (reader, writer):
+            writer.write(json.dumps(kwargs).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("The agent closed the connection.")
+        return _credential(json.loads(line))
+
+    async def close(self):
+        """Close all pooled connections to the agent."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
@@ -1,5 +1,6 @@
 from enum import Enum
 
+from pypas.decoding import decode
 from pypas.utils import remove_none_values_from_dict
 
 
@@ -12,6 +13,26 @@ class AuthMethod(Enum):
     RADIUS = 4
 
 
+def _logon_request(
+    base_url: str,
+    username: str,
+    password: str,
+    new_password: str = None,
+    auth_method: AuthMethod = AuthMethod.CyberArk,
+    concurrent_session: bool = True,
+):
+    request_url = f"{base_url}PasswordVault/api/auth/{auth_method.name}/Logon/"
+
+    data = {
+        "username": username,
+        "password": password,
+        "newPassword": new_password,
+        "concurrentSession": concurrent_session,
+    }
+
+    return request_url, remove_none_values_from_dict(data)
+
+
 class Authentication:
     """Authentication API endpoint"""
 
@@ -29,21 +50,65 @@ class Authentication:
         """Logon to the vault.
         Relevant CyberArk Documentation:
         https://docs.cyberark.com/PAS/12.6/en/Content/SDK/CyberArk%20Authentication%20-%20Logon_v10.htm
+
+        The returned session token is stored on the vault's token manager and sent with every
+        subsequent request. The token is renewed with the same credentials before it times out.
         """
 
-        request_url = f"{self.vault.base_url}PasswordVault/api/auth/{auth_method}/Logon/"
+        def relogon() -> str:
+            return self._logon(username, new_password or password, None, auth_method, concurrent_session)
+
+        token = self._logon(username, password, new_password, auth_method, concurrent_session)
+        self.vault.token_manager.configure(relogon, token)
+
+        return token
+
+    def _logon(self, username, password, new_password, auth_method, concurrent_session) -> str:
+        request_url, data = _logon_request(
+            self.vault.base_url, username, password, new_password, auth_method, concurrent_session
+        )
+
+        response = self.vault.request(
+            "POST", request_url, body=data, authenticate=False, endpoint="Authentication.logon"
+        )
+
+        response.raise_for_status()
+
+        return decode(response)
+
+
+class AsyncAuthentication:
+    """Authentication API endpoint of the asyncio client."""
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    async def logon(
+        self,
+        username: str,
+        password: str,
+        new_password: str = None,
+        auth_method: AuthMethod = AuthMethod.CyberArk,
+        concurrent_session: bool = True,
+    ):
+        """Logon to the vault and store the session token, see ``Authentication.logon``."""
+
+        async def relogon() -> str:
+            return await self._logon(username, new_password or password, None, auth_method, concurrent_session)
 
-        data = {
-            "username": username,
-            "password": password,
-            "newPassword": new_password,
-            "concurrentSession": concurrent_session,
-        }
+        token = await self._logon(username, password, new_password, auth_method, concurrent_session)
+        self.vault.token_manager.configure(relogon, token)
 
-        data = remove_none_values_from_dict(data)
+        return token
 
-        response = self.vault.session.post(request_url, json=data, verify=self.vault.verify_requests)
+    async def _logon(self, username, password, new_password, auth_method, concurrent_session) -> str:
+        request_url, data = _logon_request(
+            self.vault.base_url, username, password, new_password, auth_method, concurrent_session
+        )
 
+        response = await self.vault.request(
+            "POST", request_url, body=data, authenticate=False, endpoint="Authentication.logon"
+        )
         response.raise_for_status()
 
-        return response.json()
+        return decode(response)
@@ -1,16 +1,137 @@
-from typing import List
-from pypas.model.reqresuser import ReqresUser
-import urllib
-import httpx
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Union
+
+from pypas.decoding import decode
+from pypas.model.credential import Credential
+from pypas.singleflight import AsyncSingleFlight, SingleFlight
+import urllib.parse
 
 from pypas.utils import remove_none_values_from_dict
 
 
+@dataclass(frozen=True)
+class CredentialQuery:
+    """
+    A single credential lookup for ``Credentials.get_many``.
+
+    Attributes map to the arguments of ``Credentials.get_credential``.
+    """
+
+    app_id: str
+    safe: str
+    folder: str = None
+    object: str = None
+    user_name: str = None
+    address: str = None
+    database: str = None
+    policy_id: str = None
+    reason: str = None
+
+
+@dataclass
+class CredentialResult:
+    """
+    The outcome of a single lookup of ``Credentials.get_many``.
+
+    Attributes:
+        query (CredentialQuery): The lookup.
+
+        credential (Credential): The retrieved credential, or None if the lookup failed.
+
+        error (Exception): The exception raised by the lookup, or None if it succeeded.
+    """
+
+    query: CredentialQuery
+    credential: Credential = None
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether or not the lookup succeeded."""
+        return self.error is None
+
+
+def _unique_queries(queries: Iterable[Union[CredentialQuery, dict]]):
+    queries = [query if isinstance(query, CredentialQuery) else CredentialQuery(**query) for query in queries]
+    return queries, list(dict.fromkeys(queries))
+
+
+def _credential_params(
+    app_id: str,
+    safe: str,
+    folder: str = None,
+    object: str = None,
+    user_name: str = None,
+    address: str = None,
+    database: str = None,
+    policy_id: str = None,
+    reason: str = None,
+    connection_timeout: int = None,
+    fail_on_password_change: bool = None,
+) -> dict:
+    params = {
+        "AppID": app_id,
+        "Safe": safe,
+        "Folder": folder,
+        "Object": object,
+        "UserName": user_name,
+        "Address": address,
+        "Database": database,
+        "PolicyID": policy_id,
+        "Reason": reason,
+        "ConnectionTimeout": connection_timeout,
+        "FailOnPasswordChange": fail_on_password_change,
+    }
+    return remove_none_values_from_dict(params)
+
+
+def _agent_arguments(arguments: dict) -> dict:
+    return {name: value for name, value in arguments.items() if name != "self"}
+
+
+def _credential_url(ccp, params: dict) -> str:
+    return f"{ccp.ccp_base_url}{ccp.ccp_iis_site}/api/Accounts?{urllib.parse.urlencode(params)}"
+
+
+def _credential_from_response(response) -> Credential:
+    data = decode(response)
+
+    return Credential(
+        Content=data.get("Content"),
+        UserName=data.get("UserName"),
+        Address=data.get("Address"),
+        Database=data.get("Database"),
+        PasswordChangeInProcess=str(data.get("PasswordChangeInProcess")).lower() == "true",
+    )
+
+
+def _lookup_key(params: dict, certificate_path: str = None) -> tuple:
+    from pypas.cache import CredentialCache
+
+    return CredentialCache.key(params, certificate_path)
+
+
+def _cache_key(ccp, params: dict, certificate_path: str = None):
+    if ccp.cache is None:
+        return None
+    return _lookup_key(params, certificate_path)
+
+
+def _update_cache(ccp, key, credential: Credential):
+    if key is None:
+        return
+    if credential.PasswordChangeInProcess:
+        ccp.cache.invalidate(key)
+    else:
+        ccp.cache.set(key, credential)
+
+
 class Credentials:
     """Credentials endpoint of the Central Credential Provider."""
 
     def __init__(self, ccp):
         self.ccp = ccp
+        self._flight = SingleFlight()
 
     def get_credential(
         self,
@@ -28,45 +149,164 @@ class Credentials:
         certificate_path: str = None,
         certificate_key_path: str = None,
         certificate_password: str = None,
-    ) -> List[ReqresUser]:
+    ) -> Credential:
         """Get a credential from a safe.
         Relevant CyberArk Documentation:
         https://docs.cyberark.com/AAM-CP/13.0/en/Content/CCP/Calling-the-Web-Service-using-REST.htm
+
+        When the CCP has a cache, the credential is served from it until its TTL expires.
+        Credentials with a password change in process are never cached. Concurrent identical
+        lookups are coalesced into a single request to the CCP. When the CCP
+        points at a local agent, the lookup is sent to the agent instead.
+        """
+        if self.ccp.agent is not None:
+            return self.ccp.agent.get_credential(**_agent_arguments(locals()))
+
+        params = _credential_params(
+            app_id,
+            safe,
+            folder,
+            object,
+            user_name,
+            address,
+            database,
+            policy_id,
+            reason,
+            connection_timeout,
+            fail_on_password_change,
+        )
+
+        key = _cache_key(self.ccp, params, certificate_path)
+        if key is not None:
+            credential = self.ccp.cache.get(key)
+            if self.ccp.hooks is not None:
+                self.ccp.hooks.on_cache("Credentials.get_credential", credential is not None)
+            if credential is not None:
+                return credential
+
+        def fetch() -> Credential:
+            request_url = _credential_url(self.ccp, params)
+
+            cert = (certificate_path, certificate_key_path, certificate_password) if certificate_path else None
+            response = self.ccp.get_request(request_url, cert=cert, endpoint="Credentials.get_credential")
+            response.raise_for_status()
+
+            credential = _credential_from_response(response)
+            _update_cache(self.ccp, key, credential)
+            return credential
+
+        return self._flight.do(_lookup_key(params, certificate_path), fetch)
+
+    def get_many(
+        self, queries: Iterable[Union[CredentialQuery, dict]], max_concurrency: int = 8, **kwargs
+    ) -> List[CredentialResult]:
+        """Get many credentials in parallel over the shared connection pool.
+
+        Identical queries are fetched once. A failing lookup does not abort the batch,
+        its exception is returned in the result instead.
+
+        Args:
+            queries (Iterable[Union[CredentialQuery, dict]]): The lookups to run.
+            max_concurrency (int): The maximum number of lookups in flight at once.
+            **kwargs: Further arguments of ``get_credential`` applied to every lookup.
+
+        Returns:
+            List[CredentialResult]: One result per query, in input order.
         """
-        params = {
-            "AppID": app_id,
-            "Safe": safe,
-            "Folder": folder,
-            "Object": object,
-            "UserName": user_name,
-            "Address": address,
-            "Database": database,
-            "PolicyID": policy_id,
-            "Reason": reason,
-            "ConnectionTimeout": connection_timeout,
-            "FailOnPasswordChange": fail_on_password_change,
-        }
-        params = remove_none_values_from_dict(params)
-
-        request_url = f"{self.ccp.ccp_base_url}{self.ccp.ccp_iis_site}/api/Accounts?{urllib.parse.urlencode(params)}"
-
-        with self.ccp.get_session() as client:
-            if not certificate_path:
-                response = client.get(
-                    request_url,
-                )
-            else:
-                if certificate_path and certificate_key_path and certificate_password:
-                    cert = (certificate_path, certificate_key_path, certificate_password)
-                elif certificate_path and certificate_key_path:
-                    cert = (certificate_path, certificate_key_path)
-                else:
-                    cert = certificate_path
-                response = httpx.get(request_url, cert=cert)
+        queries, unique = _unique_queries(queries)
+
+        def fetch(query: CredentialQuery) -> CredentialResult:
+            try:
+                return CredentialResult(query, credential=self.get_credential(**asdict(query), **kwargs))
+            except Exception as ex:
+                return CredentialResult(query, error=ex)
+
+        results: Dict[CredentialQuery, CredentialResult] = dict(
+            zip(unique, self.ccp.map(fetch, unique, max_workers=max_concurrency))
+        )
+
+        return [results[query] for query in queries]
+
+
+class AsyncCredentials:
+    """Credentials endpoint of the asyncio Central Credential Provider client."""
+
+    def __init__(self, ccp):
+        self.ccp = ccp
+        self._flight = AsyncSingleFlight()
+
+    async def get_credential(
+        self,
+        app_id: str,
+        safe: str,
+        folder: str = None,
+        object: str = None,
+        user_name: str = None,
+        address: str = None,
+        database: str = None,
+        policy_id: str = None,
+        reason: str = None,
+        connection_timeout: int = None,
+        fail_on_password_change: bool = None,
+        certificate_path: str = None,
+        certificate_key_path: str = None,
+        certificate_password: str = None,
+    ) -> Credential:
+        """Get a credential from a safe."""
+        if self.ccp.agent is not None:
+            return await self.ccp.agent.get_credential(**_agent_arguments(locals()))
+
+        params = _credential_params(
+            app_id,
+            safe,
+            folder,
+            object,
+            user_name,
+            address,
+            database,
+            policy_id,
+            reason,
+            connection_timeout,
+            fail_on_password_change,
+        )
+
+        key = _cache_key(self.ccp, params, certificate_path)
+        if key is not None:
+            credential = self.ccp.cache.get(key)
+            if self.ccp.hooks is not None:
+                self.ccp.hooks.on_cache("Credentials.get_credential", credential is not None)
+            if credential is not None:
+                return credential
+
+        async def fetch() -> Credential:
+            request_url = _credential_url(self.ccp, params)
+
+            cert = (certificate_path, certificate_key_path, certificate_password) if certificate_path else None
+            response = await self.ccp.get_request(request_url, cert=cert, endpoint="Credentials.get_credential")
             response.raise_for_status()
 
-        users = []
-        for user in response.json()["data"]:
-            users.append(ReqresUser(**user))
+            credential = _credential_from_response(response)
+            _update_cache(self.ccp, key, credential)
+            return credential
+
+        return await self._flight.do(_lookup_key(params, certificate_path), fetch)
+
+    async def get_many(
+        self, queries: Iterable[Union[CredentialQuery, dict]], max_concurrency: int = 8, **kwargs
+    ) -> List[CredentialResult]:
+        """Get many credentials concurrently, see ``Credentials.get_many``."""
+        import asyncio
+
+        queries, unique = _unique_queries(queries)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(query: CredentialQuery) -> CredentialResult:
+            async with semaphore:
+                try:
+                    return CredentialResult(query, credential=await self.get_credential(**asdict(query), **kwargs))
+                except Exception as ex:
+                    return CredentialResult(query, error=ex)
+
+        results = dict(zip(unique, await asyncio.gather(*(fetch(query) for query in unique))))
 
-        return users
+        return [results[query] for query in queries]
@@ -0,0 +1,178 @@
+from functools import partial
+from typing import AsyncIterator, Iterator, List
+import urllib.parse
+
+from pypas.api.safe_api import _Pager
+from pypas.decoding import decode_group, decode_group_page
+from pypas.model.group import Group
+from pypas.utils import remove_none_values_from_dict
+
+
+def _list_url(
+    base_url: str,
+    search: str = None,
+    filter: str = None,
+    include_members: bool = False,
+    offset: int = None,
+    limit: int = None,
+) -> str:
+    params = {
+        "search": search,
+        "filter": filter,
+        "includeMembers": include_members,
+        "offset": offset,
+        "limit": limit,
+    }
+    params = remove_none_values_from_dict(params)
+
+    return f"{base_url}PasswordVault/API/UserGroups?{urllib.parse.urlencode(params)}"
+
+
+def _get_url(base_url: str, group_id, include_members: bool = True) -> str:
+    url = f"{base_url}PasswordVault/API/UserGroups/{group_id}/"
+    return f"{url}?includeMembers=true" if include_members else url
+
+
+def _pager(base_url: str, page_size: int, **filters) -> _Pager:
+    return _Pager(base_url, page_size, partial(_list_url, base_url, limit=page_size, **filters))
+
+
+class Groups:
+    """User Groups API endpoint"""
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    def list(
+        self,
+        search: str = None,
+        filter: str = None,
+        include_members: bool = False,
+        offset: int = None,
+        limit: int = None,
+    ) -> List[Group]:
+        """List one page of the user groups of the vault.
+
+        Relevant CyberArk Documentation:
+        https://docs.cyberark.com/PAS/12.6/en/Content/WebServices/GetGroupsFromVault.htm
+
+        Args:
+            search (str): Only groups matching the search text are returned.
+            filter (str): A filter on ``groupType`` or ``groupName``, e.g. ``groupType eq Directory``.
+            include_members (bool): Whether or not the members of the groups are returned.
+            offset (int): The number of groups skipped.
+            limit (int): The maximum number of groups returned.
+
+        Returns:
+            List[Group]: The groups of the page.
+        """
+        request_url = _list_url(self.vault.base_url, search, filter, include_members, offset, limit)
+
+        response = self.vault.get_request(request_url, endpoint="Groups.list")
+        response.raise_for_status()
+
+        return decode_group_page(response)[0]
+
+    def iter_groups(
+        self,
+        page_size: int = 1000,
+        search: str = None,
+        filter: str = None,
+        include_members: bool = False,
+    ) -> Iterator[Group]:
+        """Iterate over all user groups of the vault, fetching one page at a time.
+
+        Args:
+            page_size (int): The number of groups requested per page.
+
+        Yields:
+            Group: The groups in listing order.
+        """
+        pager = _pager(self.vault.base_url, page_size, search=search, filter=filter, include_members=include_members)
+        request_url = pager.first()
+        while request_url:
+            response = self.vault.get_request(request_url, endpoint="Groups.list")
+            response.raise_for_status()
+
+            groups, next_link = decode_group_page(response)
+            request_url = pager.next(groups, next_link)
+            yield from groups
+
+    def get(self, group_id, include_members: bool = True) -> Group:
+        """Get the details of a user group.
+
+        Args:
+            group_id (int): The unique ID of the group.
+            include_members (bool): Whether or not the members of the group are returned.
+
+        Returns:
+            Group: The group.
+        """
+        request_url = _get_url(self.vault.base_url, group_id, include_members)
+
+        response = self.vault.get_request(request_url, endpoint="Groups.get")
+        response.raise_for_status()
+
+        return decode_group(response)
+
+    def get_many(self, group_ids: List, include_members: bool = True, max_workers: int = 8) -> List[Group]:
+        """Get the details of many user groups in parallel over the vault's shared connection pool.
+
+        Returns:
+            List[Group]: The groups in input order.
+        """
+        return self.vault.map(lambda group_id: self.get(group_id, include_members), group_ids, max_workers)
+
+
+class AsyncGroups:
+    """User Groups API endpoint of the asyncio client.
+
+    Mirrors ``Groups`` with awaitable methods.
+    """
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    async def list(
+        self,
+        search: str = None,
+        filter: str = None,
+        include_members: bool = False,
+        offset: int = None,
+        limit: int = None,
+    ) -> List[Group]:
+        """List one page of the user groups of the vault, see ``Groups.list``."""
+        request_url = _list_url(self.vault.base_url, search, filter, include_members, offset, limit)
+
+        response = await self.vault.get_request(request_url, endpoint="Groups.list")
+        response.raise_for_status()
+
+        return decode_group_page(response)[0]
+
+    async def iter_groups(
+        self,
+        page_size: int = 1000,
+        search: str = None,
+        filter: str = None,
+        include_members: bool = False,
+    ) -> AsyncIterator[Group]:
+        """Iterate over all user groups of the vault, fetching one page at a time, see ``Groups.iter_groups``."""
+        pager = _pager(self.vault.base_url, page_size, search=search, filter=filter, include_members=include_members)
+        request_url = pager.first()
+        while request_url:
+            response = await self.vault.get_request(request_url, endpoint="Groups.list")
+            response.raise_for_status()
+
+            groups, next_link = decode_group_page(response)
+            request_url = pager.next(groups, next_link)
+            for group in groups:
+                yield group
+
+    async def get(self, group_id, include_members: bool = True) -> Group:
+        """Get the details of a user group, see ``Groups.get``."""
+        request_url = _get_url(self.vault.base_url, group_id, include_members)
+
+        response = await self.vault.get_request(request_url, endpoint="Groups.get")
+        response.raise_for_status()
+
+        return decode_group(response)
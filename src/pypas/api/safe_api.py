@@ -1,15 +1,109 @@
-from pypas.model.safe import Safe, SafeAccount, SafeCreator
-from typing import List
-import urllib
+from pypas.decoding import decode_safe, decode_safe_page
+from pypas.model.safe import Safe
+from pypas.singleflight import AsyncSingleFlight, SingleFlight
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+import urllib.parse
 
 from pypas.utils import remove_none_values_from_dict
 
 
+def _list_url(
+    base_url: str,
+    limt: int = None,
+    offset: int = None,
+    useCache: bool = False,
+    sort: bool = False,
+    search: str = None,
+    includeAccounts: bool = False,
+    extendedDetails: bool = False,
+) -> str:
+    params = {
+        "limit": limt,
+        "offset": offset,
+        "useCache": useCache,
+        "sort": sort,
+        "search": search,
+        "includeAccounts": includeAccounts,
+        "extendedDetails": extendedDetails,
+    }
+    params = remove_none_values_from_dict(params)
+
+    return f"{base_url}PasswordVault/API/Safes?{urllib.parse.urlencode(params)}"
+
+
+class _Pager:
+    """Tracks the URL of the next page of a paginated listing.
+
+    Follows the ``nextLink`` of the PVWA when it is returned and falls back to advancing
+    the offset by the page size until a short page is returned. ``list_url`` builds the URL
+    of the page at the ``offset`` keyword argument, e.g. a ``partial`` of a ``_list_url``.
+    """
+
+    def __init__(self, base_url: str, page_size: int, list_url: Callable[..., str]):
+        self.base_url = base_url
+        self.page_size = page_size
+        self.list_url = list_url
+        self.offset = 0
+
+    def first(self) -> str:
+        return self.list_url(offset=self.offset)
+
+    def next(self, items: list, next_link: Optional[str]) -> Optional[str]:
+        self.offset += len(items)
+        if next_link:
+            return f"{self.base_url}PasswordVault/{next_link.lstrip('/')}"
+        if next_link is None and len(items) >= self.page_size:
+            return self.list_url(offset=self.offset)
+        return None
+
+
+def _pager(base_url: str, page_size: int, **filters) -> _Pager:
+    return _Pager(base_url, page_size, partial(_list_url, base_url, page_size, **filters))
+
+
+def _get_url(base_url: str, safe_identifier: str, includeAccounts: bool = False) -> str:
+    url = f"{base_url}PasswordVault/API/Safes/{safe_identifier}/"
+    return f"{url}?includeAccounts=true" if includeAccounts else url
+
+
+def _create_body(
+    name: str,
+    description: str = None,
+    location: str = None,
+    number_of_versions_retention: int = None,
+    number_of_days_retention: int = None,
+    managing_cpm: str = None,
+    olac_enabled: bool = False,
+) -> dict:
+    if number_of_days_retention and number_of_versions_retention:
+        raise ValueError("Only one of number_of_days_retention and number_of_versions_retention can be set.")
+    if not number_of_days_retention and not number_of_versions_retention:
+        raise ValueError("Either number_of_days_retention or number_of_versions_retention must be set.")
+
+    body = {
+        "SafeName": name,
+        "Description": description,
+        "Location": location,
+        "NumberOfVersionsRetention": number_of_versions_retention,
+        "NumberOfDaysRetention": number_of_days_retention,
+        "ManagingCPM": managing_cpm,
+        "OlacEnabled": olac_enabled,
+    }
+    return remove_none_values_from_dict(body)
+
+
+def _create_url(base_url: str) -> str:
+    return f"{base_url}PasswordVault/API/Safes"
+
+
 class Safes:
     """Safes API endpoint"""
 
     def __init__(self, vault):
         self.vault = vault
+        self._flight = SingleFlight()
 
     def list(
         self,
@@ -26,92 +120,254 @@ class Safes:
         https://docs.cyberark.com/PAS/12.6/en/Content/SDK/Safes%20Web%20Services%20-%20List%20Safes.htm
         """
 
-        params = {
-            "limit": limt,
-            "offset": offset,
-            "useCache": useCache,
-            "sort": sort,
-            "search": search,
-            "includeAccounts": includeAccounts,
-            "extendedDetails": extendedDetails,
-        }
-        params = remove_none_values_from_dict(params)
-
-        request_url = f"{self.vault.base_url}PasswordVault/API/Safes?{urllib.parse.urlencode(params)}"
-
-        response = self.vault.get_request(request_url)
-
-        safes = []
-        for safe in response.json()["safes"]:
-            safe_creator = SafeCreator(**response.json()["Creator"])
-            accounts = []
-            for account in response.json()["accounts"]:
-                accounts.append(SafeAccount(**account))
-
-            safe = Safe(
-                safeUrlId=response.json()["safeUrlId"],
-                safeName=response.json()["safeName"],
-                safeNumber=response.json()["safeNumber"],
-                description=response.json()["description"],
-                location=response.json()["location"],
-                creator=safe_creator,
-                olacEnabled=response.json()["olacEnabled"],
-                managingCPM=response.json()["managingCPM"],
-                numberOfVersionsRetention=response.json()["numberOfVersionsRetention"],
-                numberOfDaysRetention=response.json()["numberOfDaysRetention"],
-                autoPurgeEnabled=response.json()["autoPurgeEnabled"],
-                creationTime=response.json()["creationTime"],
-                lastModificationTime=response.json()["lastModificationTime"],
-                accounts=accounts,
-                isExiredMember=response.json()["isExiredMember"],
-            )
-            safes.append(safe)
-        return safes
-
-    def get(self, safe_identifier: str) -> Safe:
+        request_url = _list_url(
+            self.vault.base_url, limt, offset, useCache, sort, search, includeAccounts, extendedDetails
+        )
+
+        response = self.vault.get_request(request_url, endpoint="Safes.list")
+        response.raise_for_status()
+
+        return decode_safe_page(response)[0]
+
+    def iter_safes(
+        self,
+        page_size: int = 25,
+        prefetch: bool = False,
+        useCache: bool = False,
+        sort: bool = False,
+        search: str = None,
+        includeAccounts: bool = False,
+        extendedDetails: bool = False,
+    ) -> Iterator[Safe]:
+        """Iterate over all safes, fetching one page at a time.
+
+        Only the current page is held in memory, so arbitrarily large vaults can be walked
+        in constant memory.
+
+        Args:
+            page_size (int): The number of safes requested per page.
+            prefetch (bool): Whether or not the next page is fetched in the background while
+            the current page is consumed.
+
+        Yields:
+            Safe: The safes of the vault in listing order.
+        """
+        pager = _pager(
+            self.vault.base_url,
+            page_size,
+            useCache=useCache,
+            sort=sort,
+            search=search,
+            includeAccounts=includeAccounts,
+            extendedDetails=extendedDetails,
+        )
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            request_url = pager.first()
+            pending = executor.submit(self.vault.get_request, request_url, endpoint="Safes.list") if executor else None
+            while request_url:
+                response = pending.result() if executor else self.vault.get_request(request_url, endpoint="Safes.list")
+                response.raise_for_status()
+
+                safes, next_link = decode_safe_page(response)
+                request_url = pager.next(safes, next_link)
+                if executor and request_url:
+                    pending = executor.submit(self.vault.get_request, request_url, endpoint="Safes.list")
+
+                yield from safes
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+    def get(self, safe_identifier: str, includeAccounts: bool = False) -> Safe:
         """Get a single safe by its name.
 
         Relevant CyberArk Documentation:
         https://docs.cyberark.com/PAS/12.6/en/Content/SDK/Safes%20Web%20Services%20-%20Get%20Safes%20Details.htm
 
+        Concurrent calls for the same safe are coalesced into a single request.
 
         Args:
             safe_identifier (str): safeUrLId or safeName
+            includeAccounts (bool): Whether or not the accounts of the safe are returned.
 
         Returns:
             Safe: A safe object
         """
 
-        request_url = f"{self.vault.base_url}PasswordVault/API/Safes/{safe_identifier}/"
+        def fetch() -> Safe:
+            request_url = _get_url(self.vault.base_url, safe_identifier, includeAccounts)
+
+            response = self.vault.get_request(request_url, endpoint="Safes.get")
+            response.raise_for_status()
+
+            return decode_safe(response)
+
+        return self._flight.do((safe_identifier, includeAccounts), fetch)
+
+    def get_many(self, safe_identifiers: List[str], max_workers: int = 8) -> List[Safe]:
+        """Get many safes in parallel over the vault's shared connection pool.
+
+        Args:
+            safe_identifiers (List[str]): The safeUrlIds or safeNames.
+            max_workers (int): The maximum number of requests in flight at once.
+
+        Returns:
+            List[Safe]: The safes in input order.
+        """
+        return self.vault.map(self.get, safe_identifiers, max_workers=max_workers)
+
+    def create(
+        self,
+        name: str,
+        description: str = None,
+        location: str = None,
+        number_of_versions_retention: int = None,
+        number_of_days_retention: int = None,
+        managing_cpm: str = None,
+        olac_enabled: bool = False,
+    ) -> Safe:
+        """Create a new safe."""
+        body = _create_body(
+            name,
+            description,
+            location,
+            number_of_versions_retention,
+            number_of_days_retention,
+            managing_cpm,
+            olac_enabled,
+        )
+
+        request_url = _create_url(self.vault.base_url)
+
+        response = self.vault.post_request(request_url, body=body, endpoint="Safes.create")
+
+        response.raise_for_status()
+
+        return decode_safe(response)
+
+    def update(
+        self,
+        safe_url_id: str,
+        name: str,
+        description: str = None,
+        location: str = None,
+        number_of_versions_retention: int = None,
+        number_of_days_retention: int = None,
+        managing_cpm: str = None,
+        olac_enabled: bool = False,
+    ) -> Safe:
+        """Update the properties of a safe.
+
+        Relevant CyberArk Documentation:
+        https://docs.cyberark.com/PAS/12.6/en/Content/WebServices/UpdateSafe.htm
+        """
+        body = _create_body(
+            name,
+            description,
+            location,
+            number_of_versions_retention,
+            number_of_days_retention,
+            managing_cpm,
+            olac_enabled,
+        )
+
+        request_url = _get_url(self.vault.base_url, safe_url_id)
 
-        response = self.vault.get_request(request_url)
+        response = self.vault.put_request(request_url, body=body, endpoint="Safes.update")
         response.raise_for_status()
 
-        safe_creator = SafeCreator(**response.json()["Creator"])
-
-        accounts = []
-        for account in response.json()["accounts"]:
-            accounts.append(SafeAccount(**account))
-
-        return Safe(
-            safeUrlId=response.json()["safeUrlId"],
-            safeName=response.json()["safeName"],
-            safeNumber=response.json()["safeNumber"],
-            description=response.json()["description"],
-            location=response.json()["location"],
-            creator=safe_creator,
-            olacEnabled=response.json()["olacEnabled"],
-            managingCPM=response.json()["managingCPM"],
-            numberOfVersionsRetention=response.json()["numberOfVersionsRetention"],
-            numberOfDaysRetention=response.json()["numberOfDaysRetention"],
-            autoPurgeEnabled=response.json()["autoPurgeEnabled"],
-            creationTime=response.json()["creationTime"],
-            lastModificationTime=response.json()["lastModificationTime"],
-            accounts=accounts,
-            isExiredMember=response.json()["isExiredMember"],
+        return decode_safe(response)
+
+
+class AsyncSafes:
+    """Safes API endpoint of the asyncio client.
+
+    Mirrors ``Safes`` with awaitable methods.
+    """
+
+    def __init__(self, vault):
+        self.vault = vault
+        self._flight = AsyncSingleFlight()
+
+    async def list(
+        self,
+        limt: int = None,
+        offset: int = None,
+        useCache: bool = False,
+        sort: bool = False,
+        search: str = None,
+        includeAccounts: bool = False,
+        extendedDetails: bool = False,
+    ) -> List[Safe]:
+        """List all safes."""
+        request_url = _list_url(
+            self.vault.base_url, limt, offset, useCache, sort, search, includeAccounts, extendedDetails
         )
 
-    def create(
+        response = await self.vault.get_request(request_url, endpoint="Safes.list")
+        response.raise_for_status()
+
+        return decode_safe_page(response)[0]
+
+    async def iter_safes(
+        self,
+        page_size: int = 25,
+        prefetch: bool = False,
+        useCache: bool = False,
+        sort: bool = False,
+        search: str = None,
+        includeAccounts: bool = False,
+        extendedDetails: bool = False,
+    ) -> AsyncIterator[Safe]:
+        """Iterate over all safes, fetching one page at a time, see ``Safes.iter_safes``."""
+        import asyncio
+
+        pager = _pager(
+            self.vault.base_url,
+            page_size,
+            useCache=useCache,
+            sort=sort,
+            search=search,
+            includeAccounts=includeAccounts,
+            extendedDetails=extendedDetails,
+        )
+        request_url = pager.first()
+        pending = (
+            asyncio.ensure_future(self.vault.get_request(request_url, endpoint="Safes.list")) if prefetch else None
+        )
+        try:
+            while request_url:
+                response = (
+                    await pending if prefetch else await self.vault.get_request(request_url, endpoint="Safes.list")
+                )
+                response.raise_for_status()
+
+                safes, next_link = decode_safe_page(response)
+                request_url = pager.next(safes, next_link)
+                if prefetch and request_url:
+                    pending = asyncio.ensure_future(self.vault.get_request(request_url, endpoint="Safes.list"))
+
+                for safe in safes:
+                    yield safe
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+    async def get(self, safe_identifier: str, includeAccounts: bool = False) -> Safe:
+        """Get a single safe by its safeUrlId or safeName, see ``Safes.get``."""
+
+        async def fetch() -> Safe:
+            request_url = _get_url(self.vault.base_url, safe_identifier, includeAccounts)
+
+            response = await self.vault.get_request(request_url, endpoint="Safes.get")
+            response.raise_for_status()
+
+            return decode_safe(response)
+
+        return await self._flight.do((safe_identifier, includeAccounts), fetch)
+
+    async def create(
         self,
         name: str,
         description: str = None,
@@ -122,48 +378,46 @@ class Safes:
         olac_enabled: bool = False,
     ) -> Safe:
         """Create a new safe."""
-        if number_of_days_retention and number_of_versions_retention:
-            raise ValueError("Only one of number_of_days_retention and number_of_versions_retention can be set.")
-        if not number_of_days_retention and not number_of_versions_retention:
-            raise ValueError("Either number_of_days_retention or number_of_versions_retention must be set.")
-
-        body = {
-            "SafeName": name,
-            "Description": description,
-            "Location": location,
-            "NumberOfVersionsRetention": number_of_versions_retention,
-            "NumberOfDaysRetention": number_of_days_retention,
-            "ManagingCPM": managing_cpm,
-            "OlacEnabled": olac_enabled,
-        }
-        body = remove_none_values_from_dict(body)
-
-        request_url = f"{self.vault.base_url}PasswordVault/API/Safes"
-
-        response = self.vault.post_request(request_url, body=body)
+        body = _create_body(
+            name,
+            description,
+            location,
+            number_of_versions_retention,
+            number_of_days_retention,
+            managing_cpm,
+            olac_enabled,
+        )
 
+        response = await self.vault.post_request(_create_url(self.vault.base_url), body=body, endpoint="Safes.create")
         response.raise_for_status()
 
-        safe_creator = SafeCreator(**response.json()["Creator"])
-
-        accounts = []
-        for account in response.json()["accounts"]:
-            accounts.append(SafeAccount(**account))
-
-        return Safe(
-            safeUrlId=response.json()["safeUrlId"],
-            safeName=response.json()["safeName"],
-            safeNumber=response.json()["safeNumber"],
-            description=response.json()["description"],
-            location=response.json()["location"],
-            creator=safe_creator,
-            olacEnabled=response.json()["olacEnabled"],
-            managingCPM=response.json()["managingCPM"],
-            numberOfVersionsRetention=response.json()["numberOfVersionsRetention"],
-            numberOfDaysRetention=response.json()["numberOfDaysRetention"],
-            autoPurgeEnabled=response.json()["autoPurgeEnabled"],
-            creationTime=response.json()["creationTime"],
-            lastModificationTime=response.json()["lastModificationTime"],
-            accounts=accounts,
-            isExiredMember=response.json()["isExiredMember"],
+        return decode_safe(response)
+
+    async def update(
+        self,
+        safe_url_id: str,
+        name: str,
+        description: str = None,
+        location: str = None,
+        number_of_versions_retention: int = None,
+        number_of_days_retention: int = None,
+        managing_cpm: str = None,
+        olac_enabled: bool = False,
+    ) -> Safe:
+        """Update the properties of a safe, see ``Safes.update``."""
+        body = _create_body(
+            name,
+            description,
+            location,
+            number_of_versions_retention,
+            number_of_days_retention,
+            managing_cpm,
+            olac_enabled,
         )
+
+        request_url = _get_url(self.vault.base_url, safe_url_id)
+
+        response = await self.vault.put_request(request_url, body=body, endpoint="Safes.update")
+        response.raise_for_status()
+
+        return decode_safe(response)
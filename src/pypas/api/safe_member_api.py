@@ -0,0 +1,267 @@
+from dataclasses import asdict
+from functools import partial
+from typing import AsyncIterator, Iterator, List
+import urllib.parse
+
+from pypas.api.safe_api import _Pager
+from pypas.decoding import decode_safe_member, decode_safe_member_page
+from pypas.model.safe_member import SafeMember, SafeMemberPermissions, SafeMemberType
+from pypas.utils import remove_none_values_from_dict
+
+
+def _members_url(base_url: str, safe_url_id: str) -> str:
+    # The safeUrlId is returned URL-encoded by the PVWA and interpolated as is, like in ``safe_api._get_url``.
+    return f"{base_url}PasswordVault/API/Safes/{safe_url_id}/Members/"
+
+
+def _member_url(base_url: str, safe_url_id: str, member_name: str) -> str:
+    return f"{_members_url(base_url, safe_url_id)}{urllib.parse.quote(member_name)}/"
+
+
+def _list_url(
+    base_url: str,
+    safe_url_id: str,
+    limit: int = None,
+    offset: int = None,
+    search: str = None,
+    member_type: SafeMemberType = None,
+) -> str:
+    params = {
+        "limit": limit,
+        "offset": offset,
+        "search": search,
+        "filter": f"memberType eq {member_type.name}" if member_type is not None else None,
+    }
+    params = remove_none_values_from_dict(params)
+
+    return f"{_members_url(base_url, safe_url_id)}?{urllib.parse.urlencode(params)}"
+
+
+def _pager(base_url: str, safe_url_id: str, page_size: int, **filters) -> _Pager:
+    return _Pager(base_url, page_size, partial(_list_url, base_url, safe_url_id, page_size, **filters))
+
+
+def _add_body(
+    member_name: str,
+    permissions: SafeMemberPermissions,
+    member_type: SafeMemberType = SafeMemberType.User,
+    search_in: str = "Vault",
+    membership_expiration_date: int = None,
+    is_read_only: bool = False,
+) -> dict:
+    body = {
+        "memberName": member_name,
+        "searchIn": search_in,
+        "membershipExpirationDate": membership_expiration_date,
+        "permissions": asdict(permissions),
+        "isReadOnly": is_read_only,
+        "memberType": member_type.name,
+    }
+    return remove_none_values_from_dict(body)
+
+
+def _update_body(
+    permissions: SafeMemberPermissions, membership_expiration_date: int = None, is_read_only: bool = False
+) -> dict:
+    body = {
+        "membershipExpirationDate": membership_expiration_date,
+        "permissions": asdict(permissions),
+        "isReadOnly": is_read_only,
+    }
+    return remove_none_values_from_dict(body)
+
+
+class SafeMembers:
+    """Safe Members API endpoint"""
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    def list(
+        self,
+        safe_url_id: str,
+        limit: int = None,
+        offset: int = None,
+        search: str = None,
+        member_type: SafeMemberType = None,
+    ) -> List[SafeMember]:
+        """List one page of the members of a safe.
+
+        Relevant CyberArk Documentation:
+        https://docs.cyberark.com/PAS/12.6/en/Content/WebServices/Safe%20Members%20WS%20-%20List%20Safe%20Members.htm
+
+        Args:
+            safe_url_id (str): The safeUrlId of the safe.
+            limit (int): The maximum number of members returned.
+            offset (int): The number of members skipped.
+            search (str): Only members whose names contain the text are returned.
+            member_type (SafeMemberType): Only users or only groups are returned.
+
+        Returns:
+            List[SafeMember]: The members of the page.
+        """
+        request_url = _list_url(self.vault.base_url, safe_url_id, limit, offset, search, member_type)
+
+        response = self.vault.get_request(request_url, endpoint="SafeMembers.list")
+        response.raise_for_status()
+
+        return decode_safe_member_page(response)[0]
+
+    def iter_members(
+        self, safe_url_id: str, page_size: int = 100, search: str = None, member_type: SafeMemberType = None
+    ) -> Iterator[SafeMember]:
+        """Iterate over all members of a safe, fetching one page at a time.
+
+        Args:
+            safe_url_id (str): The safeUrlId of the safe.
+            page_size (int): The number of members requested per page.
+
+        Yields:
+            SafeMember: The members of the safe in listing order.
+        """
+        pager = _pager(self.vault.base_url, safe_url_id, page_size, search=search, member_type=member_type)
+        request_url = pager.first()
+        while request_url:
+            response = self.vault.get_request(request_url, endpoint="SafeMembers.list")
+            response.raise_for_status()
+
+            members, next_link = decode_safe_member_page(response)
+            request_url = pager.next(members, next_link)
+            yield from members
+
+    def add(
+        self,
+        safe_url_id: str,
+        member_name: str,
+        permissions: SafeMemberPermissions,
+        member_type: SafeMemberType = SafeMemberType.User,
+        search_in: str = "Vault",
+        membership_expiration_date: int = None,
+        is_read_only: bool = False,
+    ) -> SafeMember:
+        """Add a user or group as a member of a safe.
+
+        Relevant CyberArk Documentation:
+        https://docs.cyberark.com/PAS/12.6/en/Content/WebServices/Add%20Safe%20Member.htm
+
+        Args:
+            safe_url_id (str): The safeUrlId of the safe.
+            member_name (str): The name of the user or group.
+            permissions (SafeMemberPermissions): The permissions of the member.
+            member_type (SafeMemberType): Whether the member is a user or a group.
+            search_in (str): The vault or the directory the member is searched in.
+            membership_expiration_date (int): The Unix time the membership expires, or None for no expiry.
+            is_read_only (bool): Whether or not the membership can be changed.
+
+        Returns:
+            SafeMember: The added member.
+        """
+        body = _add_body(member_name, permissions, member_type, search_in, membership_expiration_date, is_read_only)
+
+        request_url = _members_url(self.vault.base_url, safe_url_id)
+
+        response = self.vault.post_request(request_url, body=body, endpoint="SafeMembers.add")
+        response.raise_for_status()
+
+        return decode_safe_member(response)
+
+    def update(
+        self,
+        safe_url_id: str,
+        member_name: str,
+        permissions: SafeMemberPermissions,
+        membership_expiration_date: int = None,
+        is_read_only: bool = False,
+    ) -> SafeMember:
+        """Update the permissions of a member of a safe.
+
+        Relevant CyberArk Documentation:
+        https://docs.cyberark.com/PAS/12.6/en/Content/WebServices/Update%20Safe%20Member.htm
+        """
+        body = _update_body(permissions, membership_expiration_date, is_read_only)
+
+        request_url = _member_url(self.vault.base_url, safe_url_id, member_name)
+
+        response = self.vault.put_request(request_url, body=body, endpoint="SafeMembers.update")
+        response.raise_for_status()
+
+        return decode_safe_member(response)
+
+
+class AsyncSafeMembers:
+    """Safe Members API endpoint of the asyncio client.
+
+    Mirrors ``SafeMembers`` with awaitable methods.
+    """
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    async def list(
+        self,
+        safe_url_id: str,
+        limit: int = None,
+        offset: int = None,
+        search: str = None,
+        member_type: SafeMemberType = None,
+    ) -> List[SafeMember]:
+        """List one page of the members of a safe, see ``SafeMembers.list``."""
+        request_url = _list_url(self.vault.base_url, safe_url_id, limit, offset, search, member_type)
+
+        response = await self.vault.get_request(request_url, endpoint="SafeMembers.list")
+        response.raise_for_status()
+
+        return decode_safe_member_page(response)[0]
+
+    async def iter_members(
+        self, safe_url_id: str, page_size: int = 100, search: str = None, member_type: SafeMemberType = None
+    ) -> AsyncIterator[SafeMember]:
+        """Iterate over all members of a safe, fetching one page at a time, see ``SafeMembers.iter_members``."""
+        pager = _pager(self.vault.base_url, safe_url_id, page_size, search=search, member_type=member_type)
+        request_url = pager.first()
+        while request_url:
+            response = await self.vault.get_request(request_url, endpoint="SafeMembers.list")
+            response.raise_for_status()
+
+            members, next_link = decode_safe_member_page(response)
+            request_url = pager.next(members, next_link)
+            for member in members:
+                yield member
+
+    async def add(
+        self,
+        safe_url_id: str,
+        member_name: str,
+        permissions: SafeMemberPermissions,
+        member_type: SafeMemberType = SafeMemberType.User,
+        search_in: str = "Vault",
+        membership_expiration_date: int = None,
+        is_read_only: bool = False,
+    ) -> SafeMember:
+        """Add a user or group as a member of a safe, see ``SafeMembers.add``."""
+        body = _add_body(member_name, permissions, member_type, search_in, membership_expiration_date, is_read_only)
+
+        request_url = _members_url(self.vault.base_url, safe_url_id)
+
+        response = await self.vault.post_request(request_url, body=body, endpoint="SafeMembers.add")
+        response.raise_for_status()
+
+        return decode_safe_member(response)
+
+    async def update(
+        self,
+        safe_url_id: str,
+        member_name: str,
+        permissions: SafeMemberPermissions,
+        membership_expiration_date: int = None,
+        is_read_only: bool = False,
+    ) -> SafeMember:
+        """Update the permissions of a member of a safe, see ``SafeMembers.update``."""
+        body = _update_body(permissions, membership_expiration_date, is_read_only)
+
+        request_url = _member_url(self.vault.base_url, safe_url_id, member_name)
+
+        response = await self.vault.put_request(request_url, body=body, endpoint="SafeMembers.update")
+        response.raise_for_status()
+
+        return decode_safe_member(response)
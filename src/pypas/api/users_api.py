@@ -0,0 +1,180 @@
+from typing import AsyncIterator, Iterator, List
+import urllib.parse
+
+from pypas.decoding import decode_user, decode_user_page
+from pypas.model.user import User
+from pypas.utils import remove_none_values_from_dict
+
+
+def _list_url(
+    base_url: str,
+    search: str = None,
+    filter: str = None,
+    extended_details: bool = False,
+    offset: int = None,
+    limit: int = None,
+) -> str:
+    params = {
+        "search": search,
+        "filter": filter,
+        "ExtendedDetails": extended_details,
+        "pageOffset": offset,
+        "pageSize": limit,
+    }
+    params = remove_none_values_from_dict(params)
+
+    return f"{base_url}PasswordVault/API/Users?{urllib.parse.urlencode(params)}"
+
+
+def _get_url(base_url: str, user_id) -> str:
+    return f"{base_url}PasswordVault/API/Users/{user_id}/"
+
+
+def _more(users: List[User], total: int, offset: int, page_size: int) -> bool:
+    """Whether or not a user listing has pages after the one ending at ``offset``."""
+    return len(users) >= page_size and (total is None or offset < total)
+
+
+class Users:
+    """Users API endpoint"""
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    def list(
+        self,
+        search: str = None,
+        filter: str = None,
+        extended_details: bool = False,
+        offset: int = None,
+        limit: int = None,
+    ) -> List[User]:
+        """List one page of the users of the vault.
+
+        Relevant CyberArk Documentation:
+        https://docs.cyberark.com/PAS/12.6/en/Content/WebServices/GetUsers.htm
+
+        Args:
+            search (str): Only users matching the search text are returned.
+            filter (str): A filter on ``componentUser`` or ``userType``, e.g. ``componentUser eq false``.
+            extended_details (bool): Whether or not the group memberships and the authorizations are returned.
+            offset (int): The number of users skipped.
+            limit (int): The maximum number of users returned.
+
+        Returns:
+            List[User]: The users of the page.
+        """
+        request_url = _list_url(self.vault.base_url, search, filter, extended_details, offset, limit)
+
+        response = self.vault.get_request(request_url, endpoint="Users.list")
+        response.raise_for_status()
+
+        return decode_user_page(response)[0]
+
+    def iter_users(
+        self,
+        page_size: int = 1000,
+        search: str = None,
+        filter: str = None,
+        extended_details: bool = False,
+    ) -> Iterator[User]:
+        """Iterate over all users of the vault, fetching one page at a time.
+
+        Args:
+            page_size (int): The number of users requested per page.
+
+        Yields:
+            User: The users in listing order.
+        """
+        offset = 0
+        while True:
+            request_url = _list_url(self.vault.base_url, search, filter, extended_details, offset, page_size)
+
+            response = self.vault.get_request(request_url, endpoint="Users.list")
+            response.raise_for_status()
+
+            users, total = decode_user_page(response)
+            offset += len(users)
+            yield from users
+            if not _more(users, total, offset, page_size):
+                return
+
+    def get(self, user_id) -> User:
+        """Get the details of a user, including the group memberships.
+
+        Relevant CyberArk Documentation:
+        https://docs.cyberark.com/PAS/12.6/en/Content/WebServices/User%20Details.htm
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            User: The user.
+        """
+        response = self.vault.get_request(_get_url(self.vault.base_url, user_id), endpoint="Users.get")
+        response.raise_for_status()
+
+        return decode_user(response)
+
+    def get_many(self, user_ids: List, max_workers: int = 8) -> List[User]:
+        """Get the details of many users in parallel over the vault's shared connection pool.
+
+        Returns:
+            List[User]: The users in input order.
+        """
+        return self.vault.map(self.get, user_ids, max_workers=max_workers)
+
+
+class AsyncUsers:
+    """Users API endpoint of the asyncio client.
+
+    Mirrors ``Users`` with awaitable methods.
+    """
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    async def list(
+        self,
+        search: str = None,
+        filter: str = None,
+        extended_details: bool = False,
+        offset: int = None,
+        limit: int = None,
+    ) -> List[User]:
+        """List one page of the users of the vault, see ``Users.list``."""
+        request_url = _list_url(self.vault.base_url, search, filter, extended_details, offset, limit)
+
+        response = await self.vault.get_request(request_url, endpoint="Users.list")
+        response.raise_for_status()
+
+        return decode_user_page(response)[0]
+
+    async def iter_users(
+        self,
+        page_size: int = 1000,
+        search: str = None,
+        filter: str = None,
+        extended_details: bool = False,
+    ) -> AsyncIterator[User]:
+        """Iterate over all users of the vault, fetching one page at a time, see ``Users.iter_users``."""
+        offset = 0
+        while True:
+            request_url = _list_url(self.vault.base_url, search, filter, extended_details, offset, page_size)
+
+            response = await self.vault.get_request(request_url, endpoint="Users.list")
+            response.raise_for_status()
+
+            users, total = decode_user_page(response)
+            offset += len(users)
+            for user in users:
+                yield user
+            if not _more(users, total, offset, page_size):
+                return
+
+    async def get(self, user_id) -> User:
+        """Get the details of a user, see ``Users.get``."""
+        response = await self.vault.get_request(_get_url(self.vault.base_url, user_id), endpoint="Users.get")
+        response.raise_for_status()
+
+        return decode_user(response)
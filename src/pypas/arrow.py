@@ -0,0 +1,228 @@
+"""Columnar export of vault listings into Arrow record batches and Parquet files. Requires ``pyarrow``.
+
+The JSON pages of the PVWA are decoded straight into Arrow columns, without building a model instance per
+item. The schemas are derived from the model dataclasses:
+
+- nested models become struct columns and lists become list columns,
+- enums become dictionary-encoded string columns,
+- all columns are nullable, since the API omits or nulls fields depending on the request.
+
+Example:
+    with Vault(base_url) as vault:
+        vault.Authentication.logon(username, password)
+        write_parquet("safes.parquet", iter_safe_batches(vault), arrow_schema(Safe))
+"""
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Union
+import typing
+
+from pypas.api.safe_api import _pager as _safes_pager
+from pypas.api.safe_member_api import _pager as _members_pager
+from pypas.api.users_api import _list_url as _users_list_url
+from pypas.api.users_api import _more as _more_users
+from pypas.decoding import decode
+from pypas.model.compact import FIELD_ALIASES
+from pypas.model.safe import Safe
+from pypas.model.safe_member import SafeMember
+from pypas.model.user import User
+
+
+def _unwrap(tp: Any) -> Any:
+    if typing.get_origin(tp) is Union:
+        return next(arg for arg in typing.get_args(tp) if arg is not type(None))
+    return tp
+
+
+def arrow_type(tp: Any) -> Any:
+    """Get the Arrow type of a field annotation of a model."""
+    import pyarrow as pa
+
+    tp = _unwrap(tp)
+    if typing.get_origin(tp) in (list, List):
+        return pa.list_(arrow_type(typing.get_args(tp)[0]))
+    if is_dataclass(tp):
+        return pa.struct([(field.name, arrow_type(field.type)) for field in fields(tp)])
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return pa.dictionary(pa.int32(), pa.string())
+    scalars = {bool: pa.bool_(), int: pa.int64(), float: pa.float64(), str: pa.string()}
+    if tp not in scalars:
+        raise TypeError(f"{tp!r} has no Arrow type.")
+    return scalars[tp]
+
+
+@lru_cache(maxsize=None)
+def arrow_schema(cls: type) -> Any:
+    """Derive the Arrow schema of a model dataclass, one column per field."""
+    import pyarrow as pa
+
+    return pa.schema([(field.name, arrow_type(field.type)) for field in fields(cls)])
+
+
+@lru_cache(maxsize=None)
+def _normalizer(tp: Any) -> Optional[Callable[[Any], Any]]:
+    """Build a function bringing JSON values into the shape of ``arrow_type(tp)``, None if they already are.
+
+    JSON keys differing from the field names are renamed and numeric enum values are replaced by their names.
+    """
+    tp = _unwrap(tp)
+    if typing.get_origin(tp) in (list, List):
+        item = _normalizer(typing.get_args(tp)[0])
+        return None if item is None else lambda values: None if values is None else [item(value) for value in values]
+    if is_dataclass(tp):
+        aliases = FIELD_ALIASES.get(tp, {})
+        children = [(field.name, aliases.get(field.name, field.name), _normalizer(field.type)) for field in fields(tp)]
+        if not aliases and not any(child for _, _, child in children):
+            return None
+
+        def normalize_struct(value: Optional[dict]) -> Optional[dict]:
+            if value is None:
+                return None
+            return {name: child(value.get(key)) if child else value.get(key) for name, key, child in children}
+
+        return normalize_struct
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return lambda value: value if value is None or isinstance(value, str) else tp(value).name
+    return None
+
+
+def record_batch(items: List[dict], cls: type) -> Any:
+    """Convert the JSON representations of models into one Arrow record batch with the schema of the model.
+
+    Args:
+        items (List[dict]): The decoded JSON objects, e.g. the ``value`` of a listing page.
+        cls (type): The model dataclass of the items.
+
+    Returns:
+        pyarrow.RecordBatch: One row per item.
+    """
+    import pyarrow as pa
+
+    aliases = FIELD_ALIASES.get(cls, {})
+    schema = arrow_schema(cls)
+    columns = []
+    for field, schema_field in zip(fields(cls), schema):
+        key = aliases.get(field.name, field.name)
+        values = [item.get(key) for item in items]
+        normalize = _normalizer(field.type)
+        if normalize is not None:
+            values = [normalize(value) for value in values]
+        columns.append(pa.array(values, type=schema_field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def iter_safe_batches(vault, page_size: int = 1000, **filters) -> Iterator[Any]:
+    """List all safes of a vault as Arrow record batches with the schema of ``Safe``, one batch per page.
+
+    Args:
+        vault (Vault): The vault.
+        page_size (int): The number of safes requested per page.
+        **filters: The filters of ``Safes.iter_safes``, e.g. ``search``.
+
+    Yields:
+        pyarrow.RecordBatch: The safes of a page.
+    """
+    pager = _safes_pager(vault.base_url, page_size, **filters)
+    request_url = pager.first()
+    while request_url:
+        response = vault.get_request(request_url, endpoint="Safes.list")
+        response.raise_for_status()
+
+        data = decode(response)
+        items = data["value"] if "value" in data else data["safes"]
+        request_url = pager.next(items, data.get("nextLink"))
+        yield record_batch(items, Safe)
+
+
+def _member_items(vault, safe_url_id: str, page_size: int) -> List[dict]:
+    items: List[dict] = []
+    pager = _members_pager(vault.base_url, safe_url_id, page_size)
+    request_url = pager.first()
+    while request_url:
+        response = vault.get_request(request_url, endpoint="SafeMembers.list")
+        response.raise_for_status()
+
+        data = decode(response)
+        request_url = pager.next(data["value"], data.get("nextLink"))
+        items += data["value"]
+    return items
+
+
+def iter_safe_member_batches(
+    vault,
+    safes: Iterable[Union[str, Safe]],
+    batch_size: int = 10_000,
+    max_concurrency: int = 8,
+    page_size: int = 1000,
+) -> Iterator[Any]:
+    """Fetch the members of many safes concurrently as Arrow record batches with the schema of ``SafeMember``.
+
+    Args:
+        vault (Vault): The vault.
+        safes (Iterable[Union[str, Safe]]): The safes or safeUrlIds.
+        batch_size (int): The number of members per batch, the members of a safe are never split between batches.
+        max_concurrency (int): The maximum number of member listings in flight at once.
+        page_size (int): The number of members requested per page.
+
+    Yields:
+        pyarrow.RecordBatch: The members of consecutive safes, in input order.
+    """
+    safe_url_ids = (safe.safeUrlId if isinstance(safe, Safe) else safe for safe in safes)
+    pending: List[dict] = []
+    for items in vault.imap(
+        lambda safe_url_id: _member_items(vault, safe_url_id, page_size), safe_url_ids, max_concurrency
+    ):
+        pending += items
+        if len(pending) >= batch_size:
+            yield record_batch(pending, SafeMember)
+            pending = []
+    if pending:
+        yield record_batch(pending, SafeMember)
+
+
+def iter_user_batches(vault, page_size: int = 1000, **filters) -> Iterator[Any]:
+    """List all users of a vault as Arrow record batches with the schema of ``User``, one batch per page.
+
+    Args:
+        vault (Vault): The vault.
+        page_size (int): The number of users requested per page.
+        **filters: The filters of ``Users.iter_users``, e.g. ``extended_details``.
+
+    Yields:
+        pyarrow.RecordBatch: The users of a page.
+    """
+    offset = 0
+    while True:
+        request_url = _users_list_url(vault.base_url, offset=offset, limit=page_size, **filters)
+        response = vault.get_request(request_url, endpoint="Users.list")
+        response.raise_for_status()
+
+        data = decode(response)
+        items = data["Users"]
+        offset += len(items)
+        yield record_batch(items, User)
+        if not _more_users(items, data.get("Total"), offset, page_size):
+            return
+
+
+def write_parquet(path: str, batches: Iterable[Any], schema: Any, **options) -> int:
+    """Stream record batches into a Parquet file, one row group per batch.
+
+    Args:
+        path (str): The path of the file.
+        batches (Iterable[pyarrow.RecordBatch]): The batches, consumed one at a time.
+        schema (pyarrow.Schema): The schema of the batches, e.g. ``arrow_schema(Safe)``.
+        **options: Further options of ``pyarrow.parquet.ParquetWriter``, e.g. ``compression``.
+
+    Returns:
+        int: The number of rows written.
+    """
+    import pyarrow.parquet as pq
+
+    rows = 0
+    with pq.ParquetWriter(path, schema, **options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
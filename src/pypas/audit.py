@@ -0,0 +1,220 @@
+"""Streaming audit of the members and permissions of all safes of a vault.
+
+The members of many safes are fetched concurrently and flattened into one row per membership, with one
+column per permission. Rows are written as they arrive, so memory stays flat for any number of safes.
+
+Example:
+    with Vault(base_url) as vault:
+        vault.Authentication.logon(username, password)
+        write_audit(vault, "entitlements.parquet", max_concurrency=16)
+"""
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Union
+import csv
+import json
+import os
+
+from pypas.model.safe import Safe
+from pypas.model.safe_member import SafeMember, SafeMemberPermissions
+
+PERMISSION_COLUMNS: List[str] = [field.name for field in fields(SafeMemberPermissions)]
+AUDIT_COLUMNS: List[str] = ["safe", "member", "memberType", *PERMISSION_COLUMNS, "membershipExpirationDate"]
+
+
+def audit_row(member: SafeMember) -> Dict[str, object]:
+    """Flatten a safe member into an audit row with the columns of ``AUDIT_COLUMNS``."""
+    permissions = member.permissions
+    expiration = member.membershipExpirationDate
+    return {
+        "safe": member.safeUrlId,
+        "member": member.memberName,
+        "memberType": member.memberType.name,
+        **{name: bool(permissions and getattr(permissions, name)) for name in PERMISSION_COLUMNS},
+        "membershipExpirationDate": int(expiration) if expiration not in (None, "") else None,
+    }
+
+
+def iter_audit_rows(
+    vault,
+    safes: Iterable[Union[str, Safe]] = None,
+    max_concurrency: int = 8,
+    page_size: int = 100,
+    on_error: Callable[[str, Exception], None] = None,
+) -> Iterator[Dict[str, object]]:
+    """Fetch the members of many safes concurrently and yield one audit row per membership.
+
+    Args:
+        vault (Vault): The vault to audit.
+        safes (Iterable[Union[str, Safe]]): The safes or safeUrlIds to audit, by default all safes of the vault.
+        max_concurrency (int): The maximum number of member listings in flight at once.
+        page_size (int): The number of members requested per page.
+        on_error (Callable[[str, Exception], None]): Called with the safeUrlId and the exception of a safe whose
+        members could not be listed, the safe is then skipped. By default the exception is raised.
+
+    Yields:
+        Dict[str, object]: The audit rows, grouped by safe in input order.
+    """
+    if safes is None:
+        safes = vault.Safes.iter_safes(page_size=1000, prefetch=True)
+    safe_url_ids = (safe.safeUrlId if isinstance(safe, Safe) else safe for safe in safes)
+
+    def members(safe_url_id: str) -> List[SafeMember]:
+        try:
+            return list(vault.SafeMembers.iter_members(safe_url_id, page_size=page_size))
+        except Exception as ex:
+            if on_error is None:
+                raise
+            on_error(safe_url_id, ex)
+            return []
+
+    for safe_members in vault.imap(members, safe_url_ids, max_concurrency):
+        for member in safe_members:
+            yield audit_row(member)
+
+
+class AuditWriter(ABC):
+    """Base class of the incremental writers of audit rows."""
+
+    @abstractmethod
+    def write(self, row: Dict[str, object]):
+        """Write one audit row."""
+
+    def write_rows(self, rows: Iterable[Dict[str, object]]) -> int:
+        """Write audit rows as they are produced and get their number."""
+        count = 0
+        for row in rows:
+            self.write(row)
+            count += 1
+        return count
+
+    def close(self):
+        """Flush the written rows and close the output."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _TextAuditWriter(AuditWriter):
+    def __init__(self, output: Union[str, IO[str]]):
+        self._owned = isinstance(output, (str, os.PathLike))
+        self.output = open(output, "w", newline="", encoding="utf-8") if self._owned else output
+
+    def close(self):
+        if self._owned:
+            self.output.close()
+        else:
+            self.output.flush()
+
+
+class CsvAuditWriter(_TextAuditWriter):
+    """
+    Writes audit rows as CSV with a header row.
+
+    Args:
+        output (Union[str, IO[str]]): The path of the file, or an open text file.
+    """
+
+    def __init__(self, output: Union[str, IO[str]]):
+        super().__init__(output)
+        self._writer = csv.DictWriter(self.output, fieldnames=AUDIT_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, object]):
+        self._writer.writerow(row)
+
+
+class NdjsonAuditWriter(_TextAuditWriter):
+    """
+    Writes audit rows as newline-delimited JSON objects.
+
+    Args:
+        output (Union[str, IO[str]]): The path of the file, or an open text file.
+    """
+
+    def write(self, row: Dict[str, object]):
+        self.output.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+
+class ParquetAuditWriter(AuditWriter):
+    """
+    Writes audit rows to a Parquet file, one row group per batch. Requires ``pyarrow``.
+
+    Args:
+        path (str): The path of the file.
+        batch_size (int): The number of rows buffered before a row group is written.
+    """
+
+    def __init__(self, path: str, batch_size: int = 10_000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = pa.schema(
+            [
+                ("safe", pa.string()),
+                ("member", pa.string()),
+                ("memberType", pa.dictionary(pa.int8(), pa.string())),
+                *((name, pa.bool_()) for name in PERMISSION_COLUMNS),
+                ("membershipExpirationDate", pa.int64()),
+            ]
+        )
+        self.batch_size = batch_size
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._rows: List[Dict[str, object]] = []
+
+    def write(self, row: Dict[str, object]):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_batch(self._pa.RecordBatch.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+_WRITERS = {"csv": CsvAuditWriter, "ndjson": NdjsonAuditWriter, "jsonl": NdjsonAuditWriter}
+
+
+def open_audit_writer(path: str, file_format: str = None) -> AuditWriter:
+    """Open the writer of an audit file, the format is taken from the file extension by default.
+
+    Args:
+        path (str): The path of the file.
+        file_format (str): One of ``csv``, ``ndjson``, ``jsonl`` and ``parquet``.
+
+    Raises:
+        ValueError: The format is not supported.
+    """
+    file_format = (file_format or os.path.splitext(str(path))[1].lstrip(".")).lower()
+    if file_format == "parquet":
+        return ParquetAuditWriter(path)
+    if file_format not in _WRITERS:
+        raise ValueError(f"Unsupported audit format {file_format!r}, use one of csv, ndjson, jsonl and parquet.")
+    return _WRITERS[file_format](path)
+
+
+def write_audit(
+    vault,
+    path: str,
+    file_format: str = None,
+    safes: Iterable[Union[str, Safe]] = None,
+    max_concurrency: int = 8,
+    page_size: int = 100,
+    on_error: Callable[[str, Exception], None] = None,
+) -> int:
+    """Audit the members of the safes of a vault into a file, see ``iter_audit_rows`` for the arguments.
+
+    Returns:
+        int: The number of rows written.
+    """
+    with open_audit_writer(path, file_format) as writer:
+        return writer.write_rows(iter_audit_rows(vault, safes, max_concurrency, page_size, on_error))
@@ -0,0 +1,238 @@
+"""Credential caches for the Central Credential Provider."""
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING, Callable, Hashable, Iterator, Optional
+import os
+import threading
+import time
+
+from pypas.model.credential import Credential
+
+if TYPE_CHECKING:  # pragma: no cover - sqlite3, json and hashlib are imported by the persistent cache
+    import sqlite3
+
+
+@dataclass
+class _CacheEntry:
+    credential: Credential
+    secret: Optional[bytearray]
+    expires_at: float
+
+    def wipe(self):
+        if self.secret is not None:
+            self.secret[:] = bytes(len(self.secret))
+
+
+class CredentialCache:
+    """
+    Thread-safe TTL and LRU bounded cache of credentials.
+
+    Secrets are held in a mutable buffer and overwritten when an entry expires or is evicted,
+    so the cache does not keep copies of old secrets alive until garbage collection. Expired
+    entries are purged on every read and write, whether or not their key is looked up again. Callers
+    still receive a regular ``Credential`` whose ``Content`` is an immutable ``str``.
+
+    Args:
+        ttl (float): The number of seconds an entry is served from the cache.
+        maxsize (int): The maximum number of entries. The least recently used entry is evicted first.
+        clock (Callable[[], float]): The monotonic clock used for expiry.
+    """
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        # Keys in insertion order, which is expiry order since all entries share the TTL.
+        self._expiry: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(params: dict, certificate_path: str = None) -> tuple:
+        """Build the cache key of a lookup from its normalized query parameters."""
+        return (certificate_path,) + tuple(sorted(params.items()))
+
+    def get(self, key: Hashable) -> Optional[Credential]:
+        """Get a cached credential, or None if it is missing or expired."""
+        with self._lock:
+            self._purge()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            content = entry.secret.decode() if entry.secret is not None else None
+            return replace(entry.credential, Content=content)
+
+    def set(self, key: Hashable, credential: Credential):
+        """Cache a credential for the configured TTL."""
+        secret = bytearray(credential.Content.encode()) if credential.Content is not None else None
+        entry = _CacheEntry(replace(credential, Content=None), secret, self._clock() + self.ttl)
+        with self._lock:
+            self._purge()
+            self._pop(key)
+            self._entries[key] = entry
+            self._expiry[key] = None
+            while len(self._entries) > self.maxsize:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, key: Hashable):
+        """Remove a credential from the cache."""
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        """Remove all credentials from the cache."""
+        with self._lock:
+            for key in list(self._entries):
+                self._pop(key)
+
+    def _purge(self):
+        now = self._clock()
+        while self._expiry:
+            key = next(iter(self._expiry))
+            if self._entries[key].expires_at > now:
+                return
+            self._pop(key)
+
+    def _pop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        self._expiry.pop(key, None)
+        if entry is not None:
+            entry.wipe()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge()
+            return len(self._entries)
+
+
+class PersistentCredentialCache:
+    """
+    Encrypted on-disk cache of credentials, shared by all processes of a user.
+
+    Entries are stored in a SQLite database. SQLite locks the database file, so any number of
+    processes and threads can read and write the cache concurrently. Lookup keys are stored as
+    SHA-256 hashes and credentials are encrypted with Fernet (AES-128-CBC with HMAC-SHA256).
+    Expiry uses the wall clock, as the cache outlives the processes that wrote it.
+
+    The encryption key is kept in the OS keyring and created on first use. Entries that cannot be
+    decrypted, e.g. after the key was rotated, are treated as missing.
+
+    Requires the ``cryptography`` package, and the ``keyring`` package unless ``key`` is given.
+
+    Args:
+        path (str): The path of the database file, created with mode 0600 if missing.
+        ttl (float): The number of seconds an entry is served from the cache.
+        key (bytes): The Fernet key, or None to use the key stored in the OS keyring.
+        keyring_service (str): The keyring service name of the key.
+        clock (Callable[[], float]): The wall clock used for expiry.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 300.0,
+        key: bytes = None,
+        keyring_service: str = "pypas",
+        clock: Callable[[], float] = time.time,
+    ):
+        from cryptography.fernet import Fernet
+
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.ttl = ttl
+        self._clock = clock
+        self._fernet = Fernet(key or self._keyring_key(keyring_service))
+        os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS credentials (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+            )
+
+    def _keyring_key(self, service: str) -> bytes:
+        import keyring
+        from cryptography.fernet import Fernet
+
+        username = f"credential-cache:{self.path}"
+        stored = keyring.get_password(service, username)
+        if stored is None:
+            keyring.set_password(service, username, Fernet.generate_key().decode())
+            # Read back, another process may have stored its key first.
+            stored = keyring.get_password(service, username)
+        return stored.encode()
+
+    @contextmanager
+    def _connect(self) -> Iterator["sqlite3.Connection"]:
+        import sqlite3
+
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def key(params: dict, certificate_path: str = None) -> tuple:
+        """Build the cache key of a lookup from its normalized query parameters."""
+        return CredentialCache.key(params, certificate_path)
+
+    @staticmethod
+    def _digest(key: Hashable) -> str:
+        import hashlib
+
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[Credential]:
+        """Get a cached credential, or None if it is missing, expired or cannot be decrypted."""
+        import json
+
+        from cryptography.fernet import InvalidToken
+
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM credentials WHERE key = ? AND expires_at > ?", (self._digest(key), self._clock())
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return Credential(**json.loads(self._fernet.decrypt(row[0])))
+        except InvalidToken:
+            self.invalidate(key)
+            return None
+
+    def set(self, key: Hashable, credential: Credential):
+        """Cache a credential for the configured TTL and remove expired entries."""
+        import json
+
+        value = self._fernet.encrypt(json.dumps(asdict(credential)).encode())
+        now = self._clock()
+        with self._connect() as connection:
+            connection.execute("DELETE FROM credentials WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "INSERT OR REPLACE INTO credentials (key, value, expires_at) VALUES (?, ?, ?)",
+                (self._digest(key), value, now + self.ttl),
+            )
+
+    def invalidate(self, key: Hashable):
+        """Remove a credential from the cache."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM credentials WHERE key = ?", (self._digest(key),))
+
+    def clear(self):
+        """Remove all credentials from the cache."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM credentials")
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM credentials WHERE expires_at > ?", (self._clock(),)
+            ).fetchone()[0]
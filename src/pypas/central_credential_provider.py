@@ -1,28 +1,172 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from .api.central_credential_provider_api import Credentials
-import httpx
-from httpx import Client
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union
+import threading
+
+from .api.central_credential_provider_api import AsyncCredentials, Credentials
+
+if TYPE_CHECKING:  # pragma: no cover - the transport and httpx are imported on first use
+    import httpx
+
+    from .cache import CredentialCache, PersistentCredentialCache
+    from .instrumentation import Hooks
+    from .resilience import RetryPolicy
+    from .throttle import Throttle
+    from .transport import AsyncTransport, PoolConfig, R, T, Transport
 
 
 @dataclass
 class CentralCredentialProvider:
-    """CentralCredentialProvider model class."""
+    """CentralCredentialProvider model class.
+
+    A provider is safe to share between threads, e.g. by all threads of a web server worker.
+    All threads reuse the pooled connections of one ``httpx.Client`` and one credential cache.
+
+    With ``agent_socket`` set, credential lookups are sent to a local ``pypas agent`` instead of the CCP,
+    which shares its connections and cache with all processes of the host.
+    """
 
     ccp_base_url: str
     ccp_iis_site: str = "AIMWebService"
     ccp_verify_requests: bool = True
     session: httpx.Client = None
+    pool: PoolConfig = None
+    retry: RetryPolicy = None
+    throttle: Throttle = None
+    hooks: Hooks = None
+    cache: Union[CredentialCache, PersistentCredentialCache] = None
+    agent_socket: str = None
 
     def __post_init__(self):
+        if self.agent_socket:
+            from .agent import AgentClient
+
+            self.agent = AgentClient(self.agent_socket)
+        else:
+            self.agent = None
+        self._transport: Optional[Transport] = None
+        self._transport_lock = threading.Lock()
         self.credentials = Credentials(self)
 
-    def get_session(self) -> Client:
-        """Get a session for the CCP."""
-        if self.session:
-            return self.session
+    @property
+    def transport(self) -> Transport:
+        """Get the transport, creating it on first use so that httpx is only imported when needed."""
+        if self._transport is None:
+            with self._transport_lock:
+                if self._transport is None:
+                    from .transport import Transport
+
+                    self._transport = Transport(
+                        base_url=self.ccp_base_url,
+                        verify=self.ccp_verify_requests,
+                        pool=self.pool,
+                        headers={"Content-Type": "application/json"},
+                        client=self.session,
+                        retry=self.retry,
+                        throttle=self.throttle,
+                        hooks=self.hooks,
+                    )
+        return self._transport
+
+    def get_session(self) -> httpx.Client:
+        """Get the pooled session for the CCP.
+
+        The session is shared by all requests and must not be closed by callers, use ``close`` instead.
+        """
+        return self.transport.client
+
+    def get_request(self, url: str, params: dict = None, cert: tuple = None, endpoint: str = None) -> httpx.Response:
+        """Make a GET request to the CCP, optionally authenticating with a client certificate."""
+        return self.transport.request("GET", url, params=params, cert=cert, endpoint=endpoint)
+
+    def map(self, function: Callable[[T], R], items: Iterable[T], max_workers: int = 8) -> List[R]:
+        """Call a function for every item from a pool of threads sharing the CCP's connections.
+
+        Returns the results in input order. The first exception raised by a call is re-raised,
+        use ``Credentials.get_many`` to collect the errors of credential lookups instead.
+        """
+        return self.transport.map(function, items, max_workers)
+
+    def close(self):
+        """Close all pooled connections to the CCP."""
+        if self.agent is not None:
+            self.agent.close()
+        if self._transport is not None:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@dataclass
+class AsyncCentralCredentialProvider:
+    """CentralCredentialProvider model class for asyncio applications.
+
+    All lookups share one pooled ``httpx.AsyncClient``, so many of them can be in flight at once.
+    """
+
+    ccp_base_url: str
+    ccp_iis_site: str = "AIMWebService"
+    ccp_verify_requests: bool = True
+    session: httpx.AsyncClient = None
+    pool: PoolConfig = None
+    retry: RetryPolicy = None
+    throttle: Throttle = None
+    hooks: Hooks = None
+    cache: Union[CredentialCache, PersistentCredentialCache] = None
+    agent_socket: str = None
+
+    def __post_init__(self):
+        if self.agent_socket:
+            from .agent import AsyncAgentClient
+
+            self.agent = AsyncAgentClient(self.agent_socket)
+        else:
+            self.agent = None
+        self._transport: Optional[AsyncTransport] = None
+        self.credentials = AsyncCredentials(self)
+
+    @property
+    def transport(self) -> AsyncTransport:
+        """Get the transport, creating it on first use so that httpx is only imported when needed."""
+        if self._transport is None:
+            from .transport import AsyncTransport
+
+            self._transport = AsyncTransport(
+                base_url=self.ccp_base_url,
+                verify=self.ccp_verify_requests,
+                pool=self.pool,
+                headers={"Content-Type": "application/json"},
+                client=self.session,
+                retry=self.retry,
+                throttle=self.throttle,
+                hooks=self.hooks,
+            )
+        return self._transport
+
+    def get_session(self) -> httpx.AsyncClient:
+        """Get the pooled session for the CCP."""
+        return self.transport.client
+
+    async def get_request(
+        self, url: str, params: dict = None, cert: tuple = None, endpoint: str = None
+    ) -> httpx.Response:
+        """Make a GET request to the CCP, optionally authenticating with a client certificate."""
+        return await self.transport.request("GET", url, params=params, cert=cert, endpoint=endpoint)
+
+    async def close(self):
+        """Close all pooled connections to the CCP."""
+        if self.agent is not None:
+            await self.agent.close()
+        if self._transport is not None:
+            await self._transport.close()
+
+    async def __aenter__(self):
+        return self
 
-        return Client(
-            base_url=self.ccp_base_url,
-            verify=self.ccp_verify_requests,
-            headers={"Content-Type": "application/json"},
-        )
+    async def __aexit__(self, *exc_info):
+        await self.close()
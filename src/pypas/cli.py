@@ -0,0 +1,50 @@
+"""Command line interface of pypas."""
+from typing import List
+import argparse
+import asyncio
+import json
+import logging
+
+
+def _agent(arguments: argparse.Namespace):
+    from pypas.agent import CredentialAgent
+    from pypas.cache import CredentialCache
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider
+
+    prefetch = []
+    if arguments.prefetch:
+        with open(arguments.prefetch) as prefetch_file:
+            prefetch = json.load(prefetch_file)
+
+    ccp = AsyncCentralCredentialProvider(
+        arguments.ccp_url,
+        ccp_iis_site=arguments.iis_site,
+        ccp_verify_requests=not arguments.no_verify,
+        cache=CredentialCache(ttl=arguments.ttl, maxsize=arguments.max_entries),
+    )
+    agent = CredentialAgent(ccp, arguments.socket, prefetch=prefetch, prefetch_interval=arguments.prefetch_interval)
+    try:
+        asyncio.run(agent.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: List[str] = None):
+    """Run the pypas command line."""
+    parser = argparse.ArgumentParser(prog="pypas", description="Python wrapper for CyberArk Core PAS REST-API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    agent = commands.add_parser("agent", help="Serve CCP lookups to local processes over a Unix domain socket.")
+    agent.add_argument("--ccp-url", required=True, help="The base URL of the CCP, e.g. https://ccp.example.com/")
+    agent.add_argument("--socket", required=True, help="The path of the Unix domain socket.")
+    agent.add_argument("--iis-site", default="AIMWebService", help="The IIS site of the CCP.")
+    agent.add_argument("--no-verify", action="store_true", help="Do not verify the certificate of the CCP.")
+    agent.add_argument("--ttl", type=float, default=300.0, help="The seconds a credential is cached.")
+    agent.add_argument("--max-entries", type=int, default=1024, help="The maximum number of cached credentials.")
+    agent.add_argument("--prefetch", help="A JSON file with a list of lookups to keep in the cache.")
+    agent.add_argument("--prefetch-interval", type=float, help="The seconds between refreshes of the prefetch list.")
+    agent.set_defaults(handler=_agent)
+
+    arguments = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    arguments.handler(arguments)
@@ -0,0 +1,264 @@
+"""Response decoding shared by all API endpoints.
+
+Every response body is parsed exactly once. When ``orjson`` or ``msgspec`` is installed it is used
+to parse the body, otherwise the standard library ``json`` module is used. The parser and the model
+classes are imported on the first decode, so importing this module stays cheap.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, fields
+from enum import Enum
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple, Type, TypeVar
+
+if TYPE_CHECKING:  # pragma: no cover - the models are imported on first use
+    from pypas.model.group import Group
+    from pypas.model.safe import Safe
+    from pypas.model.safe_member import SafeMember, SafeMemberPermissions
+    from pypas.model.user import User
+
+E = TypeVar("E", bound=Enum)
+
+_loads: Optional[Callable[[bytes], Any]] = None
+_backend: Optional[str] = None
+
+
+def _load_backend():
+    global _loads, _backend
+    try:
+        import orjson
+
+        _backend, _loads = "orjson", orjson.loads
+    except ImportError:  # pragma: no cover - depends on the installed extras
+        try:
+            import msgspec
+
+            _backend, _loads = "msgspec", msgspec.json.decode
+        except ImportError:
+            import json
+
+            _backend, _loads = "json", json.loads
+
+
+def loads(content: bytes) -> Any:
+    """Parse a JSON document with the backend, which is imported on the first call."""
+    if _loads is None:
+        _load_backend()
+    return _loads(content)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "JSON_BACKEND":
+        if _backend is None:
+            _load_backend()
+        return _backend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def decode(response) -> Any:
+    """Parse the JSON body of a response."""
+    return loads(response.content)
+
+
+def safe_from_dict(data: dict) -> Safe:
+    """Build a safe from its JSON representation."""
+    from pypas.model.safe import Safe, SafeAccount, SafeCreator
+
+    return Safe(
+        safeUrlId=data["safeUrlId"],
+        safeName=data["safeName"],
+        safeNumber=data["safeNumber"],
+        description=data["description"],
+        location=data["location"],
+        creator=SafeCreator(**data["Creator"]),
+        olacEnabled=data["olacEnabled"],
+        managingCPM=data["managingCPM"],
+        numberOfVersionsRetention=data["numberOfVersionsRetention"],
+        numberOfDaysRetention=data["numberOfDaysRetention"],
+        autoPurgeEnabled=data["autoPurgeEnabled"],
+        creationTime=data["creationTime"],
+        lastModificationTime=data["lastModificationTime"],
+        accounts=[SafeAccount(**account) for account in data.get("accounts") or []],
+        isExiredMember=data["isExiredMember"],
+    )
+
+
+def safe_to_dict(safe: Safe) -> dict:
+    """Build the JSON representation of a safe, the inverse of ``safe_from_dict``."""
+    data = asdict(safe)
+    data["Creator"] = data.pop("creator")
+    return data
+
+
+def decode_safe(response) -> Safe:
+    """Decode a response holding a single safe."""
+    return safe_from_dict(decode(response))
+
+
+def decode_safe_page(response) -> Tuple[List[Safe], Optional[str]]:
+    """Decode a page of a safe listing into its safes and the link to the next page."""
+    data = decode(response)
+    items = data["value"] if "value" in data else data["safes"]
+    return [safe_from_dict(safe) for safe in items], data.get("nextLink")
+
+
+@lru_cache(maxsize=None)
+def _permission_fields() -> Tuple[str, ...]:
+    from pypas.model.safe_member import SafeMemberPermissions
+
+    return tuple(field.name for field in fields(SafeMemberPermissions))
+
+
+def permissions_from_dict(data: dict) -> SafeMemberPermissions:
+    """Build safe member permissions from their JSON representation, missing permissions are not granted."""
+    from pypas.model.safe_member import SafeMemberPermissions
+
+    return SafeMemberPermissions(*(bool(data.get(name, False)) for name in _permission_fields()))
+
+
+def safe_member_from_dict(data: dict) -> SafeMember:
+    """Build a safe member from its JSON representation."""
+    from pypas.model.safe_member import SafeMember, SafeMemberType
+
+    return SafeMember(
+        safeUrlId=data.get("safeUrlId"),
+        safeName=data.get("safeName"),
+        safeNumber=data.get("safeNumber"),
+        memberId=data.get("memberId"),
+        memberName=data["memberName"],
+        memberType=SafeMemberType[data["memberType"]],
+        membershipExpirationDate=data.get("membershipExpirationDate"),
+        isExpiredMembershipEnable=data.get("isExpiredMembershipEnable"),
+        isPredefinedUser=data.get("isPredefinedUser"),
+        permissions=permissions_from_dict(data.get("permissions") or {}),
+        isReadOnly=data.get("isReadOnly"),
+    )
+
+
+def decode_safe_member(response) -> SafeMember:
+    """Decode a response holding a single safe member."""
+    return safe_member_from_dict(decode(response))
+
+
+def decode_safe_member_page(response) -> Tuple[List[SafeMember], Optional[str]]:
+    """Decode a page of a safe member listing and the link to the next page, if any."""
+    data = decode(response)
+    return [safe_member_from_dict(member) for member in data["value"]], data.get("nextLink")
+
+
+def _enum(cls: Type[E], value) -> Optional[E]:
+    """Get an enum member from its name, as returned by the API, or from its value."""
+    if value is None:
+        return None
+    return cls[value] if isinstance(value, str) else cls(value)
+
+
+def _flat(cls: type, data: Optional[dict]):
+    """Build a model without nested models or enums, missing fields are None."""
+    return cls(**{field.name: data.get(field.name) for field in fields(cls)}) if data else None
+
+
+def _names(value):
+    """Replace the enum members of a dict built by ``asdict`` with their names."""
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, dict):
+        return {key: _names(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_names(item) for item in value]
+    return value
+
+
+def user_from_dict(data: dict) -> User:
+    """Build a user from its JSON representation, fields missing from a summary are None."""
+    from pypas.model.group import GroupType
+    from pypas.model.user import (
+        User,
+        UserAuthenticationMethod,
+        UserBusinessAddress,
+        UserGroupsMembership,
+        UserInterface,
+        UserInternet,
+        UserPersonalDetails,
+        UserPhones,
+        UserSource,
+    )
+
+    return User(
+        id=data.get("id"),
+        username=data["username"],
+        source=_enum(UserSource, data.get("source")),
+        userType=data.get("userType"),
+        componentUser=data.get("componentUser"),
+        vaultAuthorization=data.get("vaultAuthorization"),
+        location=data.get("location"),
+        enableUser=data.get("enableUser"),
+        changePassOnNextLogon=data.get("changePassOnNextLogon"),
+        expiryDate=data.get("expiryDate"),
+        suspended=data.get("suspended"),
+        lastSuccessfulLoginDate=data.get("lastSuccessfulLoginDate"),
+        unAuthorizedInterfaces=[_enum(UserInterface, item) for item in data.get("unAuthorizedInterfaces") or []],
+        authenticationMethod=[_enum(UserAuthenticationMethod, item) for item in data.get("authenticationMethod") or []],
+        passwordNeverExpires=data.get("passwordNeverExpires"),
+        distinguishedName=data.get("distinguishedName"),
+        description=data.get("description"),
+        businessAddress=_flat(UserBusinessAddress, data.get("businessAddress")),
+        internet=_flat(UserInternet, data.get("internet")),
+        phones=_flat(UserPhones, data.get("phones")),
+        personalDetails=_flat(UserPersonalDetails, data.get("personalDetails")),
+        groupsMembership=[
+            UserGroupsMembership(item.get("groupID"), item.get("groupName"), _enum(GroupType, item.get("groupType")))
+            for item in data.get("groupsMembership") or []
+        ],
+    )
+
+
+def user_to_dict(user: User) -> dict:
+    """Build the JSON representation of a user, the inverse of ``user_from_dict``."""
+    return _names(asdict(user))
+
+
+def decode_user(response) -> User:
+    """Decode a response holding a single user."""
+    return user_from_dict(decode(response))
+
+
+def decode_user_page(response) -> Tuple[List[User], int]:
+    """Decode a page of a user listing into its users and the total number of users."""
+    data = decode(response)
+    return [user_from_dict(user) for user in data["Users"]], data.get("Total")
+
+
+def group_from_dict(data: dict) -> Group:
+    """Build a group from its JSON representation, the members are None unless they were requested."""
+    from pypas.model.group import Group, GroupMember, GroupType
+
+    members = data.get("members")
+    return Group(
+        id=data.get("id"),
+        groupType=_enum(GroupType, data.get("groupType")),
+        groupName=data["groupName"],
+        description=data.get("description"),
+        location=data.get("location"),
+        directory=data.get("directory"),
+        dn=data.get("dn"),
+        members=[GroupMember(member.get("id"), member.get("UserName")) for member in members]
+        if members is not None
+        else None,
+    )
+
+
+def group_to_dict(group: Group) -> dict:
+    """Build the JSON representation of a group, the inverse of ``group_from_dict``."""
+    return _names(asdict(group))
+
+
+def decode_group(response) -> Group:
+    """Decode a response holding a single group."""
+    return group_from_dict(decode(response))
+
+
+def decode_group_page(response) -> Tuple[List[Group], Optional[str]]:
+    """Decode a page of a group listing into its groups and the link to the next page."""
+    data = decode(response)
+    return [group_from_dict(group) for group in data["value"]], data.get("nextLink")
@@ -0,0 +1,213 @@
+"""Incremental mirror of the users and groups of a vault with change detection by content hash."""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Union
+import hashlib
+import json
+import sqlite3
+import time
+
+import httpx
+
+from pypas.decoding import group_from_dict, group_to_dict, user_from_dict, user_to_dict
+from pypas.index import VaultIndex
+from pypas.inventory import ChangeType
+from pypas.model.group import Group
+from pypas.model.user import User
+
+
+def _digest(data: dict) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+@dataclass
+class DirectoryChange:
+    """
+    A change of a user or group detected by ``DirectorySync.sync``.
+
+    Attributes:
+        type (ChangeType): The kind of change.
+
+        id (str): The unique ID of the user or group.
+
+        record (Union[User, Group]): The user with full details or the group with its members, or the last
+        known state of a deleted one.
+    """
+
+    type: ChangeType
+    id: str
+    record: Union[User, Group]
+
+
+def _user_details(vault, user_id) -> Optional[User]:
+    """Get the details of a user, or None if the user was deleted since it was listed."""
+    try:
+        return vault.Users.get(user_id)
+    except httpx.HTTPStatusError as ex:
+        if ex.response.status_code == 404:
+            return None
+        raise
+
+
+class DirectorySync:
+    """
+    Local snapshot of the users and groups of a vault, kept up to date incrementally.
+
+    A sync lists the users in summary pages and hashes every summary. The details of a user, including
+    the group memberships, are only fetched when the user is new or the hash of the summary changed. Groups
+    are listed with their members and re-linked only when their hash changed. A user deleted before their
+    details were fetched counts as deleted. The user-group index is updated with the changes instead of
+    being rebuilt. The snapshot is only updated when both listings completed, so a failed sync never
+    reports users or groups as deleted.
+
+    Args:
+        path (str): The path of the SQLite database, or ``:memory:``.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            for table in ("users", "groups"):
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, hash TEXT, data TEXT)"  # nosec B608
+                )
+            self._connection.execute("CREATE TABLE IF NOT EXISTS sync (id INTEGER PRIMARY KEY, synced_at REAL)")
+        self.index = VaultIndex.build(users=self.users(), groups=self.groups())
+
+    def _hashes(self, table: str) -> Dict[str, str]:
+        return dict(self._connection.execute(f"SELECT id, hash FROM {table}"))  # nosec B608 - fixed table names
+
+    def _record(self, table: str, key: str) -> Optional[dict]:
+        row = self._connection.execute(f"SELECT data FROM {table} WHERE id = ?", (key,)).fetchone()  # nosec B608
+        return json.loads(row[0]) if row else None
+
+    def sync(
+        self,
+        vault,
+        page_size: int = 1000,
+        max_workers: int = 8,
+        on_change: Optional[Callable[[DirectoryChange], None]] = None,
+    ) -> List[DirectoryChange]:
+        """Bring the snapshot and the index up to date with the vault.
+
+        Args:
+            vault (Vault): The vault to mirror.
+            page_size (int): The number of users or groups per page.
+            max_workers (int): The maximum number of user detail requests in flight at once.
+            on_change (Callable[[DirectoryChange], None]): Called for every change after the snapshot was updated.
+
+        Returns:
+            List[DirectoryChange]: The changes since the previous sync, users first.
+        """
+        known_users = self._hashes("users")
+        user_hashes: Dict[str, str] = {}
+        stale = []
+        for summary in vault.Users.iter_users(page_size=page_size):
+            key = str(summary.id)
+            user_hashes[key] = _digest(user_to_dict(summary))
+            if known_users.get(key) != user_hashes[key]:
+                stale.append(summary.id)
+
+        known_groups = self._hashes("groups")
+        group_hashes: Dict[str, str] = {}
+        changed_groups = []
+        for group in vault.Groups.iter_groups(page_size=page_size, include_members=True):
+            key = str(group.id)
+            group_hashes[key] = _digest(group_to_dict(group))
+            if known_groups.get(key) != group_hashes[key]:
+                changed_groups.append(group)
+
+        fetched = vault.map(lambda user_id: _user_details(vault, user_id), stale, max_workers)
+        for user_id, user in zip(stale, fetched):
+            if user is None:
+                del user_hashes[str(user_id)]
+        users = [user for user in fetched if user is not None]
+        changes = [
+            DirectoryChange(
+                ChangeType.MODIFIED if str(user.id) in known_users else ChangeType.ADDED, str(user.id), user
+            )
+            for user in users
+        ]
+        changes += [
+            DirectoryChange(ChangeType.DELETED, key, user_from_dict(self._record("users", key)))
+            for key in known_users.keys() - user_hashes.keys()
+        ]
+        changes += [
+            DirectoryChange(
+                ChangeType.MODIFIED if str(group.id) in known_groups else ChangeType.ADDED, str(group.id), group
+            )
+            for group in changed_groups
+        ]
+        changes += [
+            DirectoryChange(ChangeType.DELETED, key, group_from_dict(self._record("groups", key)))
+            for key in known_groups.keys() - group_hashes.keys()
+        ]
+
+        previous = {(User, str(user.id)): self._record("users", str(user.id)) for user in users}
+        previous.update({(Group, str(group.id)): self._record("groups", str(group.id)) for group in changed_groups})
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO users (id, hash, data) VALUES (?, ?, ?)",
+                [(str(user.id), user_hashes[str(user.id)], json.dumps(user_to_dict(user))) for user in users],
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO groups (id, hash, data) VALUES (?, ?, ?)",
+                [
+                    (str(group.id), group_hashes[str(group.id)], json.dumps(group_to_dict(group)))
+                    for group in changed_groups
+                ],
+            )
+            for change in changes:
+                if change.type is ChangeType.DELETED:
+                    table = "users" if isinstance(change.record, User) else "groups"
+                    self._connection.execute(f"DELETE FROM {table} WHERE id = ?", (change.id,))  # nosec B608
+            self._connection.execute("INSERT OR REPLACE INTO sync (id, synced_at) VALUES (1, ?)", (time.time(),))
+
+        for change in changes:
+            self._apply(change, previous.get((type(change.record), change.id)))
+
+        if on_change is not None:
+            for change in changes:
+                on_change(change)
+        return changes
+
+    def _apply(self, change: DirectoryChange, previous: Optional[dict]):
+        if isinstance(change.record, User):
+            name, remove, add = change.record.username, self.index.remove_user, self.index.add_user
+            previous_name = previous and previous["username"]
+        else:
+            name, remove, add = change.record.groupName, self.index.remove_group, self.index.add_group
+            previous_name = previous and previous["groupName"]
+        if change.type is ChangeType.DELETED:
+            remove(name)
+            return
+        if previous_name and previous_name.casefold() != name.casefold():
+            remove(previous_name)
+        add(change.record)
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        """The Unix time of the last completed sync, or None if the snapshot was never synced."""
+        row = self._connection.execute("SELECT synced_at FROM sync WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def users(self) -> Iterator[User]:
+        """Iterate over the users of the snapshot."""
+        for (data,) in self._connection.execute("SELECT data FROM users ORDER BY id"):
+            yield user_from_dict(json.loads(data))
+
+    def groups(self) -> Iterator[Group]:
+        """Iterate over the groups of the snapshot."""
+        for (data,) in self._connection.execute("SELECT data FROM groups ORDER BY id"):
+            yield group_from_dict(json.loads(data))
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,244 @@
+"""In-memory indexed store of safes, safe members, users and groups for access queries.
+
+Names of members, users, groups and CPMs are matched case-insensitively, like in the vault.
+Permissions are stored as bitmasks, see ``SafeMemberPermissions.to_bitmask``.
+"""
+from collections import defaultdict
+from dataclasses import fields
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pypas.model.group import Group
+from pypas.model.safe import Safe
+from pypas.model.safe_member import SafeMember, SafeMemberPermissions, SafeMemberType
+from pypas.model.user import User
+
+PERMISSION_BITS: Dict[str, int] = {field.name: 1 << bit for bit, field in enumerate(fields(SafeMemberPermissions))}
+
+
+def _name(name: str) -> str:
+    return (name or "").casefold()
+
+
+def _discard(index: dict, key, item):
+    """Remove an item from the set or dict of a key and the key once it has no items left."""
+    items = index.get(key)
+    if items is None:
+        return
+    if isinstance(items, dict):
+        items.pop(item, None)
+    else:
+        items.discard(item)
+    if not items:
+        del index[key]
+
+
+def _permission_bit(permission: str) -> int:
+    try:
+        return PERMISSION_BITS[permission]
+    except KeyError:
+        raise ValueError(f"Unknown safe member permission {permission!r}.") from None
+
+
+class VaultIndex:
+    """
+    Queryable local copy of the access model of a vault.
+
+    Secondary indexes are kept on the managing CPM of safes, the member names of safes, the group
+    memberships of users and every permission bit, so access questions are answered from memory
+    instead of with sequential REST calls.
+    """
+
+    def __init__(self):
+        self.safes: Dict[str, Safe] = {}
+        self.users: Dict[str, User] = {}
+        self.groups: Dict[str, Group] = {}
+        self._safes_by_cpm: Dict[str, Set[str]] = defaultdict(set)
+        self._members_by_safe: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._safes_by_member: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._safes_by_member_type: Dict[Tuple[SafeMemberType, str], Set[str]] = defaultdict(set)
+        self._grants_by_permission: Dict[int, Set[Tuple[str, str]]] = defaultdict(set)
+        self._groups_by_user: Dict[str, Set[str]] = defaultdict(set)
+        self._users_by_group: Dict[str, Set[str]] = defaultdict(set)
+
+    @classmethod
+    def build(
+        cls,
+        safes: Iterable[Safe] = (),
+        members: Iterable[SafeMember] = (),
+        users: Iterable[User] = (),
+        groups: Iterable[Group] = (),
+    ) -> "VaultIndex":
+        """Build an index from the models of a vault."""
+        index = cls()
+        for safe in safes:
+            index.add_safe(safe)
+        for member in members:
+            index.add_member(member)
+        for user in users:
+            index.add_user(user)
+        for group in groups:
+            index.add_group(group)
+        return index
+
+    def add_safe(self, safe: Safe):
+        """Add or replace a safe."""
+        previous = self.safes.get(safe.safeUrlId)
+        if previous is not None:
+            self._safes_by_cpm[_name(previous.managingCPM)].discard(safe.safeUrlId)
+        self.safes[safe.safeUrlId] = safe
+        self._safes_by_cpm[_name(safe.managingCPM)].add(safe.safeUrlId)
+
+    def remove_safe(self, safe_url_id: str):
+        """Remove a safe and all memberships in it."""
+        safe = self.safes.pop(safe_url_id, None)
+        if safe is not None:
+            self._safes_by_cpm[_name(safe.managingCPM)].discard(safe_url_id)
+        for name in list(self._members_by_safe.get(safe_url_id, ())):
+            self.remove_member(safe_url_id, name)
+        self._members_by_safe.pop(safe_url_id, None)
+
+    def add_member(self, member: SafeMember):
+        """Add or replace the membership of a user or group in a safe."""
+        name = _name(member.memberName)
+        self.remove_member(member.safeUrlId, member.memberName)
+        mask = member.permissions.to_bitmask() if member.permissions is not None else 0
+        self._members_by_safe[member.safeUrlId][name] = mask
+        self._safes_by_member[name][member.safeUrlId] = mask
+        self._safes_by_member_type[(member.memberType, name)].add(member.safeUrlId)
+        for bit in PERMISSION_BITS.values():
+            if mask & bit:
+                self._grants_by_permission[bit].add((member.safeUrlId, name))
+
+    def remove_member(self, safe_url_id: str, member_name: str):
+        """Remove the membership of a user or group from a safe."""
+        name = _name(member_name)
+        members = self._members_by_safe.get(safe_url_id)
+        mask = members.pop(name, None) if members is not None else None
+        if mask is None:
+            return
+        if not members:
+            del self._members_by_safe[safe_url_id]
+        _discard(self._safes_by_member, name, safe_url_id)
+        for member_type in SafeMemberType:
+            _discard(self._safes_by_member_type, (member_type, name), safe_url_id)
+        for bit in PERMISSION_BITS.values():
+            if mask & bit:
+                _discard(self._grants_by_permission, bit, (safe_url_id, name))
+
+    def add_user(self, user: User):
+        """Add or replace a user and their group memberships."""
+        name = _name(user.username)
+        self._unlink_user(name)
+        self.users[name] = user
+        for membership in user.groupsMembership or []:
+            self._link(name, _name(membership.groupName))
+
+    def remove_user(self, username: str):
+        """Remove a user and their group memberships."""
+        name = _name(username)
+        self.users.pop(name, None)
+        self._unlink_user(name)
+
+    def add_group(self, group: Group):
+        """Add or replace a group and link its members to it.
+
+        The members of a group without listed members, i.e. ``members`` is None, are kept.
+        """
+        name = _name(group.groupName)
+        self.groups[name] = group
+        if group.members is None:
+            return
+        self._unlink_group(name)
+        for member in group.members:
+            self._link(_name(member.UserName), name)
+
+    def remove_group(self, group_name: str):
+        """Remove a group and the memberships of its users."""
+        name = _name(group_name)
+        self.groups.pop(name, None)
+        self._unlink_group(name)
+
+    def _unlink_user(self, user: str):
+        for group in self._groups_by_user.pop(user, set()):
+            self._users_by_group[group].discard(user)
+
+    def _unlink_group(self, group: str):
+        for user in self._users_by_group.pop(group, set()):
+            self._groups_by_user[user].discard(group)
+
+    def _link(self, user: str, group: str):
+        self._groups_by_user[user].add(group)
+        self._users_by_group[group].add(user)
+
+    def safes_managed_by_cpm(self, cpm: str) -> List[Safe]:
+        """Get the safes managed by a CPM."""
+        return [self.safes[safe_url_id] for safe_url_id in sorted(self._safes_by_cpm.get(_name(cpm), ()))]
+
+    def groups_of(self, username: str) -> Set[str]:
+        """Get the names of the groups of a user, casefolded."""
+        return set(self._groups_by_user.get(_name(username), ()))
+
+    def users_of(self, group_name: str) -> Set[str]:
+        """Get the names of the users of a group, casefolded."""
+        return set(self._users_by_group.get(_name(group_name), ()))
+
+    def permissions(self, safe_url_id: str, member_name: str) -> Optional[SafeMemberPermissions]:
+        """Get the permissions of a direct member of a safe, or None if it is not a member."""
+        mask = self._members_by_safe.get(safe_url_id, {}).get(_name(member_name))
+        return SafeMemberPermissions.from_bitmask(mask) if mask is not None else None
+
+    def safes_with_permission(self, member_name: str, permission: str, include_groups: bool = True) -> List[str]:
+        """Get the safes on which a user or group has a permission.
+
+        Example:
+            index.safes_with_permission("Auditors", "manageSafe")
+
+        Args:
+            member_name (str): The name of the user or group.
+            permission (str): The name of a field of ``SafeMemberPermissions``.
+            include_groups (bool): Whether or not permissions granted to the groups of a user count.
+
+        Returns:
+            List[str]: The safeUrlIds, sorted.
+        """
+        bit = _permission_bit(permission)
+        names = {_name(member_name)}
+        if include_groups:
+            names |= self._groups_by_user.get(_name(member_name), set())
+        return sorted(
+            {
+                safe_url_id
+                for name in names
+                for safe_url_id, mask in self._safes_by_member.get(name, {}).items()
+                if mask & bit
+            }
+        )
+
+    def members_with_permission(self, safe_url_id: str, permission: str, expand_groups: bool = True) -> Set[str]:
+        """Get the members that have a permission on a safe.
+
+        Example:
+            index.members_with_permission("Linux-Root", "retrieveAccounts")
+
+        Args:
+            safe_url_id (str): The safeUrlId of the safe.
+            permission (str): The name of a field of ``SafeMemberPermissions``.
+            expand_groups (bool): Whether or not group members are replaced by the users of the group.
+
+        Returns:
+            Set[str]: The casefolded names of the members.
+        """
+        bit = _permission_bit(permission)
+        members = set()
+        for name, mask in self._members_by_safe.get(safe_url_id, {}).items():
+            if not mask & bit:
+                continue
+            if expand_groups and safe_url_id in self._safes_by_member_type.get((SafeMemberType.Group, name), ()):
+                members |= self._users_by_group.get(name, set())
+            else:
+                members.add(name)
+        return members
+
+    def grants(self, permission: str) -> Set[Tuple[str, str]]:
+        """Get all ``(safeUrlId, member name)`` pairs that grant a permission."""
+        return set(self._grants_by_permission.get(_permission_bit(permission), ()))
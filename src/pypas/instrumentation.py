@@ -0,0 +1,210 @@
+"""Instrumentation hooks for requests to the Vault and the CCP.
+
+A transport reports its events to a ``Hooks`` instance. The default ``Hooks`` ignores all events and
+does not enable request tracing, so instrumentation costs nothing unless it is switched on.
+
+Timings are taken from the trace events of httpcore. Name resolution is not reported separately and
+is part of ``connect``.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional
+import threading
+import time
+
+_FIRST_EVENTS = (
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+)
+_RESPONSE_EVENTS = ("http11.receive_response_headers.complete", "http2.receive_response_headers.complete")
+
+
+@dataclass
+class RequestTiming:
+    """
+    Timings of a single HTTP request in seconds.
+
+    Attributes:
+        endpoint (str): The API endpoint that sent the request, e.g. ``Safes.list``.
+
+        method (str): The HTTP method.
+
+        host (str): The host the request was sent to.
+
+        status (int): The response status code, or None if the request failed.
+
+        pool_wait (float): The time until a pooled connection was available.
+
+        connect (float): The time to resolve the host and establish a new TCP connection, zero for reused connections.
+
+        tls (float): The time of the TLS handshake, zero for reused connections.
+
+        ttfb (float): The time until the response headers were received.
+
+        total (float): The time until the response was returned.
+
+        error (str): The name of the exception raised by the request, if any.
+    """
+
+    endpoint: str
+    method: str
+    host: str
+    status: Optional[int]
+    pool_wait: float
+    connect: float
+    tls: float
+    ttfb: float
+    total: float
+    error: str = None
+
+
+class Tracer:
+    """Collects the httpcore trace events of a request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.events: Dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: dict):
+        self.events.setdefault(event_name, time.perf_counter())
+
+    async def atrace(self, event_name: str, info: dict):
+        """Collect a trace event of the async transport."""
+        self(event_name, info)
+
+    def _span(self, name: str) -> float:
+        started = self.events.get(f"connection.{name}.started")
+        completed = self.events.get(f"connection.{name}.complete")
+        return completed - started if started is not None and completed is not None else 0.0
+
+    def timing(self, endpoint: str, method: str, host: str, status: int = None, error: Exception = None):
+        """Build the timing of the traced request."""
+        ended = time.perf_counter()
+        first = min((self.events[name] for name in _FIRST_EVENTS if name in self.events), default=ended)
+        response = min((self.events[name] for name in _RESPONSE_EVENTS if name in self.events), default=ended)
+        return RequestTiming(
+            endpoint=endpoint or "",
+            method=method,
+            host=host,
+            status=status,
+            pool_wait=first - self.started,
+            connect=self._span("connect_tcp"),
+            tls=self._span("start_tls"),
+            ttfb=response - self.started,
+            total=ended - self.started,
+            error=type(error).__name__ if error is not None else None,
+        )
+
+
+class Hooks:
+    """
+    Receives the instrumentation events of a transport.
+
+    The base class ignores all events. Subclasses set ``enabled`` to have requests traced.
+    """
+
+    enabled = False
+
+    def on_request(self, timing: RequestTiming):
+        """Called after every HTTP request, including retried attempts."""
+
+    def on_cache(self, endpoint: str, hit: bool):
+        """Called after every cache lookup."""
+
+    def on_retry(self, host: str, attempt: int, delay: float):
+        """Called before a request is retried."""
+
+
+class MetricsRecorder(Hooks):
+    """Aggregates the instrumentation events in memory, per endpoint."""
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all metrics."""
+        with self._lock:
+            self.requests: Dict[str, int] = defaultdict(int)
+            self.errors: Dict[str, int] = defaultdict(int)
+            self.seconds: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+            self.cache_hits: Dict[str, int] = defaultdict(int)
+            self.cache_misses: Dict[str, int] = defaultdict(int)
+            self.retries: Dict[str, int] = defaultdict(int)
+
+    def on_request(self, timing: RequestTiming):
+        with self._lock:
+            self.requests[timing.endpoint] += 1
+            if timing.error is not None or (timing.status or 0) >= 500:
+                self.errors[timing.endpoint] += 1
+            seconds = self.seconds[timing.endpoint]
+            for phase in ("pool_wait", "connect", "tls", "ttfb", "total"):
+                seconds[phase] += getattr(timing, phase)
+
+    def on_cache(self, endpoint: str, hit: bool):
+        with self._lock:
+            if hit:
+                self.cache_hits[endpoint] += 1
+            else:
+                self.cache_misses[endpoint] += 1
+
+    def on_retry(self, host: str, attempt: int, delay: float):
+        with self._lock:
+            self.retries[host] += 1
+
+    def summary(self) -> dict:
+        """Get the request count and the mean time of every phase, per endpoint."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": count,
+                    "errors": self.errors[endpoint],
+                    **{f"mean_{phase}": total / count for phase, total in self.seconds[endpoint].items()},
+                }
+                for endpoint, count in self.requests.items()
+            }
+
+
+class OpenTelemetryHooks(Hooks):
+    """
+    Exports the instrumentation events as OpenTelemetry metrics.
+
+    Requires the ``opentelemetry-api`` package.
+
+    Args:
+        meter_provider: The meter provider, or None for the global one.
+    """
+
+    enabled = True
+
+    def __init__(self, meter_provider=None):
+        from opentelemetry import metrics
+
+        meter = (meter_provider or metrics.get_meter_provider()).get_meter("pypas")
+        self._duration = meter.create_histogram("pypas.client.request.duration", unit="s")
+        self._phase = meter.create_histogram("pypas.client.request.phase.duration", unit="s")
+        self._cache = meter.create_counter("pypas.client.cache.lookups")
+        self._retries = meter.create_counter("pypas.client.request.retries")
+
+    def on_request(self, timing: RequestTiming):
+        attributes = {
+            "pypas.endpoint": timing.endpoint,
+            "http.request.method": timing.method,
+            "server.address": timing.host,
+        }
+        if timing.status is not None:
+            attributes["http.response.status_code"] = timing.status
+        if timing.error is not None:
+            attributes["error.type"] = timing.error
+        self._duration.record(timing.total, attributes)
+        for phase in ("pool_wait", "connect", "tls", "ttfb"):
+            self._phase.record(getattr(timing, phase), {**attributes, "pypas.phase": phase})
+
+    def on_cache(self, endpoint: str, hit: bool):
+        self._cache.add(1, {"pypas.endpoint": endpoint, "pypas.cache.hit": hit})
+
+    def on_retry(self, host: str, attempt: int, delay: float):
+        self._retries.add(1, {"server.address": host})
@@ -0,0 +1,156 @@
+"""Incremental mirror of the safes of a vault in a local SQLite snapshot."""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Iterator, List, Optional
+import json
+import sqlite3
+import time
+
+import httpx
+
+from pypas.decoding import safe_from_dict, safe_to_dict
+from pypas.model.safe import Safe
+
+
+class ChangeType(Enum):
+    """The kind of change of a safe between two syncs."""
+
+    ADDED = "added"
+    MODIFIED = "modified"
+    DELETED = "deleted"
+
+
+@dataclass
+class SafeChange:
+    """
+    A change of a safe detected by ``SafeInventory.sync``.
+
+    Attributes:
+        type (ChangeType): The kind of change.
+
+        safeUrlId (str): The unique ID of the safe.
+
+        safe (Safe): The safe with full details, or the last known state of a deleted safe.
+    """
+
+    type: ChangeType
+    safeUrlId: str
+    safe: Safe
+
+
+def _details(vault, safe_url_id: str) -> Optional[Safe]:
+    """Get the details of a safe, or None if it was deleted since it was listed."""
+    try:
+        return vault.Safes.get(safe_url_id, includeAccounts=True)
+    except httpx.HTTPStatusError as ex:
+        if ex.response.status_code == 404:
+            return None
+        raise
+
+
+class SafeInventory:
+    """
+    Local snapshot of all safes of a vault, kept up to date incrementally.
+
+    A sync lists the safes in summary pages and fetches the full details, including accounts, only
+    for safes that are new or whose ``lastModificationTime`` changed since the previous sync.
+    Safes missing from the listing, or deleted before their details were fetched, are removed from
+    the snapshot. The snapshot is only updated when the listing completed, so a failed sync never
+    reports safes as deleted.
+
+    Args:
+        path (str): The path of the SQLite database, or ``:memory:``.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS safes (safeUrlId TEXT PRIMARY KEY, lastModificationTime INTEGER, data TEXT)"
+            )
+            self._connection.execute("CREATE TABLE IF NOT EXISTS sync (id INTEGER PRIMARY KEY, synced_at REAL)")
+
+    def _modification_times(self) -> Dict[str, int]:
+        return dict(self._connection.execute("SELECT safeUrlId, lastModificationTime FROM safes"))
+
+    def sync(
+        self,
+        vault,
+        page_size: int = 1000,
+        max_workers: int = 8,
+        on_change: Optional[Callable[[SafeChange], None]] = None,
+    ) -> List[SafeChange]:
+        """Bring the snapshot up to date with the vault.
+
+        Args:
+            vault (Vault): The vault to mirror.
+            page_size (int): The number of safes per summary page.
+            max_workers (int): The maximum number of detail requests in flight at once.
+            on_change (Callable[[SafeChange], None]): Called for every change after the snapshot was updated.
+
+        Returns:
+            List[SafeChange]: The changes since the previous sync.
+        """
+        known = self._modification_times()
+        seen = set()
+        stale = []
+        for summary in vault.Safes.iter_safes(page_size=page_size, prefetch=True):
+            seen.add(summary.safeUrlId)
+            if known.get(summary.safeUrlId) != summary.lastModificationTime:
+                stale.append(summary.safeUrlId)
+
+        fetched = vault.map(lambda safe_url_id: _details(vault, safe_url_id), stale, max_workers)
+        seen -= {safe_url_id for safe_url_id, safe in zip(stale, fetched) if safe is None}
+        details = [safe for safe in fetched if safe is not None]
+        changes = [
+            SafeChange(ChangeType.MODIFIED if safe.safeUrlId in known else ChangeType.ADDED, safe.safeUrlId, safe)
+            for safe in details
+        ]
+        changes += [
+            SafeChange(ChangeType.DELETED, safe_url_id, self.get(safe_url_id)) for safe_url_id in known.keys() - seen
+        ]
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO safes (safeUrlId, lastModificationTime, data) VALUES (?, ?, ?)",
+                [(safe.safeUrlId, safe.lastModificationTime, json.dumps(safe_to_dict(safe))) for safe in details],
+            )
+            self._connection.executemany(
+                "DELETE FROM safes WHERE safeUrlId = ?",
+                [(change.safeUrlId,) for change in changes if change.type is ChangeType.DELETED],
+            )
+            self._connection.execute("INSERT OR REPLACE INTO sync (id, synced_at) VALUES (1, ?)", (time.time(),))
+
+        if on_change is not None:
+            for change in changes:
+                on_change(change)
+        return changes
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        """The Unix time of the last completed sync, or None if the snapshot was never synced."""
+        row = self._connection.execute("SELECT synced_at FROM sync WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def get(self, safe_url_id: str) -> Optional[Safe]:
+        """Get a safe from the snapshot, or None if it is unknown."""
+        row = self._connection.execute("SELECT data FROM safes WHERE safeUrlId = ?", (safe_url_id,)).fetchone()
+        return safe_from_dict(json.loads(row[0])) if row else None
+
+    def __iter__(self) -> Iterator[Safe]:
+        for (data,) in self._connection.execute("SELECT data FROM safes ORDER BY safeUrlId"):
+            yield safe_from_dict(json.loads(data))
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM safes").fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
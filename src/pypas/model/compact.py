@@ -0,0 +1,169 @@
+"""Compact variants of the model classes for bulk results.
+
+The model dataclasses keep a ``__dict__`` per instance. For large result sets the variants built here
+are considerably smaller:
+
+- ``slotted`` builds a ``__slots__`` dataclass with the same fields, optionally frozen.
+- ``struct`` builds a ``msgspec.Struct`` with the same fields, which requires ``msgspec``.
+
+``decode_list`` decodes a JSON array straight into compact instances. With ``msgspec`` installed it skips
+the intermediate dicts altogether, otherwise it falls back to the stdlib parser.
+"""
+from dataclasses import MISSING, dataclass, fields, is_dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+import typing
+
+from pypas.decoding import loads
+from pypas.model.safe import Safe
+from pypas.model.safe_member import SafeMemberPermissions
+
+# JSON keys that differ from the field name of a model, keyed on the model class.
+FIELD_ALIASES: Dict[type, Dict[str, str]] = {
+    Safe: {"creator": "Creator"},
+}
+
+# The value of fields the API omits or nulls, keyed on the model class, None by default.
+FIELD_DEFAULTS: Dict[type, Any] = {
+    SafeMemberPermissions: False,
+}
+
+
+def _substitute(tp: Any, convert) -> Any:
+    origin = typing.get_origin(tp)
+    if origin in (list, List):
+        return List[_substitute(typing.get_args(tp)[0], convert)]
+    if origin is Union:
+        return Union[tuple(_substitute(arg, convert) for arg in typing.get_args(tp))]
+    return convert(tp)
+
+
+def slotted(cls: type, frozen: bool = False) -> type:
+    """Build a ``__slots__`` variant of a model dataclass.
+
+    Nested models are replaced by their slotted variants as well.
+
+    Args:
+        cls (type): The model dataclass.
+        frozen (bool): Whether or not instances are immutable and hashable.
+
+    Returns:
+        type: The slotted dataclass.
+    """
+    return _slotted(cls, frozen)
+
+
+@lru_cache(maxsize=None)
+def _slotted(cls: type, frozen: bool) -> type:
+    model_fields = fields(cls)
+    if any(field.default is not MISSING or field.default_factory is not MISSING for field in model_fields):
+        raise TypeError(f"{cls.__name__} has field defaults, which __slots__ classes cannot hold.")
+
+    def convert(tp):
+        return _slotted(tp, frozen) if is_dataclass(tp) else tp
+
+    annotations = {field.name: _substitute(field.type, convert) for field in model_fields}
+    namespace = {
+        "_model_class": cls,
+        "__slots__": tuple(annotations),
+        "__annotations__": annotations,
+        "__doc__": cls.__doc__,
+        "__module__": __name__,
+        "__qualname__": f"Slotted{cls.__name__}",
+    }
+    return dataclass(frozen=frozen)(type(f"Slotted{cls.__name__}", (), namespace))
+
+
+def struct(cls: type, frozen: bool = False) -> type:
+    """Build a ``msgspec.Struct`` variant of a model dataclass.
+
+    Nested models are replaced by their struct variants. Enum fields are kept as the raw
+    string returned by the API, and all fields are optional since the API omits or nulls
+    fields depending on the request. Omitted fields take the value of ``FIELD_DEFAULTS``.
+
+    Args:
+        cls (type): The model dataclass.
+        frozen (bool): Whether or not instances are immutable and hashable.
+
+    Returns:
+        type: The struct class.
+    """
+    return _struct(cls, frozen)
+
+
+@lru_cache(maxsize=None)
+def _struct(cls: type, frozen: bool) -> type:
+    import msgspec
+
+    def convert(tp):
+        if is_dataclass(tp):
+            return _struct(tp, frozen)
+        if isinstance(tp, type) and issubclass(tp, Enum):
+            return str
+        return tp
+
+    default = FIELD_DEFAULTS.get(cls)
+    return msgspec.defstruct(
+        f"Struct{cls.__name__}",
+        [(field.name, Optional[_substitute(field.type, convert)], default) for field in fields(cls)],
+        rename=FIELD_ALIASES.get(cls),
+        frozen=frozen,
+        gc=False,
+        module=__name__,
+    )
+
+
+def from_dict(cls: type, data: dict) -> Any:
+    """Build a model instance, or a slotted variant of one, from its JSON representation.
+
+    Fields missing from the JSON take the value of ``FIELD_DEFAULTS``.
+    """
+    model = getattr(cls, "_model_class", cls)
+    aliases = FIELD_ALIASES.get(model, {})
+    default = FIELD_DEFAULTS.get(model)
+    values = {field.name: data.get(aliases.get(field.name, field.name)) for field in fields(cls)}
+    return cls(**{field.name: _convert(field.type, values[field.name], default) for field in fields(cls)})
+
+
+def _convert(tp: Any, value: Any, default: Any = None) -> Any:
+    if value is None:
+        return default
+    origin = typing.get_origin(tp)
+    if origin in (list, List):
+        return [_convert(typing.get_args(tp)[0], item) for item in value]
+    if is_dataclass(tp):
+        return from_dict(tp, value)
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return tp[value] if isinstance(value, str) else tp(value)
+    return value
+
+
+def decode_list(content: bytes, cls: type, key: str = None, compact: str = "slotted") -> list:
+    """Decode a JSON array of models into compact instances.
+
+    Args:
+        content (bytes): The JSON document.
+        cls (type): The model dataclass of the array items.
+        key (str): The key of the array in the document, or None if the document is the array itself.
+        compact (str): ``"slotted"`` for slotted dataclasses or ``"struct"`` for msgspec structs.
+
+    Returns:
+        list: The decoded instances.
+    """
+    if compact == "struct":
+        import msgspec
+
+        item_type = List[struct(cls)]
+        if key is None:
+            return msgspec.json.decode(content, type=item_type)
+        envelope = msgspec.defstruct("Envelope", [(key, item_type)])
+        return getattr(msgspec.json.decode(content, type=envelope), key)
+
+    if compact != "slotted":
+        raise ValueError(f"Unknown compact representation: {compact}")
+
+    data = loads(content)
+    items = data if key is None else data[key]
+    variant = slotted(cls)
+    return [from_dict(variant, item) for item in items]
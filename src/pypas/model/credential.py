@@ -1,8 +1,25 @@
+"""Credential model."""
 from dataclasses import dataclass
 
 
 @dataclass
 class Credential:
+    """
+    A credential retrieved from the Central Credential Provider.
+
+    Attributes:
+        Content (str): The secret of the account.
+
+        UserName (str): The user name of the account.
+
+        Address (str): The address of the account.
+
+        Database (str): The database of the account.
+
+        PasswordChangeInProcess (bool): Whether or not the CPM is currently changing the password.
+        A credential with a password change in process is about to become invalid.
+    """
+
     Content: str
     UserName: str
     Address: str
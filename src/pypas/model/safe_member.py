@@ -1,5 +1,5 @@
 """SafeMember model class."""
-from dataclasses import dataclass
+from dataclasses import astuple, dataclass, fields
 from enum import Enum
 
 
@@ -37,6 +37,19 @@ class SafeMemberPermissions:
     requestsAuthorizationLevel1: bool
     requestsAuthorizationLevel2: bool
 
+    def to_bitmask(self) -> int:
+        """Pack the permissions into an integer, one bit per permission in field order."""
+        mask = 0
+        for bit, granted in enumerate(astuple(self)):
+            if granted:
+                mask |= 1 << bit
+        return mask
+
+    @classmethod
+    def from_bitmask(cls, mask: int) -> "SafeMemberPermissions":
+        """Unpack permissions packed by ``to_bitmask``."""
+        return cls(*(bool(mask >> bit & 1) for bit in range(len(fields(cls)))))
+
 
 @dataclass
 class SafeMember:
@@ -48,7 +61,7 @@ class SafeMember:
     memberId: int
     memberName: str
     memberType: SafeMemberType
-    membershipExpirationDate: str
+    membershipExpirationDate: int
     isExpiredMembershipEnable: bool
     isPredefinedUser: bool
     permissions: SafeMemberPermissions
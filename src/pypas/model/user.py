@@ -105,7 +105,7 @@ class UserGroupsMembership:
 class User:
     """Describes a user with their properties."""
 
-    id: str
+    id: int
     username: str
     source: UserSource
     userType: str
@@ -0,0 +1,255 @@
+"""Declarative bulk provisioning of safes and their members."""
+from dataclasses import dataclass, field, fields
+from enum import Enum
+from typing import Iterable, List, Optional, Union
+import urllib.parse
+
+import httpx
+
+from pypas.api.safe_api import _create_body
+from pypas.model.safe import Safe
+from pypas.model.safe_member import SafeMemberPermissions, SafeMemberType
+
+_PERMISSION_NAMES = [permission.name for permission in fields(SafeMemberPermissions)]
+
+
+@dataclass
+class MemberSpec:
+    """
+    A member to add to a provisioned safe.
+
+    Attributes:
+        member_name (str): The name of the user or group.
+
+        permissions (Union[SafeMemberPermissions, Iterable[str]]): The permissions, or the names of the granted
+        permissions.
+
+        member_type (SafeMemberType): Whether the member is a user or a group.
+
+        search_in (str): The vault or the directory the member is searched in.
+
+        membership_expiration_date (int): The Unix time the membership expires, or None for no expiry.
+    """
+
+    member_name: str
+    permissions: Union[SafeMemberPermissions, Iterable[str]]
+    member_type: SafeMemberType = SafeMemberType.User
+    search_in: str = "Vault"
+    membership_expiration_date: int = None
+
+    def resolved_permissions(self) -> SafeMemberPermissions:
+        """Get the permissions as ``SafeMemberPermissions``."""
+        if isinstance(self.permissions, SafeMemberPermissions):
+            return self.permissions
+        granted = set(self.permissions)
+        return SafeMemberPermissions(*(name in granted for name in _PERMISSION_NAMES))
+
+
+@dataclass
+class SafeSpec:
+    """
+    A safe to provision, the attributes map to the arguments of ``Safes.create``.
+
+    Attributes:
+        members (List[MemberSpec]): The members to add to the safe.
+    """
+
+    name: str
+    description: str = None
+    location: str = None
+    number_of_versions_retention: int = None
+    number_of_days_retention: int = None
+    managing_cpm: str = None
+    olac_enabled: bool = False
+    members: List[MemberSpec] = field(default_factory=list)
+
+
+class ProvisioningStatus(Enum):
+    """The outcome of provisioning a safe or a member."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    EXISTS = "exists"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass
+class MemberResult:
+    """
+    The outcome of adding a member to a safe.
+
+    Attributes:
+        member_name (str): The name of the user or group.
+
+        status (ProvisioningStatus): The outcome.
+
+        error (Exception): The exception of a failed request.
+    """
+
+    member_name: str
+    status: ProvisioningStatus
+    error: Exception = None
+
+
+@dataclass
+class SafeResult:
+    """
+    The outcome of provisioning a safe and its members.
+
+    Attributes:
+        name (str): The name of the safe.
+
+        status (ProvisioningStatus): The outcome of creating the safe.
+
+        safe (Safe): The created or updated safe, None if it already existed and was not updated.
+
+        error (Exception): The exception of a failed request.
+
+        members (List[MemberResult]): The outcomes of adding the members, in the order of the spec.
+    """
+
+    name: str
+    status: ProvisioningStatus
+    safe: Optional[Safe] = None
+    error: Exception = None
+    members: List[MemberResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether or not the safe and all of its members were provisioned."""
+        statuses = [self.status] + [member.status for member in self.members]
+        return not {ProvisioningStatus.FAILED, ProvisioningStatus.SKIPPED} & set(statuses)
+
+
+def validate(specs: Iterable[SafeSpec]) -> List[str]:
+    """Get the problems of a provisioning request without sending any request."""
+    problems = []
+    names = set()
+    for spec in specs:
+        if spec.name.casefold() in names:
+            problems.append(f"{spec.name}: safe is listed more than once.")
+        names.add(spec.name.casefold())
+        try:
+            _create_body(
+                spec.name,
+                number_of_versions_retention=spec.number_of_versions_retention,
+                number_of_days_retention=spec.number_of_days_retention,
+            )
+        except ValueError as ex:
+            problems.append(f"{spec.name}: {ex}")
+        members = set()
+        for member in spec.members:
+            if member.member_name.casefold() in members:
+                problems.append(f"{spec.name}: member {member.member_name} is listed more than once.")
+            members.add(member.member_name.casefold())
+            if not isinstance(member.permissions, SafeMemberPermissions):
+                unknown = sorted(set(member.permissions) - set(_PERMISSION_NAMES))
+                if unknown:
+                    problems.append(f"{spec.name}: member {member.member_name} has unknown permissions {unknown}.")
+    return problems
+
+
+def _conflict(ex: Exception) -> bool:
+    return isinstance(ex, httpx.HTTPStatusError) and ex.response.status_code == 409
+
+
+def _safe_url_id(name: str) -> str:
+    """Get the safeUrlId of a safe from its name, the URL-encoded name like the PVWA returns it."""
+    return urllib.parse.quote(name, safe="")
+
+
+def _provision_safe(vault, spec: SafeSpec, update_existing: bool) -> SafeResult:
+    arguments = dict(
+        description=spec.description,
+        location=spec.location,
+        number_of_versions_retention=spec.number_of_versions_retention,
+        number_of_days_retention=spec.number_of_days_retention,
+        managing_cpm=spec.managing_cpm,
+        olac_enabled=spec.olac_enabled,
+    )
+    try:
+        return SafeResult(spec.name, ProvisioningStatus.CREATED, vault.Safes.create(spec.name, **arguments))
+    except Exception as ex:
+        if not _conflict(ex):
+            return SafeResult(spec.name, ProvisioningStatus.FAILED, error=ex)
+    if not update_existing:
+        return SafeResult(spec.name, ProvisioningStatus.EXISTS)
+    try:
+        return SafeResult(
+            spec.name, ProvisioningStatus.UPDATED, vault.Safes.update(_safe_url_id(spec.name), spec.name, **arguments)
+        )
+    except Exception as ex:
+        return SafeResult(spec.name, ProvisioningStatus.FAILED, error=ex)
+
+
+def _provision_member(vault, safe_url_id: str, member: MemberSpec, update_existing: bool) -> MemberResult:
+    permissions = member.resolved_permissions()
+    try:
+        vault.SafeMembers.add(
+            safe_url_id,
+            member.member_name,
+            permissions,
+            member_type=member.member_type,
+            search_in=member.search_in,
+            membership_expiration_date=member.membership_expiration_date,
+        )
+        return MemberResult(member.member_name, ProvisioningStatus.CREATED)
+    except Exception as ex:
+        if not _conflict(ex):
+            return MemberResult(member.member_name, ProvisioningStatus.FAILED, ex)
+    if not update_existing:
+        return MemberResult(member.member_name, ProvisioningStatus.EXISTS)
+    try:
+        vault.SafeMembers.update(
+            safe_url_id, member.member_name, permissions, membership_expiration_date=member.membership_expiration_date
+        )
+        return MemberResult(member.member_name, ProvisioningStatus.UPDATED)
+    except Exception as ex:
+        return MemberResult(member.member_name, ProvisioningStatus.FAILED, ex)
+
+
+def provision(
+    vault, specs: Iterable[SafeSpec], max_concurrency: int = 8, update_existing: bool = False
+) -> List[SafeResult]:
+    """Create safes and add their members in parallel.
+
+    The whole request is validated before the first request is sent. Safes are created concurrently,
+    then the members of all safes are added concurrently. Provisioning is idempotent: safes and members
+    that already exist are skipped, or updated to match the spec with ``update_existing``. A failure
+    does not abort the batch, it is reported in the result of its safe instead.
+
+    Args:
+        vault (Vault): The vault to provision.
+        specs (Iterable[SafeSpec]): The safes and their members.
+        max_concurrency (int): The maximum number of requests in flight at once.
+        update_existing (bool): Whether or not existing safes and members are updated.
+
+    Raises:
+        ValueError: The request is invalid, nothing was provisioned.
+
+    Returns:
+        List[SafeResult]: One result per safe, in input order.
+    """
+    specs = list(specs)
+    problems = validate(specs)
+    if problems:
+        raise ValueError("Invalid provisioning request:\n" + "\n".join(f"- {problem}" for problem in problems))
+
+    results = vault.map(lambda spec: _provision_safe(vault, spec, update_existing), specs, max_concurrency)
+
+    pending = []
+    for spec, result in zip(specs, results):
+        for member in spec.members:
+            if result.status is ProvisioningStatus.FAILED:
+                result.members.append(MemberResult(member.member_name, ProvisioningStatus.SKIPPED))
+            else:
+                safe_url_id = result.safe.safeUrlId if result.safe is not None else _safe_url_id(spec.name)
+                pending.append((result, safe_url_id, member))
+
+    member_results = vault.map(
+        lambda item: _provision_member(vault, item[1], item[2], update_existing), pending, max_concurrency
+    )
+    for (result, _, _), member_result in zip(pending, member_results):
+        result.members.append(member_result)
+    return results
@@ -0,0 +1,276 @@
+"""Retries, backoff and circuit breaking for requests to the Vault and the CCP."""
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional
+import asyncio
+import datetime
+import random
+import threading
+import time
+
+import httpx
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the circuit breaker of its host is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit breaker for {host} is open, retry in {retry_in:.1f}s.")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of the requests sent.
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one, so during an outage
+    the client adds at most ``ratio`` extra requests per request instead of multiplying the load.
+
+    Args:
+        ratio (float): The number of retries allowed per request.
+        max_tokens (float): The maximum number of retries that can be saved up.
+        min_tokens (float): The number of tokens available initially.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 100, min_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """Record a request."""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take a token for a retry, return False if the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of a single host.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and requests fail fast
+    for ``reset_timeout`` seconds. Afterwards a single trial request is let through, which
+    closes the circuit on success and opens it again on failure.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def open(self) -> bool:
+        """Whether or not the circuit is open."""
+        return self._opened_at is not None
+
+    def before_request(self):
+        """Raise ``CircuitOpenError`` if the request must not be sent."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            retry_in = self._opened_at + self.reset_timeout - self._clock()
+            if retry_in > 0 or self._trial_in_flight:
+                raise CircuitOpenError(self.host, max(retry_in, 0))
+            self._trial_in_flight = True
+
+    def release(self):
+        """Release the trial slot of a request that ended without an outcome, e.g. because it was cancelled."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        """Record a successful request."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Record a failed request."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry and circuit breaker settings of a transport.
+
+    Attributes:
+        max_retries (int): The maximum number of retries of a request.
+
+        backoff_factor (float): The base delay in seconds, doubled with every retry.
+
+        backoff_max (float): The maximum delay in seconds between two attempts, also applied to ``Retry-After``.
+
+        jitter (bool): Whether or not delays are randomized between zero and the computed backoff.
+
+        retry_statuses (FrozenSet[int]): The response status codes that are retried.
+
+        retry_methods (FrozenSet[str]): The idempotent HTTP methods that are retried. Requests of other
+        methods are only retried when the connection could not be established.
+
+        respect_retry_after (bool): Whether or not the ``Retry-After`` header of a response is honored.
+
+        budget (RetryBudget): The retry budget shared by all requests, or None for no budget.
+
+        failure_threshold (int): The number of consecutive failures after which the circuit of a host opens.
+
+        reset_timeout (float): The number of seconds an open circuit refuses requests.
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_max: float = 30.0
+    jitter: bool = True
+    retry_statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    retry_methods: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+    respect_retry_after: bool = True
+    budget: RetryBudget = None
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    _breakers: Dict[str, CircuitBreaker] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Get the circuit breaker of a host."""
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+    def backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        """Get the delay in seconds before the next attempt."""
+        if response is not None and self.respect_retry_after:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_factor * 2**attempt)
+        return random.uniform(0, delay) if self.jitter else delay  # nosec B311 - jitter, not cryptography
+
+    def _retry_delay(
+        self, method: str, attempt: int, response: httpx.Response = None, error: Exception = None
+    ) -> Optional[float]:
+        if attempt >= self.max_retries:
+            return None
+        if error is not None:
+            retryable = method in self.retry_methods or isinstance(error, httpx.ConnectError)
+        else:
+            retryable = method in self.retry_methods and response.status_code in self.retry_statuses
+        if not retryable or (self.budget is not None and not self.budget.withdraw()):
+            return None
+        return self.backoff(attempt, response)
+
+    def _record(self, breaker: CircuitBreaker, response: httpx.Response = None):
+        if response is None or response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def send(
+        self, method: str, host: str, send: Callable[[], httpx.Response], sleep=time.sleep, on_retry=None
+    ) -> httpx.Response:
+        """Send a request to a host with retries.
+
+        ``on_retry`` is called with the host, the attempt number and the delay before every retry.
+        """
+        breaker = self.breaker(host)
+        if self.budget is not None:
+            self.budget.deposit()
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                response = send()
+            except httpx.TransportError as ex:
+                self._record(breaker)
+                delay = self._retry_delay(method, attempt, error=ex)
+                if delay is None:
+                    raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                self._record(breaker, response)
+                delay = self._retry_delay(method, attempt, response=response)
+                if delay is None:
+                    return response
+                response.close()
+            attempt += 1
+            if on_retry is not None:
+                on_retry(host, attempt, delay)
+            sleep(delay)
+
+    async def asend(
+        self,
+        method: str,
+        host: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        sleep=asyncio.sleep,
+        on_retry=None,
+    ) -> httpx.Response:
+        """Send a request to a host with retries from a coroutine."""
+        breaker = self.breaker(host)
+        if self.budget is not None:
+            self.budget.deposit()
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                response = await send()
+            except httpx.TransportError as ex:
+                self._record(breaker)
+                delay = self._retry_delay(method, attempt, error=ex)
+                if delay is None:
+                    raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                self._record(breaker, response)
+                delay = self._retry_delay(method, attempt, response=response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            attempt += 1
+            if on_retry is not None:
+                on_retry(host, attempt, delay)
+            await sleep(delay)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
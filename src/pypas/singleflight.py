@@ -0,0 +1,82 @@
+"""Coalescing of identical concurrent calls, so that only one of them reaches the server."""
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+import threading
+
+if TYPE_CHECKING:  # pragma: no cover - asyncio is imported by the first coroutine
+    import asyncio
+
+R = TypeVar("R")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescing of identical calls.
+
+    While a call for a key is in flight, further calls for the same key wait for it and receive
+    its result or exception instead of running the function again. All callers receive the same
+    result object.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], R]) -> R:
+        """Call a function, or join the call in flight for the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Coalescing of identical calls from the coroutines of an event loop, see ``SingleFlight``.
+
+    The call runs in its own task, so cancelling one waiting coroutine does not cancel the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future"] = {}
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[R]]) -> R:
+        """Await a coroutine function, or join the call in flight for the same key."""
+        import asyncio
+
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(function())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._calls.pop(key) if self._calls.get(key) is done else None)
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,264 @@
+"""Distributed export of the safes, members, accounts and users of a vault into Spark DataFrames.
+
+Requires ``pyspark``. The driver only counts the safes or users. The pages of the listings and the member
+and account fetches of every safe are spread over the partitions, and every executor process logs on once
+and shares one pooled client between its tasks. The schemas of the DataFrames are derived from the model dataclasses.
+
+Example:
+    connection = VaultConnection("https://pvwa.example.com/", username, password)
+    safes = safes_dataframe(spark, connection, num_partitions=64)
+    members = safe_members_dataframe(spark, connection, safes, num_partitions=256)
+    users = users_dataframe(spark, connection, extended_details=True)
+"""
+from dataclasses import dataclass, field, fields, is_dataclass
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union, get_args, get_origin, get_type_hints
+import threading
+
+from pypas.api.authentication_api import AuthMethod
+from pypas.api.safe_api import _list_url
+from pypas.api.users_api import _list_url as _users_list_url
+from pypas.decoding import decode
+from pypas.model.safe import Safe, SafeAccount
+from pypas.model.safe_member import SafeMember
+from pypas.model.user import User
+
+_VAULTS: Dict["VaultConnection", Any] = {}
+_VAULTS_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class VaultConnection:
+    """
+    Picklable description of how executors connect to the vault.
+
+    Attributes:
+        base_url (str): The base URL of the PVWA, with a trailing slash.
+
+        username (str): The user every executor logs on with.
+
+        password (str): The password of the user, it is shipped to the executors with the tasks.
+
+        auth_method (AuthMethod): The authentication method of the user.
+
+        verify_requests (bool): Whether or not the TLS certificate of the PVWA is verified.
+
+        max_workers (int): The number of concurrent requests of every task.
+
+        page_size (int): The number of safes, members or users requested per page.
+    """
+
+    base_url: str
+    username: str = None
+    password: str = field(default=None, repr=False)
+    auth_method: AuthMethod = AuthMethod.CyberArk
+    verify_requests: bool = True
+    max_workers: int = 8
+    page_size: int = 1000
+
+    def vault(self):
+        """Get the vault of this process, logging on with the first call.
+
+        The vault is cached per process, so all tasks of an executor share its connection pool and token.
+        """
+        with _VAULTS_LOCK:
+            vault = _VAULTS.get(self)
+            if vault is None:
+                from pypas.vault import Vault
+
+                vault = Vault(self.base_url, verify_requests=self.verify_requests)
+                if self.username is not None:
+                    vault.Authentication.logon(self.username, self.password, auth_method=self.auth_method)
+                _VAULTS[self] = vault
+            return vault
+
+
+def _spark_type(annotation) -> Any:
+    from pyspark.sql import types
+
+    if get_origin(annotation) is Union:
+        annotation = next(argument for argument in get_args(annotation) if argument is not type(None))
+    if get_origin(annotation) in (list, List):
+        return types.ArrayType(_spark_type(get_args(annotation)[0]))
+    if is_dataclass(annotation):
+        return schema_of(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return types.StringType()
+    scalars = {
+        bool: types.BooleanType(),
+        int: types.LongType(),
+        float: types.DoubleType(),
+        str: types.StringType(),
+    }
+    if annotation not in scalars:
+        raise TypeError(f"{annotation!r} has no Spark type.")
+    return scalars[annotation]
+
+
+def schema_of(cls: type, extra: Iterable[Tuple[str, Any]] = ()) -> Any:
+    """Derive a Spark ``StructType`` from a model dataclass.
+
+    Nested dataclasses become structs, lists become arrays and enums become the names of their members.
+    All fields are nullable.
+
+    Args:
+        cls (type): The dataclass.
+        extra (Iterable[Tuple[str, Any]]): Names and Spark types of leading columns added before the fields.
+    """
+    from pyspark.sql import types
+
+    hints = get_type_hints(cls)
+    columns = [*extra, *((field.name, _spark_type(hints[field.name])) for field in fields(cls))]
+    return types.StructType([types.StructField(name, spark_type, nullable=True) for name, spark_type in columns])
+
+
+def to_row(value: Any) -> Any:
+    """Convert a model instance to the nested tuples of a row of ``schema_of(type(value))``."""
+    if is_dataclass(value):
+        return tuple(to_row(getattr(value, field.name)) for field in fields(value))
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, list):
+        return [to_row(item) for item in value]
+    return value
+
+
+def _safe_count(vault) -> int:
+    response = vault.get_request(_list_url(vault.base_url, 1, 0), endpoint="Safes.list")
+    response.raise_for_status()
+    return decode(response)["count"]
+
+
+def _list_safes(connection: VaultConnection, offsets: Iterator[int]) -> Iterator[tuple]:
+    vault = connection.vault()
+
+    def page(offset: int) -> List[Safe]:
+        return vault.Safes.list(limt=connection.page_size, offset=offset)
+
+    for safes in vault.imap(page, offsets, connection.max_workers):
+        for safe in safes:
+            yield to_row(safe)
+
+
+def _user_count(vault) -> int:
+    response = vault.get_request(_users_list_url(vault.base_url, offset=0, limit=1), endpoint="Users.list")
+    response.raise_for_status()
+    return decode(response)["Total"]
+
+
+def _list_users(connection: VaultConnection, offsets: Iterator[int], extended_details: bool) -> Iterator[tuple]:
+    vault = connection.vault()
+
+    def page(offset: int) -> List[User]:
+        return vault.Users.list(extended_details=extended_details, offset=offset, limit=connection.page_size)
+
+    for users in vault.imap(page, offsets, connection.max_workers):
+        for user in users:
+            yield to_row(user)
+
+
+def _list_members(connection: VaultConnection, safe_url_ids: Iterator[str]) -> Iterator[tuple]:
+    vault = connection.vault()
+
+    def members(safe_url_id: str) -> List[SafeMember]:
+        return list(vault.SafeMembers.iter_members(safe_url_id, page_size=connection.page_size))
+
+    for safe_members in vault.imap(members, safe_url_ids, connection.max_workers):
+        for member in safe_members:
+            yield to_row(member)
+
+
+def _list_accounts(connection: VaultConnection, safe_url_ids: Iterator[str]) -> Iterator[tuple]:
+    vault = connection.vault()
+
+    def accounts(safe_url_id: str) -> Tuple[str, List[SafeAccount]]:
+        return safe_url_id, vault.Safes.get(safe_url_id, includeAccounts=True).accounts or []
+
+    for safe_url_id, safe_accounts in vault.imap(accounts, safe_url_ids, connection.max_workers):
+        for account in safe_accounts:
+            yield (safe_url_id, *to_row(account))
+
+
+def safes_dataframe(spark, connection: VaultConnection, num_partitions: int = None):
+    """Get all safes of the vault as a DataFrame with the schema of ``Safe``.
+
+    The driver requests the number of safes, then every partition lists a share of the pages.
+
+    Args:
+        spark (SparkSession): The Spark session.
+        connection (VaultConnection): How the driver and the executors connect to the vault.
+        num_partitions (int): The number of partitions, by default the default parallelism of the session.
+
+    Returns:
+        DataFrame: One row per safe.
+    """
+    offsets = list(range(0, _safe_count(connection.vault()), connection.page_size))
+    num_partitions = max(1, min(num_partitions or spark.sparkContext.defaultParallelism, len(offsets)))
+    rows = spark.sparkContext.parallelize(offsets, num_partitions).mapPartitions(
+        lambda partition: _list_safes(connection, partition)
+    )
+    return spark.createDataFrame(rows, schema_of(Safe))
+
+
+def users_dataframe(spark, connection: VaultConnection, extended_details: bool = False, num_partitions: int = None):
+    """Get all users of the vault as a DataFrame with the schema of ``User``.
+
+    The driver requests the number of users, then every partition lists a share of the pages.
+
+    Args:
+        spark (SparkSession): The Spark session.
+        connection (VaultConnection): How the driver and the executors connect to the vault.
+        extended_details (bool): Whether or not the group memberships and the authorizations are listed.
+        num_partitions (int): The number of partitions, by default the default parallelism of the session.
+
+    Returns:
+        DataFrame: One row per user.
+    """
+    offsets = list(range(0, _user_count(connection.vault()), connection.page_size))
+    num_partitions = max(1, min(num_partitions or spark.sparkContext.defaultParallelism, len(offsets)))
+    rows = spark.sparkContext.parallelize(offsets, num_partitions).mapPartitions(
+        lambda partition: _list_users(connection, partition, extended_details)
+    )
+    return spark.createDataFrame(rows, schema_of(User))
+
+
+def safe_members_dataframe(spark, connection: VaultConnection, safes=None, num_partitions: int = None):
+    """Get the members of many safes as a DataFrame with the schema of ``SafeMember``.
+
+    Args:
+        spark (SparkSession): The Spark session.
+        connection (VaultConnection): How the driver and the executors connect to the vault.
+        safes (Union[DataFrame, Iterable[Union[str, Safe]]]): A DataFrame with a ``safeUrlId`` column, safes or
+        safeUrlIds, by default all safes of the vault.
+        num_partitions (int): The number of partitions, by default the default parallelism of the session.
+
+    Returns:
+        DataFrame: One row per membership.
+    """
+    rows = _fan_out(spark, connection, safes, num_partitions, _list_members)
+    return spark.createDataFrame(rows, schema_of(SafeMember))
+
+
+def safe_accounts_dataframe(spark, connection: VaultConnection, safes=None, num_partitions: int = None):
+    """Get the accounts of many safes as a DataFrame with a ``safeUrlId`` column and the schema of ``SafeAccount``.
+
+    See ``safe_members_dataframe`` for the arguments.
+    """
+    from pyspark.sql import types
+
+    rows = _fan_out(spark, connection, safes, num_partitions, _list_accounts)
+    return spark.createDataFrame(rows, schema_of(SafeAccount, [("safeUrlId", types.StringType())]))
+
+
+def _fan_out(spark, connection: VaultConnection, safes, num_partitions: int, fetch):
+    if safes is None:
+        safes = safes_dataframe(spark, connection, num_partitions)
+    if hasattr(safes, "rdd"):
+        safe_url_ids = safes.select("safeUrlId").rdd.map(lambda row: row.safeUrlId)
+        if num_partitions:
+            safe_url_ids = safe_url_ids.repartition(num_partitions)
+    else:
+        safe_url_ids = [safe.safeUrlId if isinstance(safe, Safe) else safe for safe in safes]
+        num_partitions = max(1, min(num_partitions or spark.sparkContext.defaultParallelism, len(safe_url_ids)))
+        safe_url_ids = spark.sparkContext.parallelize(safe_url_ids, num_partitions)
+    return safe_url_ids.mapPartitions(lambda partition: fetch(connection, partition))
@@ -0,0 +1,493 @@
+"""Local stand-in for the PVWA and the AIMWebService, for offline tests and benchmarks.
+
+The server implements the subset of the REST API used by pypas with synthetic data:
+
+- ``POST /PasswordVault/api/auth/<method>/Logon/`` returns a new session token.
+- ``GET /PasswordVault/API/Safes`` lists safes by ``offset`` and ``limit`` with a ``nextLink``.
+- ``POST /PasswordVault/API/Safes`` creates a safe, 409 if it exists.
+- ``GET /PasswordVault/API/Safes/<safeUrlId>/`` returns a single safe, ``PUT`` updates it.
+- ``GET /PasswordVault/API/Safes/<safeUrlId>/Members/`` lists the members of a safe by ``offset`` and ``limit``.
+- ``POST /PasswordVault/API/Safes/<safeUrlId>/Members/`` adds a member, 409 if it exists.
+- ``PUT /PasswordVault/API/Safes/<safeUrlId>/Members/<memberName>/`` updates a member.
+- ``GET /PasswordVault/API/Users`` lists users by ``pageOffset`` and ``pageSize``, ``GET .../Users/<id>/`` returns one.
+- ``GET /PasswordVault/API/UserGroups`` lists groups by ``offset`` and ``limit``, ``GET .../<id>/`` returns one.
+- ``GET /AIMWebService/api/Accounts`` returns a credential.
+
+Latency, error rate and payload size are configurable.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+import json
+import random
+import re
+import ssl
+import threading
+import time
+
+
+@dataclass
+class MockServerConfig:
+    """
+    Behavior of the mock server.
+
+    Attributes:
+        latency (float): The number of seconds every request is delayed.
+
+        error_rate (float): The fraction of requests answered with 503.
+
+        payload_size (int): The number of padding characters added to every safe and credential.
+
+        number_of_safes (int): The number of safes in the vault.
+
+        require_auth (bool): Whether or not PVWA requests without a session token are rejected with 401.
+
+        seed (int): The seed of the error generator, or None for a random seed.
+
+        members_per_safe (int): The number of synthetic members of every numbered safe.
+
+        number_of_users (int): The number of users, user ``n`` is a member of group ``n % number_of_groups``.
+
+        number_of_groups (int): The number of user groups in the vault.
+    """
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    payload_size: int = 0
+    number_of_safes: int = 100
+    require_auth: bool = False
+    seed: int = None
+    members_per_safe: int = 0
+    number_of_users: int = 0
+    number_of_groups: int = 1
+
+
+def mock_safe_member(safe_url_id: str, number: int) -> dict:
+    """Build the JSON representation of a synthetic safe member, every fourth member is a group."""
+    group = number % 4 == 3
+    return {
+        "safeUrlId": safe_url_id,
+        "safeName": safe_url_id,
+        "memberId": number + 1,
+        "memberName": f"group{number}" if group else f"user{number}",
+        "memberType": "Group" if group else "User",
+        "membershipExpirationDate": None,
+        "isExpiredMembershipEnable": False,
+        "isPredefinedUser": False,
+        "isReadOnly": False,
+        "permissions": {
+            "useAccounts": True,
+            "listAccounts": True,
+            "retrieveAccounts": number % 2 == 0,
+            "viewSafeMembers": group,
+            "manageSafe": number == 0,
+        },
+    }
+
+
+def mock_safe(number: int, payload_size: int = 0) -> dict:
+    """Build the JSON representation of a synthetic safe."""
+    return {
+        "safeUrlId": f"safe{number}",
+        "safeName": f"safe{number}",
+        "safeNumber": number,
+        "description": "x" * payload_size,
+        "location": "\\",
+        "Creator": {"id": "1", "name": "Administrator"},
+        "olacEnabled": False,
+        "managingCPM": "PasswordManager",
+        "numberOfVersionsRetention": None,
+        "numberOfDaysRetention": 7,
+        "autoPurgeEnabled": False,
+        "creationTime": 1700000000,
+        "lastModificationTime": 1700000000,
+        "accounts": [],
+        "isExiredMember": False,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def setup(self):
+        super().setup()
+        self.server.mock.connected()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None):
+        content = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _handle(self, method: str):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        route = mock.route(method, url.path)
+        mock.record(route)
+        if mock.config.latency:
+            time.sleep(mock.config.latency)
+        if mock.failing():
+            return self._send(503, {"ErrorCode": "PASWS000E", "ErrorMessage": "Service unavailable"})
+        if route is None:
+            return self._send(404, {"ErrorCode": "PASWS001E", "ErrorMessage": "Not found"})
+        pvwa = not route.startswith(("Authentication", "Credentials"))
+        if pvwa and mock.config.require_auth and not mock.valid_token(self.headers):
+            return self._send(401, {"ErrorCode": "PASWS013E", "ErrorMessage": "Invalid session token"})
+        return self._send(*getattr(mock, route.replace(".", "_"))(url.path, query, body))
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockServer"
+
+
+class MockServer:
+    """
+    Threaded local PVWA and AIMWebService.
+
+    Use it as a context manager, the server listens on a free port of the loopback interface.
+
+    Args:
+        config (MockServerConfig): The behavior of the server.
+        ssl_context (ssl.SSLContext): A server context to serve HTTPS, e.g. requiring client certificates.
+    """
+
+    def __init__(self, config: MockServerConfig = None, ssl_context: ssl.SSLContext = None):
+        self.config = config or MockServerConfig()
+        self.ssl_context = ssl_context
+        self.requests: Counter = Counter()
+        self.logons = 0
+        self.connections = 0
+        self.modified: Dict[int, int] = {}
+        self.deleted: Set[int] = set()
+        self.created: Dict[str, dict] = {}
+        self.members: Dict[Tuple[str, str], dict] = {}
+        self.user_changes: Dict[int, dict] = {}
+        self.user_groups: Dict[int, int] = {}
+        self.deleted_users: Set[int] = set()
+        self._random = random.Random(self.config.seed)  # nosec B311 - simulated errors, not cryptography
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server, with a trailing slash."""
+        scheme = "https" if self.ssl_context else "http"
+        host, port = self._server.server_address[:2]
+        return f"{scheme}://{host}:{port}/"
+
+    def start(self) -> "MockServer":
+        """Start serving in a background thread."""
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.mock = self
+        if self.ssl_context is not None:
+            self._server.socket = self.ssl_context.wrap_socket(self._server.socket, server_side=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def route(self, method: str, path: str) -> Optional[str]:
+        """Get the name of the route of a request."""
+        if method == "POST" and re.fullmatch(r"/PasswordVault/api/auth/\w+/Logon/?", path, re.IGNORECASE):
+            return "Authentication.logon"
+        if method == "GET" and re.fullmatch(r"/PasswordVault/API/Safes/?", path, re.IGNORECASE):
+            return "Safes.list"
+        if method == "POST" and re.fullmatch(r"/PasswordVault/API/Safes/?", path, re.IGNORECASE):
+            return "Safes.create"
+        if method == "GET" and re.fullmatch(r"/PasswordVault/API/Safes/[^/]+/?", path, re.IGNORECASE):
+            return "Safes.get"
+        if method == "PUT" and re.fullmatch(r"/PasswordVault/API/Safes/[^/]+/?", path, re.IGNORECASE):
+            return "Safes.update"
+        if method == "GET" and re.fullmatch(r"/PasswordVault/API/Safes/[^/]+/Members/?", path, re.IGNORECASE):
+            return "SafeMembers.list"
+        if method == "POST" and re.fullmatch(r"/PasswordVault/API/Safes/[^/]+/Members/?", path, re.IGNORECASE):
+            return "SafeMembers.add"
+        if method == "PUT" and re.fullmatch(r"/PasswordVault/API/Safes/[^/]+/Members/[^/]+/?", path, re.IGNORECASE):
+            return "SafeMembers.update"
+        if method == "GET" and re.fullmatch(r"/PasswordVault/API/Users/?", path, re.IGNORECASE):
+            return "Users.list"
+        if method == "GET" and re.fullmatch(r"/PasswordVault/API/Users/\d+/?", path, re.IGNORECASE):
+            return "Users.get"
+        if method == "GET" and re.fullmatch(r"/PasswordVault/API/UserGroups/?", path, re.IGNORECASE):
+            return "Groups.list"
+        if method == "GET" and re.fullmatch(r"/PasswordVault/API/UserGroups/\d+/?", path, re.IGNORECASE):
+            return "Groups.get"
+        if method == "GET" and re.fullmatch(r"/AIMWebService/api/Accounts/?", path, re.IGNORECASE):
+            return "Credentials.get_credential"
+        return None
+
+    def connected(self):
+        """Count a new client connection."""
+        with self._lock:
+            self.connections += 1
+
+    def record(self, route: Optional[str]):
+        """Count a request of a route."""
+        with self._lock:
+            self.requests[route or "unknown"] += 1
+
+    def failing(self) -> bool:
+        """Whether or not the current request fails."""
+        with self._lock:
+            return self._random.random() < self.config.error_rate
+
+    def valid_token(self, headers) -> bool:
+        """Whether or not the request carries a token issued by the server."""
+        return (headers.get("Authorization") or "").startswith("token-")
+
+    def Authentication_logon(self, path: str, query: dict, body: dict):
+        with self._lock:
+            self.logons += 1
+            return 200, f"token-{self.logons}"
+
+    def modify(self, number: int, modification_time: int):
+        """Change the last modification time of a safe."""
+        self.modified[number] = modification_time
+
+    def delete(self, number: int):
+        """Delete a safe."""
+        self.deleted.add(number)
+
+    def _safe_numbers(self) -> List[int]:
+        return [number for number in range(self.config.number_of_safes) if number not in self.deleted]
+
+    def _safe(self, number: int) -> dict:
+        safe = mock_safe(number, self.config.payload_size)
+        safe["lastModificationTime"] = self.modified.get(number, safe["lastModificationTime"])
+        return safe
+
+    def Safes_list(self, path: str, query: dict, body: dict):
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 25))
+        numbers = self._safe_numbers()
+        end = min(offset + limit, len(numbers))
+        next_link = f"API/Safes?offset={end}&limit={limit}" if end < len(numbers) else ""
+        safes = [self._safe(number) for number in numbers[offset:end]]
+        return 200, {"value": safes, "count": len(numbers), "nextLink": next_link}
+
+    def Safes_get(self, path: str, query: dict, body: dict):
+        match = re.search(r"safe(\d+)/?$", path)
+        number = int(match.group(1)) if match else None
+        if number is None or number >= self.config.number_of_safes or number in self.deleted:
+            return 404, {"ErrorCode": "SFWS0007", "ErrorMessage": "Safe not found"}
+        safe = self._safe(number)
+        if query.get("includeAccounts", "").lower() == "true":
+            safe["accounts"] = [{"id": f"{number}_1", "name": f"account{number}"}]
+        return 200, safe
+
+    def _exists(self, name: str) -> bool:
+        match = re.fullmatch(r"safe(\d+)", name)
+        existing = match is not None and int(match.group(1)) < self.config.number_of_safes
+        return name in self.created or (existing and int(match.group(1)) not in self.deleted)
+
+    def _created_safe(self, body: dict) -> dict:
+        safe = mock_safe(0, self.config.payload_size)
+        safe.update(
+            safeUrlId=quote(body["SafeName"], safe=""),
+            safeName=body["SafeName"],
+            safeNumber=1000000 + len(self.created),
+            description=body.get("Description", ""),
+            managingCPM=body.get("ManagingCPM", ""),
+            numberOfVersionsRetention=body.get("NumberOfVersionsRetention"),
+            numberOfDaysRetention=body.get("NumberOfDaysRetention"),
+        )
+        return safe
+
+    def Safes_create(self, path: str, query: dict, body: dict):
+        with self._lock:
+            if self._exists(body["SafeName"]):
+                return 409, {"ErrorCode": "SFWS0002", "ErrorMessage": "Safe already exists"}
+            self.created[body["SafeName"]] = self._created_safe(body)
+            return 201, self.created[body["SafeName"]]
+
+    def Safes_update(self, path: str, query: dict, body: dict):
+        name = unquote(path.rstrip("/").rsplit("/", 1)[-1])
+        with self._lock:
+            if not self._exists(name):
+                return 404, {"ErrorCode": "SFWS0007", "ErrorMessage": "Safe not found"}
+            self.created[name] = self._created_safe(body)
+            return 200, self.created[name]
+
+    def SafeMembers_list(self, path: str, query: dict, body: dict):
+        safe = unquote(path.rstrip("/").split("/")[-2])
+        if not self._exists(safe):
+            return 404, {"ErrorCode": "SFWS0007", "ErrorMessage": "Safe not found"}
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 25))
+        members = (
+            []
+            if safe in self.created
+            else [mock_safe_member(safe, number) for number in range(self.config.members_per_safe)]
+        )
+        with self._lock:
+            members += [member for (name, _), member in self.members.items() if name == safe]
+        if "filter" in query:
+            member_type = query["filter"].rsplit(" ", 1)[-1]
+            members = [member for member in members if member["memberType"] == member_type]
+        end = min(offset + limit, len(members))
+        next_link = f"API/Safes/{safe}/Members?offset={end}&limit={limit}" if end < len(members) else ""
+        return 200, {"value": members[offset:end], "count": len(members), "nextLink": next_link}
+
+    def SafeMembers_add(self, path: str, query: dict, body: dict):
+        safe = unquote(path.rstrip("/").split("/")[-2])
+        key = (safe, body["memberName"].casefold())
+        with self._lock:
+            if not self._exists(safe):
+                return 404, {"ErrorCode": "SFWS0007", "ErrorMessage": "Safe not found"}
+            if key in self.members:
+                return 409, {"ErrorCode": "SFWS0012", "ErrorMessage": "Member already exists"}
+            self.members[key] = {**body, "safeUrlId": safe, "safeName": safe}
+            return 201, self.members[key]
+
+    def SafeMembers_update(self, path: str, query: dict, body: dict):
+        safe, member = (unquote(segment) for segment in path.rstrip("/").split("/")[-3::2])
+        key = (safe, member.casefold())
+        with self._lock:
+            if key not in self.members:
+                return 404, {"ErrorCode": "SFWS0011", "ErrorMessage": "Member not found"}
+            self.members[key] = {**self.members[key], **body}
+            return 200, self.members[key]
+
+    def update_user(self, number: int, **changes):
+        """Change properties of a user."""
+        self.user_changes.setdefault(number, {}).update(changes)
+
+    def move_user(self, number: int, group: int):
+        """Move a user into another group."""
+        self.user_groups[number] = group
+
+    def delete_user(self, number: int):
+        """Delete a user."""
+        self.deleted_users.add(number)
+
+    def _user_numbers(self) -> List[int]:
+        return [number for number in range(self.config.number_of_users) if number not in self.deleted_users]
+
+    def _group_of(self, number: int) -> int:
+        return self.user_groups.get(number, number % self.config.number_of_groups)
+
+    def _user(self, number: int, details: bool) -> dict:
+        user = {
+            "id": number + 1,
+            "username": f"user{number}",
+            "source": "CyberArk",
+            "userType": "EPVUser",
+            "componentUser": False,
+            "location": "\\",
+            "enableUser": True,
+            "suspended": False,
+            "personalDetails": {"firstName": "User", "middleName": "", "lastName": str(number)},
+        }
+        if details:
+            group = self._group_of(number)
+            user.update(
+                vaultAuthorization=["AuditUsers"] if number == 0 else [],
+                changePassOnNextLogon=False,
+                expiryDate=None,
+                lastSuccessfulLoginDate=1700000000,
+                unAuthorizedInterfaces=[],
+                authenticationMethod=["AuthTypePass"],
+                passwordNeverExpires=False,
+                distinguishedName="",
+                description="",
+                groupsMembership=[{"groupID": group + 1, "groupName": f"group{group}", "groupType": "Vault"}],
+            )
+        user.update(self.user_changes.get(number, {}))
+        return user
+
+    def _group(self, number: int, members: bool) -> dict:
+        group = {
+            "id": number + 1,
+            "groupType": "Vault",
+            "groupName": f"group{number}",
+            "description": "",
+            "location": "\\",
+            "directory": None,
+            "dn": None,
+        }
+        if members:
+            group["members"] = [
+                {"id": user + 1, "UserName": f"user{user}"}
+                for user in self._user_numbers()
+                if self._group_of(user) == number
+            ]
+        return group
+
+    def Users_list(self, path: str, query: dict, body: dict):
+        offset = int(query.get("pageOffset", 0))
+        limit = int(query.get("pageSize", 1000))
+        details = query.get("ExtendedDetails", "").lower() == "true"
+        numbers = self._user_numbers()
+        users = [self._user(number, details) for number in numbers[offset : offset + limit]]
+        return 200, {"Users": users, "Total": len(numbers)}
+
+    def Users_get(self, path: str, query: dict, body: dict):
+        number = int(path.rstrip("/").rsplit("/", 1)[-1]) - 1
+        if number not in self._user_numbers():
+            return 404, {"ErrorCode": "PASWS024E", "ErrorMessage": "User not found"}
+        return 200, self._user(number, details=True)
+
+    def Groups_list(self, path: str, query: dict, body: dict):
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 25))
+        members = query.get("includeMembers", "").lower() == "true"
+        count = self.config.number_of_groups
+        end = min(offset + limit, count)
+        next_link = f"API/UserGroups?offset={end}&limit={limit}" if end < count else ""
+        groups = [self._group(number, members) for number in range(offset, end)]
+        return 200, {"value": groups, "count": count, "nextLink": next_link}
+
+    def Groups_get(self, path: str, query: dict, body: dict):
+        number = int(path.rstrip("/").rsplit("/", 1)[-1]) - 1
+        if not 0 <= number < self.config.number_of_groups:
+            return 404, {"ErrorCode": "PASWS025E", "ErrorMessage": "Group not found"}
+        return 200, self._group(number, query.get("includeMembers", "").lower() == "true")
+
+    def Credentials_get_credential(self, path: str, query: dict, body: dict):
+        if "Safe" not in query or "AppID" not in query:
+            return 400, {"ErrorCode": "APPAP004E", "ErrorMessage": "Missing mandatory parameter"}
+        return 200, {
+            "Content": f"secret-{query.get('Object', '')}" + "x" * self.config.payload_size,
+            "UserName": query.get("UserName", "user"),
+            "Address": query.get("Address", "10.0.0.1"),
+            "Database": query.get("Database"),
+            "Safe": query["Safe"],
+            "Name": query.get("Object"),
+            "PasswordChangeInProcess": "False",
+        }
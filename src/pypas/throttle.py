@@ -0,0 +1,135 @@
+"""Client-side rate limiting and concurrency control for requests to the Vault and the CCP."""
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Args:
+        rate (float): The number of requests per second allowed on average.
+        burst (int): The number of requests that can be sent at once after an idle period.
+        clock (Callable[[], float]): The monotonic clock used to refill the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        if burst < 1:
+            raise ValueError("burst must be at least 1.")
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the number of seconds to wait before it may be used."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+@dataclass
+class ThrottleMetrics:
+    """
+    Time spent by requests in the throttle.
+
+    Attributes:
+        requests (int): The number of requests sent.
+
+        queued_seconds (float): The total time requests waited for the rate limit and a free slot.
+
+        wire_seconds (float): The total time requests spent on the network.
+
+        max_queued_seconds (float): The longest time a single request waited.
+    """
+
+    requests: int = 0
+    queued_seconds: float = 0.0
+    wire_seconds: float = 0.0
+    max_queued_seconds: float = 0.0
+
+
+class Throttle:
+    """
+    Rate limit and maximum number of in-flight requests of a client.
+
+    The rate limit is shared by all threads and coroutines using the throttle. The in-flight limit
+    is enforced separately for threads and for the coroutines of an event loop.
+
+    Args:
+        rate (float): The number of requests per second, or None for no rate limit.
+        burst (int): The burst size of the rate limit.
+        max_in_flight (int): The maximum number of concurrent requests, or None for no limit.
+    """
+
+    def __init__(self, rate: float = None, burst: int = 1, max_in_flight: int = None):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_in_flight = max_in_flight
+        self._semaphore = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+        self._metrics = ThrottleMetrics()
+        self._lock = threading.Lock()
+
+    @property
+    def metrics(self) -> ThrottleMetrics:
+        """Get a snapshot of the metrics."""
+        with self._lock:
+            return ThrottleMetrics(**vars(self._metrics))
+
+    def reset_metrics(self):
+        """Reset the metrics to zero."""
+        with self._lock:
+            self._metrics = ThrottleMetrics()
+
+    def _record(self, queued: float, wire: float):
+        with self._lock:
+            self._metrics.requests += 1
+            self._metrics.queued_seconds += queued
+            self._metrics.wire_seconds += wire
+            self._metrics.max_queued_seconds = max(self._metrics.max_queued_seconds, queued)
+
+    @contextmanager
+    def slot(self):
+        """Wait for the rate limit and a free slot, then hold the slot for the duration of a request."""
+        started = time.perf_counter()
+        if self.bucket is not None:
+            time.sleep(self.bucket.reserve())
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        sent = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+            self._record(sent - started, time.perf_counter() - sent)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Wait for the rate limit and a free slot from a coroutine, see ``slot``."""
+        started = time.perf_counter()
+        if self.bucket is not None:
+            await asyncio.sleep(self.bucket.reserve())
+        if self.max_in_flight and self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self.max_in_flight)
+        if self._async_semaphore is not None:
+            await self._async_semaphore.acquire()
+        sent = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._async_semaphore is not None:
+                self._async_semaphore.release()
+            self._record(sent - started, time.perf_counter() - sent)
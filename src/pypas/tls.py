@@ -0,0 +1,70 @@
+"""Client certificate handling for certificate-authenticated CCP requests."""
+from typing import Dict, Tuple
+import hashlib
+import os
+import ssl
+import threading
+
+CertificateKey = Tuple[str, float, str, float, str]
+
+
+class ClientCertificateCache:
+    """
+    Cache of SSL contexts with a client certificate loaded.
+
+    Loading a certificate reads the PEM files from disk, decrypts the private key and builds a
+    new SSL context. The context is built once per certificate and reused until the certificate
+    or key file is modified on disk.
+
+    Args:
+        verify (bool): Whether or not the server certificate is verified.
+    """
+
+    def __init__(self, verify: bool = True):
+        self.verify = verify
+        self._contexts: Dict[CertificateKey, ssl.SSLContext] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        certificate_path: str, certificate_key_path: str = None, certificate_password: str = None
+    ) -> CertificateKey:
+        """Build the cache key of a certificate from its paths, modification times and password."""
+        password_hash = hashlib.sha256(certificate_password.encode()).hexdigest() if certificate_password else ""
+        key_path = certificate_key_path or ""
+        key_mtime = os.stat(key_path).st_mtime if key_path else 0.0
+        return (certificate_path, os.stat(certificate_path).st_mtime, key_path, key_mtime, password_hash)
+
+    @staticmethod
+    def identity(key: CertificateKey) -> Tuple[str, str, str]:
+        """Get the paths and the password hash of a cache key, which stay the same when the files change."""
+        return key[0], key[2], key[4]
+
+    def context(
+        self, certificate_path: str, certificate_key_path: str = None, certificate_password: str = None
+    ) -> Tuple[CertificateKey, ssl.SSLContext]:
+        """Get the key and the SSL context of a client certificate, loading it on first use."""
+        key = self.key(certificate_path, certificate_key_path, certificate_password)
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is None:
+                context = self._create_context()
+                context.load_cert_chain(certificate_path, certificate_key_path, certificate_password)
+                identity = self.identity(key)
+                for stale in [cached for cached in self._contexts if self.identity(cached) == identity]:
+                    del self._contexts[stale]
+                self._contexts[key] = context
+            return key, context
+
+    def _create_context(self) -> ssl.SSLContext:
+        if not self.verify:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            return context
+        try:
+            import certifi
+
+            return ssl.create_default_context(cafile=certifi.where())
+        except ImportError:  # pragma: no cover - certifi is installed with httpx
+            return ssl.create_default_context()
@@ -0,0 +1,132 @@
+"""Session token management for the Vault."""
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+import threading
+import time
+
+if TYPE_CHECKING:  # pragma: no cover - asyncio is imported by the first logon of an AsyncVault
+    import asyncio
+
+
+class _BaseTokenManager:
+    """
+    State shared by the sync and the async token manager.
+
+    Args:
+        session_timeout (float): The number of seconds a session token is valid after logon.
+        refresh_before (float): The number of seconds before the timeout at which the token is refreshed.
+        clock (Callable[[], float]): The monotonic clock used for expiry.
+    """
+
+    def __init__(
+        self, session_timeout: float = 20 * 60, refresh_before: float = 60, clock: Callable[[], float] = time.monotonic
+    ):
+        if refresh_before >= session_timeout:
+            raise ValueError("refresh_before must be smaller than session_timeout.")
+
+        self.session_timeout = session_timeout
+        self.refresh_before = refresh_before
+        self._clock = clock
+        self._logon = None
+        self._token: Optional[str] = None
+        self._refresh_at = 0.0
+        self.logon_count = 0
+
+    @property
+    def authenticated(self) -> bool:
+        """Whether or not a logon has been configured."""
+        return self._logon is not None
+
+    def _fresh(self) -> bool:
+        return self._token is not None and self._clock() < self._refresh_at
+
+    def _set_token(self, token: str):
+        self._token = token
+        self._refresh_at = self._clock() + self.session_timeout - self.refresh_before
+
+    def clear(self):
+        """Forget the token and the logon."""
+        self._logon = None
+        self._token = None
+        self._refresh_at = 0.0
+
+
+class TokenManager(_BaseTokenManager):
+    """
+    Caches the session token of a vault and refreshes it before it times out.
+
+    Concurrent callers that find the token expired are coalesced into a single logon:
+    one thread logs on while the others wait for its token.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def configure(self, logon: Callable[[], str], token: str = None):
+        """Set the logon used to obtain new tokens, optionally with a token it already returned."""
+        with self._lock:
+            self._logon = logon
+            if token is not None:
+                self._set_token(token)
+
+    def token(self) -> Optional[str]:
+        """Get a valid token, logging on first if the current one is missing or about to time out."""
+        if not self.authenticated or self._fresh():
+            return self._token
+        return self._renew(None)
+
+    def refresh(self, stale_token: str) -> Optional[str]:
+        """Replace a token the vault rejected, unless another caller already replaced it."""
+        return self._renew(stale_token)
+
+    def _renew(self, stale_token: Optional[str]) -> Optional[str]:
+        with self._lock:
+            if self._logon is None:
+                return self._token
+            if stale_token is None and self._fresh():
+                return self._token
+            if stale_token is not None and self._token != stale_token:
+                return self._token
+            self.logon_count += 1
+            self._set_token(self._logon())
+            return self._token
+
+
+class AsyncTokenManager(_BaseTokenManager):
+    """Caches the session token of an ``AsyncVault``, see ``TokenManager``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock: Optional["asyncio.Lock"] = None
+
+    def configure(self, logon: Callable[[], Awaitable[str]], token: str = None):
+        """Set the logon coroutine used to obtain new tokens, optionally with a token it already returned."""
+        self._logon = logon
+        if token is not None:
+            self._set_token(token)
+
+    async def token(self) -> Optional[str]:
+        """Get a valid token, logging on first if the current one is missing or about to time out."""
+        if not self.authenticated or self._fresh():
+            return self._token
+        return await self._renew(None)
+
+    async def refresh(self, stale_token: str) -> Optional[str]:
+        """Replace a token the vault rejected, unless another coroutine already replaced it."""
+        return await self._renew(stale_token)
+
+    async def _renew(self, stale_token: Optional[str]) -> Optional[str]:
+        if self._lock is None:
+            import asyncio
+
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._logon is None:
+                return self._token
+            if stale_token is None and self._fresh():
+                return self._token
+            if stale_token is not None and self._token != stale_token:
+                return self._token
+            self.logon_count += 1
+            self._set_token(await self._logon())
+            return self._token
@@ -0,0 +1,392 @@
+"""Shared HTTP transport used by the Vault and the Central Credential Provider."""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Set, Tuple, TypeVar
+import threading
+
+import httpx
+
+from pypas.instrumentation import Hooks, Tracer
+from pypas.resilience import RetryPolicy
+from pypas.throttle import Throttle
+from pypas.tls import CertificateKey, ClientCertificateCache
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class PoolConfig:
+    """
+    Connection pool settings of a transport.
+
+    Attributes:
+        max_connections (int): The maximum number of open connections across all hosts.
+
+        max_keepalive_connections (int): The maximum number of idle connections kept open for reuse.
+
+        keepalive_expiry (float): The number of seconds an idle connection is kept open.
+
+        http2 (bool): Whether or not HTTP/2 is negotiated. Requires the ``h2`` package.
+
+        host_limits (Dict[str, int]): The maximum number of connections per host, keyed on the host name.
+        Hosts that are not listed share the global pool.
+
+        timeout (float): The timeout in seconds for connecting, reading, writing and waiting for a pooled connection.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    host_limits: Dict[str, int] = field(default_factory=dict)
+    timeout: float = 30.0
+
+    def limits(self, max_connections: int = None) -> httpx.Limits:
+        """Get the httpx limits for the pool or for a single host of the pool."""
+        max_connections = max_connections or self.max_connections
+        return httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(self.max_keepalive_connections, max_connections),
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+class _BaseTransport:
+    """Configuration shared by the sync and the async transport."""
+
+    def __init__(
+        self,
+        base_url: str = "",
+        verify: bool = True,
+        pool: PoolConfig = None,
+        headers: dict = None,
+        retry: RetryPolicy = None,
+        throttle: Throttle = None,
+        hooks: Hooks = None,
+    ):
+        self.base_url = base_url
+        self.verify = verify
+        self.pool = pool or PoolConfig()
+        self.headers = headers or {}
+        self.retry = retry or RetryPolicy()
+        self.throttle = throttle or Throttle()
+        self.hooks = hooks or Hooks()
+        self.certificates = ClientCertificateCache(verify)
+        self._certificate_leases: Dict[Any, int] = {}
+        self._retired_clients: Set[Any] = set()
+
+    def _lease(self, client):
+        self._certificate_leases[client] = self._certificate_leases.get(client, 0) + 1
+
+    def _release(self, client) -> bool:
+        """End a request over a certificate client, True if the client was replaced and is now idle."""
+        count = self._certificate_leases.pop(client) - 1
+        if count:
+            self._certificate_leases[client] = count
+            return False
+        if client in self._retired_clients:
+            self._retired_clients.discard(client)
+            return True
+        return False
+
+    def _retire(self, client) -> bool:
+        """Retire a replaced certificate client, True if no request is in flight over it."""
+        if self._certificate_leases.get(client):
+            self._retired_clients.add(client)
+            return False
+        return True
+
+    def _host(self, url: str) -> str:
+        return httpx.URL(url).host or httpx.URL(self.base_url).host
+
+    def _on_retry(self):
+        return self.hooks.on_retry if self.hooks.enabled else None
+
+    def _client_kwargs(self, transport_class: type, verify=None) -> dict:
+        verify = self.verify if verify is None else verify
+        return {
+            "base_url": self.base_url,
+            "verify": verify,
+            "headers": self.headers,
+            "http2": self.pool.http2,
+            "limits": self.pool.limits(),
+            "timeout": self.pool.timeout,
+            "mounts": {
+                f"all://{host}": transport_class(
+                    verify=verify,
+                    http2=self.pool.http2,
+                    limits=self.pool.limits(max_connections),
+                )
+                for host, max_connections in self.pool.host_limits.items()
+            },
+        }
+
+
+class Transport(_BaseTransport):
+    """
+    Long-lived, pooled HTTP client.
+
+    The underlying ``httpx.Client`` is created on first use and reused for every request,
+    so connections and TLS sessions are kept alive between calls instead of being
+    re-established for each request.
+
+    A transport is thread-safe. Threads sharing it share one connection pool, so the number
+    of connections to a host is bounded by the ``PoolConfig`` of the transport no matter how
+    many threads send requests.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        verify: bool = True,
+        pool: PoolConfig = None,
+        headers: dict = None,
+        client: httpx.Client = None,
+        retry: RetryPolicy = None,
+        throttle: Throttle = None,
+        hooks: Hooks = None,
+    ):
+        super().__init__(base_url, verify, pool, headers, retry, throttle, hooks)
+        self._client = client
+        self._certificate_clients: Dict[Tuple[str, str, str], Tuple[CertificateKey, httpx.Client]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        """Get the pooled client, creating it on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._client_kwargs(httpx.HTTPTransport))
+        return self._client
+
+    def certificate_client(
+        self, certificate_path: str, certificate_key_path: str = None, certificate_password: str = None
+    ) -> httpx.Client:
+        """Get the pooled client authenticating with a client certificate.
+
+        The client is bound to a cached SSL context, so the certificate is loaded once and
+        connections are kept alive. One client is pooled per certificate, key and password, and
+        a new client is created when the certificate changes on disk. The replaced client is closed
+        once the requests in flight over it completed.
+        """
+        key, context = self.certificates.context(certificate_path, certificate_key_path, certificate_password)
+        with self._lock:
+            return self._certificate_client(key, context)
+
+    def _certificate_client(self, key: CertificateKey, context) -> httpx.Client:
+        identity = self.certificates.identity(key)
+        cached = self._certificate_clients.get(identity)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        client = httpx.Client(**self._client_kwargs(httpx.HTTPTransport, verify=context))
+        self._certificate_clients[identity] = (key, client)
+        if cached is not None and self._retire(cached[1]):
+            cached[1].close()
+        return client
+
+    @contextmanager
+    def _leased_client(self, cert: tuple) -> Iterator[httpx.Client]:
+        if not cert:
+            yield self.client
+            return
+        key, context = self.certificates.context(*cert)
+        with self._lock:
+            client = self._certificate_client(key, context)
+            self._lease(client)
+        try:
+            yield client
+        finally:
+            with self._lock:
+                idle = self._release(client)
+            if idle:
+                client.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: dict = None,
+        body: dict = None,
+        cert: tuple = None,
+        endpoint: str = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request over the pooled client, retrying transient failures.
+
+        ``cert`` is a tuple of certificate path, key path and password to authenticate with a client certificate.
+        ``endpoint`` names the API endpoint sending the request in the instrumentation events.
+        """
+        host = self._host(url)
+        with self._leased_client(cert) as client:
+
+            def send() -> httpx.Response:
+                with self.throttle.slot():
+                    if not self.hooks.enabled:
+                        return client.request(method, url, params=params, json=body, **kwargs)
+                    tracer = Tracer()
+                    try:
+                        response = client.request(
+                            method, url, params=params, json=body, extensions={"trace": tracer}, **kwargs
+                        )
+                    except Exception as ex:
+                        self.hooks.on_request(tracer.timing(endpoint, method, host, error=ex))
+                        raise
+                    self.hooks.on_request(tracer.timing(endpoint, method, host, response.status_code))
+                    return response
+
+            return self.retry.send(method, host, send, on_retry=self._on_retry())
+
+    def map(self, function: Callable[[T], R], items: Iterable[T], max_workers: int = 8) -> List[R]:
+        """Call a function for every item from a pool of threads sharing this transport.
+
+        Returns the results in input order. The first exception raised by a call is re-raised.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(function, items))
+
+    def imap(self, function: Callable[[T], R], items: Iterable[T], max_workers: int = 8) -> Iterator[R]:
+        """Lazily call a function for every item from a pool of threads sharing this transport.
+
+        Like ``map``, but the items are consumed and the results are yielded as the calls complete, in input
+        order. At most ``2 * max_workers`` calls are submitted ahead of the consumer, so memory stays bounded
+        for any number of items. Closing the iterator cancels the calls that did not start.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(function, item))
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def close(self):
+        """Close the pooled client and all of its connections."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            for _, client in self._certificate_clients.values():
+                client.close()
+            self._certificate_clients.clear()
+            for client in self._retired_clients:
+                client.close()
+            self._retired_clients.clear()
+
+
+class AsyncTransport(_BaseTransport):
+    """
+    Long-lived, pooled asyncio HTTP client.
+
+    The asyncio counterpart of ``Transport``. All coroutines of an event loop share one
+    ``httpx.AsyncClient``, so many requests can be in flight over the same pool.
+
+    Unlike ``Transport``, it is bound to the event loop of its first request and must not be
+    shared between threads.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        verify: bool = True,
+        pool: PoolConfig = None,
+        headers: dict = None,
+        client: httpx.AsyncClient = None,
+        retry: RetryPolicy = None,
+        throttle: Throttle = None,
+        hooks: Hooks = None,
+    ):
+        super().__init__(base_url, verify, pool, headers, retry, throttle, hooks)
+        self._client = client
+        self._certificate_clients: Dict[Tuple[str, str, str], Tuple[CertificateKey, httpx.AsyncClient]] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the pooled client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_kwargs(httpx.AsyncHTTPTransport))
+        return self._client
+
+    async def certificate_client(
+        self, certificate_path: str, certificate_key_path: str = None, certificate_password: str = None
+    ) -> httpx.AsyncClient:
+        """Get the pooled client authenticating with a client certificate, see ``Transport.certificate_client``."""
+        key, context = self.certificates.context(certificate_path, certificate_key_path, certificate_password)
+        return await self._certificate_client(key, context)
+
+    async def _certificate_client(self, key: CertificateKey, context) -> httpx.AsyncClient:
+        identity = self.certificates.identity(key)
+        cached = self._certificate_clients.get(identity)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        client = httpx.AsyncClient(**self._client_kwargs(httpx.AsyncHTTPTransport, verify=context))
+        self._certificate_clients[identity] = (key, client)
+        if cached is not None and self._retire(cached[1]):
+            await cached[1].aclose()
+        return client
+
+    @asynccontextmanager
+    async def _leased_client(self, cert: tuple) -> AsyncIterator[httpx.AsyncClient]:
+        if not cert:
+            yield self.client
+            return
+        key, context = self.certificates.context(*cert)
+        client = await self._certificate_client(key, context)
+        self._lease(client)
+        try:
+            yield client
+        finally:
+            if self._release(client):
+                await client.aclose()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: dict = None,
+        body: dict = None,
+        cert: tuple = None,
+        endpoint: str = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request over the pooled client, retrying transient failures, see ``Transport.request``."""
+        host = self._host(url)
+        async with self._leased_client(cert) as client:
+
+            async def send() -> httpx.Response:
+                async with self.throttle.aslot():
+                    if not self.hooks.enabled:
+                        return await client.request(method, url, params=params, json=body, **kwargs)
+                    tracer = Tracer()
+                    try:
+                        response = await client.request(
+                            method, url, params=params, json=body, extensions={"trace": tracer.atrace}, **kwargs
+                        )
+                    except Exception as ex:
+                        self.hooks.on_request(tracer.timing(endpoint, method, host, error=ex))
+                        raise
+                    self.hooks.on_request(tracer.timing(endpoint, method, host, response.status_code))
+                    return response
+
+            return await self.retry.asend(method, host, send, on_retry=self._on_retry())
+
+    async def close(self):
+        """Close the pooled client and all of its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        for _, client in self._certificate_clients.values():
+            await client.aclose()
+        self._certificate_clients.clear()
+        for client in self._retired_clients:
+            await client.aclose()
+        self._retired_clients.clear()
@@ -1,31 +1,255 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from .api.safe_api import Safes
-from .api.authentication_api import Authentication
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional
+import threading
+
+from .api.safe_api import AsyncSafes, Safes
+from .api.authentication_api import AsyncAuthentication, Authentication
+from .api.safe_member_api import AsyncSafeMembers, SafeMembers
+from .api.users_api import AsyncUsers, Users
+from .api.groups_api import AsyncGroups, Groups
+from .token_manager import AsyncTokenManager, TokenManager
+
+if TYPE_CHECKING:  # pragma: no cover - the transport and httpx are imported on first use
+    import httpx
+
+    from .instrumentation import Hooks
+    from .resilience import RetryPolicy
+    from .throttle import Throttle
+    from .transport import AsyncTransport, PoolConfig, R, T, Transport
+
+
+def _auth_headers(token: Optional[str]) -> Optional[dict]:
+    return {"Authorization": token} if token else None
 
 
 @dataclass
 class Vault:
-    """CyberArk Vault model class."""
+    """CyberArk Vault model class.
+
+    A vault is safe to share between threads. All threads reuse the pooled connections of one
+    ``httpx.Client`` and one session token, which is renewed by a single thread when it expires.
+    """
 
     base_url: str
     verify_requests: bool = True
+    pool: PoolConfig = None
+    retry: RetryPolicy = None
+    throttle: Throttle = None
+    hooks: Hooks = None
+    session: httpx.Client = None
+    token_manager: TokenManager = None
 
     def __post_init__(self):
+        if self.token_manager is None:
+            self.token_manager = TokenManager()
+        self._transport: Optional[Transport] = None
+        self._transport_lock = threading.Lock()
         self.Safes = Safes(self)
+        self.SafeMembers = SafeMembers(self)
+        self.Users = Users(self)
+        self.Groups = Groups(self)
         self.Authentication = Authentication(self)
 
-    def get_request(self, url: str, params: dict = None) -> dict:
+    @property
+    def transport(self) -> Transport:
+        """Get the transport, creating it on first use so that httpx is only imported when needed."""
+        if self._transport is None:
+            with self._transport_lock:
+                if self._transport is None:
+                    from .transport import Transport
+
+                    self._transport = Transport(
+                        base_url=self.base_url,
+                        verify=self.verify_requests,
+                        pool=self.pool,
+                        headers={"Content-Type": "application/json"},
+                        client=self.session,
+                        retry=self.retry,
+                        throttle=self.throttle,
+                        hooks=self.hooks,
+                    )
+        return self._transport
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: dict = None,
+        body: dict = None,
+        authenticate: bool = True,
+        endpoint: str = None,
+    ) -> httpx.Response:
+        """Make a request to the vault.
+
+        Once logged on, the session token is sent with every request. A request rejected with
+        401 is repeated once with a new token.
+        """
+        if not authenticate:
+            return self.transport.request(method, url, params=params, body=body, endpoint=endpoint)
+
+        token = self.token_manager.token()
+        response = self.transport.request(
+            method, url, params=params, body=body, headers=_auth_headers(token), endpoint=endpoint
+        )
+        if response.status_code == 401 and token is not None:
+            token = self.token_manager.refresh(token)
+            response = self.transport.request(
+                method, url, params=params, body=body, headers=_auth_headers(token), endpoint=endpoint
+            )
+        return response
+
+    def get_request(self, url: str, params: dict = None, endpoint: str = None) -> httpx.Response:
         """Make a GET request to the vault."""
-        return {}
+        return self.request("GET", url, params=params, endpoint=endpoint)
 
-    def post_request(self, url: str, params: dict = None, body: dict = None) -> dict:
+    def post_request(self, url: str, params: dict = None, body: dict = None, endpoint: str = None) -> httpx.Response:
         """Make a POST request to the vault."""
-        return {}
+        return self.request("POST", url, params=params, body=body, endpoint=endpoint)
 
-    def put_request(self, url: str, params: dict = None, body: dict = None) -> dict:
+    def put_request(self, url: str, params: dict = None, body: dict = None, endpoint: str = None) -> httpx.Response:
         """Make a PUT request to the vault."""
-        return {}
+        return self.request("PUT", url, params=params, body=body, endpoint=endpoint)
 
-    def delete_request(self, url: str, params: dict = None, body: dict = None) -> dict:
+    def delete_request(self, url: str, params: dict = None, body: dict = None, endpoint: str = None) -> httpx.Response:
         """Make a DELETE request to the vault."""
-        return {}
+        return self.request("DELETE", url, params=params, body=body, endpoint=endpoint)
+
+    def map(self, function: Callable[[T], R], items: Iterable[T], max_workers: int = 8) -> List[R]:
+        """Call a function for every item from a pool of threads sharing the vault's connections.
+
+        Example:
+            safes = vault.map(vault.Safes.get, ["safe1", "safe2"])
+
+        Args:
+            function (Callable[[T], R]): The function to call, usually a bound API method.
+            items (Iterable[T]): The arguments of the calls.
+            max_workers (int): The maximum number of calls in flight at once.
+
+        Returns:
+            List[R]: The results in input order. The first exception raised by a call is re-raised.
+        """
+        return self.transport.map(function, items, max_workers)
+
+    def imap(self, function: Callable[[T], R], items: Iterable[T], max_workers: int = 8) -> Iterator[R]:
+        """Lazily call a function for every item from a pool of threads, see ``map`` and ``Transport.imap``.
+
+        Yields:
+            R: The results in input order, while later calls are still in flight.
+        """
+        return self.transport.imap(function, items, max_workers)
+
+    def close(self):
+        """Close all pooled connections to the vault."""
+        if self._transport is not None:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@dataclass
+class AsyncVault:
+    """CyberArk Vault model class for asyncio applications.
+
+    All requests of the vault share one pooled ``httpx.AsyncClient``. The vault is bound to the
+    event loop of its first request, use ``Vault`` to share a client between threads.
+    """
+
+    base_url: str
+    verify_requests: bool = True
+    pool: PoolConfig = None
+    retry: RetryPolicy = None
+    throttle: Throttle = None
+    hooks: Hooks = None
+    session: httpx.AsyncClient = None
+    token_manager: AsyncTokenManager = None
+
+    def __post_init__(self):
+        if self.token_manager is None:
+            self.token_manager = AsyncTokenManager()
+        self._transport: Optional[AsyncTransport] = None
+        self.Safes = AsyncSafes(self)
+        self.SafeMembers = AsyncSafeMembers(self)
+        self.Users = AsyncUsers(self)
+        self.Groups = AsyncGroups(self)
+        self.Authentication = AsyncAuthentication(self)
+
+    @property
+    def transport(self) -> AsyncTransport:
+        """Get the transport, creating it on first use so that httpx is only imported when needed."""
+        if self._transport is None:
+            from .transport import AsyncTransport
+
+            self._transport = AsyncTransport(
+                base_url=self.base_url,
+                verify=self.verify_requests,
+                pool=self.pool,
+                headers={"Content-Type": "application/json"},
+                client=self.session,
+                retry=self.retry,
+                throttle=self.throttle,
+                hooks=self.hooks,
+            )
+        return self._transport
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: dict = None,
+        body: dict = None,
+        authenticate: bool = True,
+        endpoint: str = None,
+    ) -> httpx.Response:
+        """Make a request to the vault, see ``Vault.request``."""
+        if not authenticate:
+            return await self.transport.request(method, url, params=params, body=body, endpoint=endpoint)
+
+        token = await self.token_manager.token()
+        response = await self.transport.request(
+            method, url, params=params, body=body, headers=_auth_headers(token), endpoint=endpoint
+        )
+        if response.status_code == 401 and token is not None:
+            token = await self.token_manager.refresh(token)
+            response = await self.transport.request(
+                method, url, params=params, body=body, headers=_auth_headers(token), endpoint=endpoint
+            )
+        return response
+
+    async def get_request(self, url: str, params: dict = None, endpoint: str = None) -> httpx.Response:
+        """Make a GET request to the vault."""
+        return await self.request("GET", url, params=params, endpoint=endpoint)
+
+    async def post_request(
+        self, url: str, params: dict = None, body: dict = None, endpoint: str = None
+    ) -> httpx.Response:
+        """Make a POST request to the vault."""
+        return await self.request("POST", url, params=params, body=body, endpoint=endpoint)
+
+    async def put_request(
+        self, url: str, params: dict = None, body: dict = None, endpoint: str = None
+    ) -> httpx.Response:
+        """Make a PUT request to the vault."""
+        return await self.request("PUT", url, params=params, body=body, endpoint=endpoint)
+
+    async def delete_request(
+        self, url: str, params: dict = None, body: dict = None, endpoint: str = None
+    ) -> httpx.Response:
+        """Make a DELETE request to the vault."""
+        return await self.request("DELETE", url, params=params, body=body, endpoint=endpoint)
+
+    async def close(self):
+        """Close all pooled connections to the vault."""
+        if self._transport is not None:
+            await self._transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -23,6 +23,15 @@ def pytest_collection_modifyitems(items: list[Item]):
             item.add_marker(pytest.mark.integration)
 
 
+@pytest.fixture
+def mock_server():
+    """A local PVWA and AIMWebService serving synthetic data."""
+    from pypas.testing import MockServer
+
+    with MockServer() as server:
+        yield server
+
+
 @pytest.fixture
 def unit_test_mocks(monkeypatch: None):
     """Include Mocks here to execute all commands offline and fast."""
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def agent(tmp_path, mock_server):
+    from pypas.agent import CredentialAgent
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider
+
+    loop = asyncio.new_event_loop()
+    agent = CredentialAgent(
+        AsyncCentralCredentialProvider(mock_server.url),
+        str(tmp_path / "agent.sock"),
+        prefetch=[{"app_id": "app", "safe": "safe", "object": "prefetched"}],
+    )
+    loop.run_until_complete(agent.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield agent
+    asyncio.run_coroutine_threadsafe(agent.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_processes_share_one_upstream_fetch(agent, mock_server):
+    from pypas.central_credential_provider import CentralCredentialProvider
+
+    def lookup(number: int):
+        with CentralCredentialProvider("", agent_socket=agent.socket_path) as ccp:
+            return ccp.credentials.get_credential("app", "safe", object="account").Content
+
+    with CentralCredentialProvider("", agent_socket=agent.socket_path) as ccp:
+        contents = ccp.map(lookup, range(32), max_workers=16)
+        prefetched = ccp.credentials.get_credential("app", "safe", object="prefetched")
+
+    assert contents == ["secret-account"] * 32
+    assert prefetched.Content == "secret-prefetched"
+    assert mock_server.requests["Credentials.get_credential"] == 2
+
+
+def test_agent_errors_are_raised_by_the_client(agent):
+    from pypas.agent import AgentError
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider
+
+    async def run():
+        async with AsyncCentralCredentialProvider("", agent_socket=agent.socket_path) as ccp:
+            await ccp.credentials.get_credential("app", None)
+
+    with pytest.raises(AgentError) as error:
+        asyncio.run(run())
+
+    assert error.value.status_code == 400
+    assert error.value.type == "HTTPStatusError"
+
+
+def test_cli_runs_agent_command(monkeypatch):
+    import pypas.cli
+
+    commands = []
+    monkeypatch.setattr(pypas.cli, "_agent", commands.append)
+
+    pypas.cli.main(["agent", "--ccp-url", "https://ccp.example.com/", "--socket", "/tmp/pypas.sock", "--ttl", "60"])
+
+    assert commands[0].ccp_url == "https://ccp.example.com/"
+    assert commands[0].ttl == 60
+
+
+def test_socket_is_created_owner_only(tmp_path, monkeypatch):
+    import os
+    import stat
+
+    from pypas.agent import CredentialAgent
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider
+
+    start_unix_server = asyncio.start_unix_server
+    modes = []
+
+    async def record_mode(*args, path, **kwargs):
+        server = await start_unix_server(*args, path=path, **kwargs)
+        modes.append(stat.S_IMODE(os.stat(path).st_mode))
+        return server
+
+    async def run():
+        agent = CredentialAgent(AsyncCentralCredentialProvider("http://127.0.0.1:1/"), str(tmp_path / "agent.sock"))
+        await agent.start()
+        await agent.stop()
+
+    monkeypatch.setattr(asyncio, "start_unix_server", record_mode)
+    umask = os.umask(0)
+    try:
+        asyncio.run(run())
+    finally:
+        os.umask(umask)
+
+    assert modes == [0o600]
+    assert os.umask(umask) == umask
@@ -0,0 +1,77 @@
+import pytest
+
+
+def test_normalizer_renames_aliases_and_enum_values():
+    from pypas.arrow import _normalizer
+    from pypas.model.safe import Safe, SafeCreator
+    from pypas.model.user import User, UserGroupsMembership
+
+    normalize_user = _normalizer(User)
+    user = normalize_user({"groupsMembership": [{"groupID": 1, "groupName": "Vault Admins", "groupType": 1}]})
+
+    assert _normalizer(SafeCreator) is None
+    assert _normalizer(Safe)({"Creator": {"id": "1"}})["creator"] == {"id": "1"}
+    assert user["groupsMembership"] == [{"groupID": 1, "groupName": "Vault Admins", "groupType": "Vault"}]
+    assert _normalizer(UserGroupsMembership)({"groupType": "Directory"})["groupType"] == "Directory"
+
+
+def test_safe_batches_match_the_model(mock_server, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    from pypas.arrow import arrow_schema, iter_safe_batches, write_parquet
+    from pypas.model.safe import Safe
+    from pypas.vault import Vault
+
+    path = tmp_path / "safes.parquet"
+    with Vault(mock_server.url) as vault:
+        rows = write_parquet(str(path), iter_safe_batches(vault, page_size=30), arrow_schema(Safe))
+
+    table = pq.read_table(path)
+    assert rows == table.num_rows == 100
+    assert table.schema.field("creator").type == pa.struct([("id", pa.string()), ("name", pa.string())])
+    assert table.column("creator").to_pylist()[0] == {"id": "1", "name": "Administrator"}
+    assert table.column("safeNumber").to_pylist() == list(range(100))
+
+
+def test_safe_member_batches_are_dictionary_encoded():
+    pa = pytest.importorskip("pyarrow")
+
+    from pypas.arrow import iter_safe_member_batches
+    from pypas.testing import MockServer, MockServerConfig
+    from pypas.vault import Vault
+
+    with MockServer(MockServerConfig(number_of_safes=10, members_per_safe=4)) as server, Vault(server.url) as vault:
+        batches = list(iter_safe_member_batches(vault, [f"safe{number}" for number in range(10)], batch_size=10))
+
+    table = pa.Table.from_batches(batches)
+    assert [batch.num_rows for batch in batches] == [12, 12, 12, 4]
+    assert pa.types.is_dictionary(table.schema.field("memberType").type)
+    assert table.column("memberType").to_pylist()[:4] == ["User", "User", "User", "Group"]
+    assert table.column("permissions").to_pylist()[0]["manageSafe"] is True
+
+
+def test_user_batches_match_the_model(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    from pypas.arrow import arrow_schema, iter_user_batches, write_parquet
+    from pypas.model.user import User
+    from pypas.testing import MockServer, MockServerConfig
+    from pypas.vault import Vault
+
+    path = tmp_path / "users.parquet"
+    config = MockServerConfig(number_of_users=25, number_of_groups=2)
+    with MockServer(config) as server, Vault(server.url) as vault:
+        batches = list(iter_user_batches(vault, page_size=10, extended_details=True))
+        rows = write_parquet(str(path), iter_user_batches(vault, page_size=10), arrow_schema(User))
+
+    table = pa.Table.from_batches(batches)
+    assert [batch.num_rows for batch in batches] == [10, 10, 5]
+    assert table.schema.field("id").type == pa.int64()
+    assert table.column("id").to_pylist() == list(range(1, 26))
+    assert table.column("source").to_pylist()[0] == "CyberArk"
+    assert table.column("groupsMembership").to_pylist()[1] == [
+        {"groupID": 2, "groupName": "group1", "groupType": "Vault"}
+    ]
+    assert rows == pq.read_table(path).num_rows == 25
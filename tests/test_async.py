@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+
+CCP_BASE_URL = "https://ccp.example.com/"
+VAULT_BASE_URL = "https://pvwa.example.com/"
+
+SAFE_RESPONSE = {
+    "safeUrlId": "ww_mysafe",
+    "safeName": "ww_mysafe",
+    "safeNumber": 2,
+    "description": "",
+    "location": "\\",
+    "Creator": {"id": "1", "name": "Administrator"},
+    "olacEnabled": False,
+    "managingCPM": "PasswordManager",
+    "numberOfVersionsRetention": None,
+    "numberOfDaysRetention": 7,
+    "autoPurgeEnabled": False,
+    "creationTime": 1700000000,
+    "lastModificationTime": 1700000000,
+    "accounts": [{"id": "2_3", "name": "account"}],
+    "isExiredMember": False,
+}
+
+
+def test_async_ccp_concurrent_lookups():
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"Content": request.url.params["Object"], "PasswordChangeInProcess": "False"})
+
+    async def run():
+        session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncCentralCredentialProvider(CCP_BASE_URL, session=session) as ccp:
+            results = await asyncio.gather(
+                *(ccp.credentials.get_credential("app", "safe", object=f"account{i}") for i in range(100))
+            )
+            assert ccp.get_session() is session
+        assert session.is_closed
+        return results
+
+    results = asyncio.run(run())
+
+    assert len(results) == 100
+    assert [credential.Content for credential in results] == [f"account{i}" for i in range(100)]
+
+
+def test_async_vault_logon_and_get_safe():
+    from pypas.model.safe import Safe
+    from pypas.vault import AsyncVault
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(200, json="token")
+        return httpx.Response(200, json=SAFE_RESPONSE)
+
+    async def run():
+        async with AsyncVault(
+            VAULT_BASE_URL, session=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        ) as vault:
+            token = await vault.Authentication.logon("user", "password")
+            safe = await vault.Safes.get("ww_mysafe")
+        return token, safe
+
+    token, safe = asyncio.run(run())
+
+    assert token == "token"
+    assert isinstance(safe, Safe)
+    assert safe.accounts[0].name == "account"
@@ -0,0 +1,109 @@
+import pytest
+
+
+def make_config(**kwargs):
+    from pypas.testing import MockServerConfig
+
+    return MockServerConfig(**{"number_of_safes": 30, "members_per_safe": 7, **kwargs})
+
+
+def test_safe_members_list_and_iter_members():
+    from pypas.model.safe_member import SafeMemberType
+    from pypas.testing import MockServer
+    from pypas.vault import Vault
+
+    with MockServer(make_config()) as server, Vault(server.url) as vault:
+        page = vault.SafeMembers.list("safe3", limit=5)
+        members = list(vault.SafeMembers.iter_members("safe3", page_size=3))
+        groups = list(vault.SafeMembers.iter_members("safe3", member_type=SafeMemberType.Group))
+        requests = server.requests["SafeMembers.list"]
+
+    assert [member.memberName for member in page] == ["user0", "user1", "user2", "group3", "user4"]
+    assert len(members) == 7
+    assert members[0].permissions.manageSafe and not members[1].permissions.manageSafe
+    assert [member.memberName for member in groups] == ["group3"]
+    assert requests == 1 + 3 + 1
+
+
+def test_iter_audit_rows_flattens_members_of_all_safes():
+    from pypas.audit import AUDIT_COLUMNS, iter_audit_rows
+    from pypas.testing import MockServer
+    from pypas.vault import Vault
+
+    with MockServer(make_config()) as server, Vault(server.url) as vault:
+        rows = list(iter_audit_rows(vault, max_concurrency=4, page_size=5))
+
+    assert len(AUDIT_COLUMNS) == 3 + 22 + 1
+    assert len(rows) == 30 * 7
+    assert [row["safe"] for row in rows[::7]] == [f"safe{number}" for number in range(30)]
+    assert list(rows[0]) == AUDIT_COLUMNS
+    assert rows[3]["memberType"] == "Group"
+    assert rows[0]["manageSafe"] is True and rows[1]["retrieveAccounts"] is False
+
+
+def test_iter_audit_rows_reports_failed_safes():
+    import httpx
+
+    from pypas.audit import iter_audit_rows
+    from pypas.testing import MockServer
+    from pypas.vault import Vault
+
+    errors = []
+    with MockServer(make_config()) as server, Vault(server.url) as vault:
+        rows = list(iter_audit_rows(vault, ["safe1", "missing", "safe2"], on_error=lambda *error: errors.append(error)))
+        with pytest.raises(httpx.HTTPStatusError):
+            list(iter_audit_rows(vault, ["safe1", "missing"]))
+
+    assert {row["safe"] for row in rows} == {"safe1", "safe2"}
+    assert [safe for safe, _ in errors] == ["missing"]
+
+
+@pytest.mark.parametrize("extension", ["csv", "ndjson"])
+def test_write_audit_text_formats(tmp_path, extension):
+    import csv
+    import json
+
+    from pypas.audit import write_audit
+    from pypas.testing import MockServer
+    from pypas.vault import Vault
+
+    path = tmp_path / f"audit.{extension}"
+    with MockServer(make_config(number_of_safes=5)) as server, Vault(server.url) as vault:
+        count = write_audit(vault, str(path))
+
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file)) if extension == "csv" else [json.loads(line) for line in file]
+    assert count == len(rows) == 35
+    assert rows[0]["member"] == "user0"
+
+
+def test_write_audit_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    from pypas.audit import write_audit
+    from pypas.testing import MockServer
+    from pypas.vault import Vault
+
+    path = tmp_path / "audit.parquet"
+    with MockServer(make_config(number_of_safes=5)) as server, Vault(server.url) as vault:
+        count = write_audit(vault, str(path))
+
+    table = pq.read_table(path)
+    assert count == table.num_rows == 35
+    assert table.column("manageSafe").to_pylist().count(True) == 5
+
+
+def test_open_audit_writer_rejects_unknown_format(tmp_path):
+    from pypas.audit import open_audit_writer
+
+    with pytest.raises(ValueError):
+        open_audit_writer(str(tmp_path / "audit.xlsx"))
+
+
+def test_audit_writers_implement_write(tmp_path):
+    from pypas.audit import AuditWriter, open_audit_writer
+
+    with pytest.raises(TypeError):
+        AuditWriter()
+    with open_audit_writer(str(tmp_path / "audit.txt"), file_format="csv") as writer:
+        assert writer.write_rows([]) == 0
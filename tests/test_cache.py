@@ -0,0 +1,152 @@
+import os
+
+import httpx
+
+CCP_BASE_URL = "https://ccp.example.com/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_credential(content="secret", password_change_in_process=False):
+    from pypas.model.credential import Credential
+
+    return Credential(content, "user", "10.0.0.1", None, password_change_in_process)
+
+
+def test_cache_expires_and_wipes_secret():
+    from pypas.cache import CredentialCache
+
+    clock = FakeClock()
+    cache = CredentialCache(ttl=10, clock=clock)
+    cache.set("key", make_credential())
+    secret = cache._entries["key"].secret
+
+    assert cache.get("key").Content == "secret"
+    clock.now = 10
+    assert cache.get("key") is None
+    assert secret == bytearray(len("secret"))
+
+
+def test_cache_purges_expired_entries_that_are_never_read():
+    from pypas.cache import CredentialCache
+
+    clock = FakeClock()
+    cache = CredentialCache(ttl=10, clock=clock)
+    cache.set("cold", make_credential("cold"))
+    secret = cache._entries["cold"].secret
+    clock.now = 5
+    cache.set("hot", make_credential("hot"))
+    cache.get("cold")
+    clock.now = 12
+    cache.get("hot")
+
+    assert secret == bytearray(len("cold"))
+    assert len(cache) == 1
+    clock.now = 20
+    assert len(cache) == 0
+
+
+def test_cache_keeps_missing_content():
+    from pypas.cache import CredentialCache
+
+    cache = CredentialCache()
+    cache.set("key", make_credential(None))
+
+    assert cache.get("key").Content is None
+
+
+def test_cache_evicts_least_recently_used():
+    from pypas.cache import CredentialCache
+
+    cache = CredentialCache(maxsize=2)
+    cache.set("a", make_credential("a"))
+    cache.set("b", make_credential("b"))
+    cache.get("a")
+    cache.set("c", make_credential("c"))
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a").Content == "a"
+
+
+def test_get_credential_uses_cache_and_bypasses_password_change():
+    from pypas.cache import CredentialCache
+    from pypas.central_credential_provider import CentralCredentialProvider
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        in_process = request.url.params["Object"] == "changing"
+        return httpx.Response(200, json={"Content": "secret", "PasswordChangeInProcess": str(in_process)})
+
+    session = httpx.Client(transport=httpx.MockTransport(handler))
+    ccp = CentralCredentialProvider(CCP_BASE_URL, session=session, cache=CredentialCache())
+
+    assert ccp.credentials.get_credential("app", "safe", object="account").Content == "secret"
+    assert ccp.credentials.get_credential("app", "safe", object="account").Content == "secret"
+    assert len(calls) == 1
+
+    assert ccp.credentials.get_credential("app", "safe", object="changing").PasswordChangeInProcess is True
+    ccp.credentials.get_credential("app", "safe", object="changing")
+    assert len(calls) == 3
+
+
+def test_persistent_cache_is_shared_and_encrypted(tmp_path):
+    import pytest
+
+    fernet = pytest.importorskip("cryptography.fernet")
+    from pypas.cache import PersistentCredentialCache
+
+    clock = FakeClock()
+    key = fernet.Fernet.generate_key()
+    path = str(tmp_path / "credentials.db")
+    writer = PersistentCredentialCache(path, ttl=10, key=key, clock=clock)
+    reader = PersistentCredentialCache(path, ttl=10, key=key, clock=clock)
+
+    writer.set(("app", "safe"), make_credential("top-secret"))
+
+    assert reader.get(("app", "safe")).Content == "top-secret"
+    assert b"top-secret" not in (tmp_path / "credentials.db").read_bytes()
+    assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+    assert PersistentCredentialCache(path, key=fernet.Fernet.generate_key(), clock=clock).get(("app", "safe")) is None
+    clock.now = 10
+    assert reader.get(("app", "safe")) is None
+
+
+def test_persistent_cache_serves_ccp_across_processes(tmp_path, mock_server):
+    import pytest
+
+    fernet = pytest.importorskip("cryptography.fernet")
+    from pypas.cache import PersistentCredentialCache
+    from pypas.central_credential_provider import CentralCredentialProvider
+
+    key = fernet.Fernet.generate_key()
+    path = str(tmp_path / "credentials.db")
+    for _ in range(3):
+        with CentralCredentialProvider(mock_server.url, cache=PersistentCredentialCache(path, key=key)) as ccp:
+            assert ccp.credentials.get_credential("app", "safe", object="account").Content == "secret-account"
+
+    assert mock_server.requests["Credentials.get_credential"] == 1
+
+
+def test_cache_hit_does_not_build_the_transport():
+    from pypas.cache import CredentialCache
+    from pypas.central_credential_provider import CentralCredentialProvider
+    from pypas.instrumentation import MetricsRecorder
+
+    cache = CredentialCache()
+    session = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"Content": "x"})))
+    CentralCredentialProvider(CCP_BASE_URL, session=session, cache=cache).credentials.get_credential("app", "safe")
+
+    hooks = MetricsRecorder()
+    ccp = CentralCredentialProvider(CCP_BASE_URL, cache=cache, hooks=hooks)
+    assert ccp.credentials.get_credential("app", "safe").Content == "x"
+    assert ccp._transport is None
+    assert hooks.cache_hits["Credentials.get_credential"] == 1
@@ -1,9 +1,42 @@
-def test_ccp_get_password():
+def test_ccp_get_password(mock_server):
     from pypas.central_credential_provider import CentralCredentialProvider
-    from pypas.model.reqresuser import ReqresUser
+    from pypas.model.credential import Credential
 
-    ccp = CentralCredentialProvider("https://reqres.in/")
+    with CentralCredentialProvider(mock_server.url) as ccp:
+        creds = ccp.credentials.get_credential("app", "safe", object="account")
 
-    creds = ccp.credentials.get_credential("2")
-    print(creds)
-    assert isinstance(creds, ReqresUser)
+    assert isinstance(creds, Credential)
+    assert creds.Content == "secret-account"
+    assert mock_server.requests["Credentials.get_credential"] == 1
+
+
+def test_ccp_get_many_dedupes_and_captures_errors():
+    import httpx
+
+    from pypas.api.central_credential_provider_api import CredentialQuery
+    from pypas.central_credential_provider import CentralCredentialProvider
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["Object"])
+        if request.url.params["Object"] == "missing":
+            return httpx.Response(404, json={"ErrorCode": "APPAP004E"})
+        return httpx.Response(200, json={"Content": request.url.params["Object"], "PasswordChangeInProcess": "False"})
+
+    ccp = CentralCredentialProvider(
+        "https://ccp.example.com/", session=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    queries = [
+        CredentialQuery("app", "safe", object="a"),
+        {"app_id": "app", "safe": "safe", "object": "missing"},
+        CredentialQuery("app", "safe", object="b"),
+        CredentialQuery("app", "safe", object="a"),
+    ]
+
+    results = ccp.credentials.get_many(queries, max_concurrency=4)
+
+    assert sorted(calls) == ["a", "b", "missing"]
+    assert [result.ok for result in results] == [True, False, True, True]
+    assert [result.credential.Content for result in results if result.ok] == ["a", "b", "a"]
+    assert isinstance(results[1].error, httpx.HTTPStatusError)
@@ -0,0 +1,121 @@
+import dataclasses
+import json
+
+import pytest
+
+SAFE = {
+    "safeUrlId": "ww_mysafe",
+    "safeName": "ww_mysafe",
+    "safeNumber": 2,
+    "description": "",
+    "location": "\\",
+    "Creator": {"id": "1", "name": "Administrator"},
+    "olacEnabled": False,
+    "managingCPM": "PasswordManager",
+    "numberOfVersionsRetention": None,
+    "numberOfDaysRetention": 7,
+    "autoPurgeEnabled": False,
+    "creationTime": 1700000000,
+    "lastModificationTime": 1700000000,
+    "accounts": [{"id": "2_3", "name": "account"}],
+    "isExiredMember": False,
+}
+
+
+def test_slotted_models_have_no_instance_dict():
+    from pypas.model.compact import slotted
+    from pypas.model.safe import Safe, SafeCreator
+
+    safe = slotted(Safe)(*([None] * 15))
+
+    assert not hasattr(safe, "__dict__")
+    assert slotted(Safe) is slotted(Safe)
+    assert slotted(Safe).__annotations__["creator"] is slotted(SafeCreator)
+
+
+def test_frozen_slotted_models_are_immutable():
+    from pypas.model.compact import slotted
+    from pypas.model.safe import SafeCreator
+
+    creator = slotted(SafeCreator, frozen=True)("1", "Administrator")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        creator.name = "other"
+    assert hash(creator) == hash(slotted(SafeCreator, frozen=True)("1", "Administrator"))
+
+
+def test_decode_list_into_slotted_safes():
+    from pypas.model.compact import decode_list
+    from pypas.model.safe import Safe
+
+    safes = decode_list(json.dumps({"value": [SAFE, SAFE]}).encode(), Safe, key="value")
+
+    assert len(safes) == 2
+    assert safes[0].creator.name == "Administrator"
+    assert safes[0].accounts[0].id == "2_3"
+
+
+def test_decode_list_into_structs():
+    pytest.importorskip("msgspec")
+    from pypas.model.compact import decode_list
+    from pypas.model.safe import Safe
+
+    safes = decode_list(json.dumps({"value": [SAFE]}).encode(), Safe, key="value", compact="struct")
+
+    assert safes[0].creator.name == "Administrator"
+
+
+def test_safe_member_permissions_bitmask_roundtrip():
+    from pypas.model.safe_member import SafeMemberPermissions
+
+    permissions = SafeMemberPermissions(*(bit % 3 == 0 for bit in range(22)))
+    mask = permissions.to_bitmask()
+
+    assert mask & 1
+    assert not mask & 2
+    assert SafeMemberPermissions.from_bitmask(mask) == permissions
+
+
+def _plain(value):
+    """Convert models, compact variants and enums to comparable plain values."""
+    from enum import Enum
+
+    names = getattr(value, "__struct_fields__", None)
+    if names is None and dataclasses.is_dataclass(value):
+        names = [field.name for field in dataclasses.fields(value)]
+    if names is not None:
+        return {name: _plain(getattr(value, name)) for name in names}
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize("compact", ["slotted", "struct"])
+def test_decode_list_of_every_model(compact):
+    if compact == "struct":
+        pytest.importorskip("msgspec")
+    import httpx
+
+    from pypas import decoding
+    from pypas.model.compact import decode_list
+    from pypas.model.group import Group
+    from pypas.model.safe import Safe
+    from pypas.model.safe_member import SafeMember
+    from pypas.model.user import User
+    from pypas.testing import MockServer, MockServerConfig
+
+    config = MockServerConfig(number_of_safes=2, members_per_safe=4, number_of_users=3, number_of_groups=2)
+    listings = [
+        ("API/Safes", "value", Safe, decoding.safe_from_dict),
+        ("API/Safes/safe0/Members/", "value", SafeMember, decoding.safe_member_from_dict),
+        ("API/Users?ExtendedDetails=true", "Users", User, decoding.user_from_dict),
+        ("API/UserGroups?includeMembers=true", "value", Group, decoding.group_from_dict),
+    ]
+    with MockServer(config) as server:
+        for path, key, cls, from_dict in listings:
+            content = httpx.get(f"{server.url}PasswordVault/{path}").content
+            items = decode_list(content, cls, key=key, compact=compact)
+
+            assert [_plain(item) for item in items] == [_plain(from_dict(data)) for data in json.loads(content)[key]]
@@ -0,0 +1,98 @@
+def make_server(**kwargs):
+    from pypas.testing import MockServer, MockServerConfig
+
+    return MockServer(MockServerConfig(**{"number_of_users": 25, "number_of_groups": 4, **kwargs}))
+
+
+def test_users_and_groups_endpoints():
+    from pypas.model.group import GroupType
+    from pypas.model.user import UserSource
+    from pypas.vault import Vault
+
+    with make_server() as server, Vault(server.url) as vault:
+        users = list(vault.Users.iter_users(page_size=10))
+        user = vault.Users.get(4)
+        many = vault.Users.get_many([1, 2, 3])
+        groups = list(vault.Groups.iter_groups(page_size=3, include_members=True))
+        group = vault.Groups.get(2, include_members=False)
+        requests = dict(server.requests)
+
+    assert [user.username for user in users] == [f"user{number}" for number in range(25)]
+    assert users[0].source is UserSource.CyberArk and users[0].groupsMembership == []
+    assert user.username == "user3" and user.groupsMembership[0].groupName == "group3"
+    assert user.groupsMembership[0].groupType is GroupType.Vault
+    assert [user.id for user in many] == [1, 2, 3]
+    assert [member.UserName for member in groups[1].members] == [f"user{number}" for number in range(1, 25, 4)]
+    assert group.groupName == "group1" and group.members is None
+    assert requests["Users.list"] == 3 and requests["Groups.list"] == 2
+
+
+def test_user_round_trips_through_dict():
+    from pypas.decoding import user_from_dict, user_to_dict
+    from pypas.testing import MockServer
+
+    data = MockServer()._user(0, details=True)
+    user = user_from_dict(data)
+
+    assert user_from_dict(user_to_dict(user)) == user
+
+
+def test_directory_sync_fetches_only_changed_users(tmp_path):
+    from pypas.directory import DirectorySync
+    from pypas.inventory import ChangeType
+    from pypas.vault import Vault
+
+    path = str(tmp_path / "directory.db")
+    with make_server() as server, Vault(server.url) as vault:
+        with DirectorySync(path) as sync:
+            first = sync.sync(vault, page_size=10)
+            unchanged = sync.sync(vault, page_size=10)
+        assert server.requests["Users.get"] == 25
+        assert {change.type for change in first} == {ChangeType.ADDED}
+        assert unchanged == []
+
+        server.update_user(5, location="\\Contractors")
+        server.move_user(6, 0)
+        server.delete_user(7)
+        with DirectorySync(path) as sync:
+            assert sync.index.groups_of("user6") == {"group2"}
+            changes = sync.sync(vault, page_size=10)
+            index = sync.index
+        fetched = server.requests["Users.get"]
+
+    assert fetched == 25 + 1
+    assert sorted((change.type.value, change.id) for change in changes) == [
+        ("deleted", "8"),
+        ("modified", "1"),
+        ("modified", "3"),
+        ("modified", "4"),
+        ("modified", "6"),
+    ]
+    assert index.users["user5"].location == "\\Contractors"
+    assert index.groups_of("user6") == {"group0"}
+    assert "user6" not in index.users_of("group2")
+    assert "user7" not in index.users and index.groups_of("user7") == set()
+
+
+def test_directory_sync_treats_users_deleted_after_the_listing_as_deleted():
+    from pypas.directory import DirectorySync
+    from pypas.inventory import ChangeType
+    from pypas.vault import Vault
+
+    with make_server() as server, Vault(server.url) as vault, DirectorySync() as sync:
+        sync.sync(vault)
+        server.update_user(5, location="\\Contractors")
+        iter_users = vault.Users.iter_users
+
+        def list_then_delete(**kwargs):
+            yield from iter_users(**kwargs)
+            server.delete_user(5)
+
+        vault.Users.iter_users = list_then_delete
+        changes = sync.sync(vault)
+
+    assert [(change.type, change.id) for change in changes] == [
+        (ChangeType.DELETED, "6"),
+        (ChangeType.MODIFIED, "2"),
+    ]
+    assert "user5" not in sync.index.users and "user5" not in sync.index.users_of("group1")
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def run(code):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def test_import_ccp_is_lightweight():
+    code = (
+        "import sys\n"
+        "from pypas.central_credential_provider import CentralCredentialProvider\n"
+        "CentralCredentialProvider('https://ccp.example.com/')\n"
+        "deferred = ('httpx', 'asyncio', 'ssl', 'sqlite3', 'orjson', 'msgspec', 'pypas.model.safe', 'pypas.cache',\n"
+        "            'hashlib', 'json')\n"
+        "print(','.join(m for m in deferred if m in sys.modules))\n"
+    )
+    result = run(code)
+
+    assert result.stdout.strip() == ""
+
+
+def test_import_vault_defers_http_stack():
+    result = run("import sys, pypas.vault\nprint('httpx' in sys.modules, 'asyncio' in sys.modules)")
+
+    assert result.stdout.strip() == "False False"
+
+
+def test_import_package_is_lazy():
+    result = run("import sys, pypas\nprint('pypas.vault' in sys.modules, pypas.Vault.__module__)")
+
+    assert result.stdout.strip() == "False pypas.vault"
+
+
+def test_package_exports():
+    import pypas
+    from pypas.vault import Vault
+
+    assert pypas.Vault is Vault
+    assert "CentralCredentialProvider" in dir(pypas)
+    assert set(pypas.__all__) <= set(dir(pypas))
+
+
+def test_transport_is_created_on_first_use(mock_server):
+    from pypas.central_credential_provider import CentralCredentialProvider
+
+    ccp = CentralCredentialProvider(mock_server.url)
+    assert ccp._transport is None
+
+    ccp.credentials.get_credential("App", "Safe", object="Object")
+
+    assert ccp._transport is not None
+    ccp.close()
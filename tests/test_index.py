@@ -0,0 +1,107 @@
+import dataclasses
+
+import pytest
+
+
+def make_member(safe_url_id, name, member_type="User", **permissions):
+    from pypas.model.safe_member import SafeMember, SafeMemberPermissions, SafeMemberType
+
+    granted = SafeMemberPermissions(*([False] * len(dataclasses.fields(SafeMemberPermissions))))
+    granted = dataclasses.replace(granted, **permissions)
+    return SafeMember(
+        safe_url_id, safe_url_id, 1, 1, name, SafeMemberType[member_type], None, False, False, granted, False
+    )
+
+
+def make_user(username, *groups):
+    from pypas.model.group import GroupType
+    from pypas.model.user import User, UserGroupsMembership
+
+    user = User(*([None] * len(dataclasses.fields(User))))
+    user.username = username
+    user.groupsMembership = [UserGroupsMembership(1, group, GroupType.Vault) for group in groups]
+    return user
+
+
+def make_safe(safe_url_id, cpm):
+    from pypas.model.safe import Safe
+
+    safe = Safe(*([None] * len(dataclasses.fields(Safe))))
+    safe.safeUrlId = safe_url_id
+    safe.managingCPM = cpm
+    return safe
+
+
+def build_index():
+    from pypas.index import VaultIndex
+
+    return VaultIndex.build(
+        safes=[make_safe("linux", "PasswordManager"), make_safe("windows", "PasswordManager_win")],
+        members=[
+            make_member("linux", "Auditors", "Group", manageSafe=True, retrieveAccounts=True),
+            make_member("windows", "alice", retrieveAccounts=True, listAccounts=True),
+            make_member("windows", "Auditors", "Group", listAccounts=True),
+        ],
+        users=[make_user("alice", "Auditors"), make_user("bob", "auditors")],
+    )
+
+
+def test_index_answers_access_queries():
+    index = build_index()
+
+    assert [safe.safeUrlId for safe in index.safes_managed_by_cpm("passwordmanager")] == ["linux"]
+    assert index.safes_with_permission("Auditors", "manageSafe") == ["linux"]
+    assert index.safes_with_permission("alice", "retrieveAccounts") == ["linux", "windows"]
+    assert index.safes_with_permission("alice", "retrieveAccounts", include_groups=False) == ["windows"]
+    assert index.members_with_permission("linux", "retrieveAccounts") == {"alice", "bob"}
+    assert index.members_with_permission("linux", "retrieveAccounts", expand_groups=False) == {"auditors"}
+    assert index.grants("listAccounts") == {("windows", "alice"), ("windows", "auditors")}
+    assert index.permissions("windows", "ALICE").retrieveAccounts
+
+
+def test_index_replaces_memberships_and_rejects_unknown_permissions():
+    index = build_index()
+
+    index.add_member(make_member("windows", "alice", listAccounts=True))
+    index.add_user(make_user("bob"))
+
+    assert index.safes_with_permission("alice", "retrieveAccounts", include_groups=False) == []
+    assert index.users_of("Auditors") == {"alice"}
+    with pytest.raises(ValueError):
+        index.grants("fly")
+
+
+def test_index_keeps_member_types_per_membership_and_removes_safes():
+    index = build_index()
+    index.add_safe(make_safe("unix", "PasswordManager"))
+    index.add_member(make_member("unix", "auditors", retrieveAccounts=True))
+
+    assert index.members_with_permission("unix", "retrieveAccounts") == {"auditors"}
+    assert index.members_with_permission("linux", "retrieveAccounts") == {"alice", "bob"}
+
+    index.remove_safe("linux")
+
+    assert "linux" not in index.safes
+    assert [safe.safeUrlId for safe in index.safes_managed_by_cpm("PasswordManager")] == ["unix"]
+    assert index.safes_with_permission("Auditors", "manageSafe") == []
+    assert index.grants("retrieveAccounts") == {("windows", "alice"), ("unix", "auditors")}
+
+
+def test_index_removing_unknown_memberships_does_not_grow_the_index():
+    index = build_index()
+    index.remove_member("unknown", "alice")
+    index.remove_member("linux", "unknown")
+
+    assert "unknown" not in index._members_by_safe
+    assert "unknown" not in index._safes_by_member
+    assert all("unknown" not in key for key in index._safes_by_member_type)
+
+    grants = index.grants("retrieveAccounts")
+    index.add_safe(make_safe("unix", "PasswordManager"))
+    index.add_member(make_member("unix", "operators", retrieveAccounts=True))
+    index.remove_member("unix", "Operators")
+
+    assert "unix" not in index._members_by_safe
+    assert "operators" not in index._safes_by_member
+    assert all("operators" not in key for key in index._safes_by_member_type)
+    assert index.grants("retrieveAccounts") == grants
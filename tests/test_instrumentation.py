@@ -0,0 +1,63 @@
+import httpx
+
+CCP_BASE_URL = "https://ccp.example.com/"
+
+
+def test_metrics_recorder_counts_requests_cache_and_retries():
+    from pypas.cache import CredentialCache
+    from pypas.central_credential_provider import CentralCredentialProvider
+    from pypas.instrumentation import MetricsRecorder
+    from pypas.resilience import RetryPolicy
+
+    statuses = iter([503, 200, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses), json={"Content": "secret"})
+
+    hooks = MetricsRecorder()
+    ccp = CentralCredentialProvider(
+        CCP_BASE_URL,
+        session=httpx.Client(transport=httpx.MockTransport(handler)),
+        cache=CredentialCache(),
+        retry=RetryPolicy(backoff_factor=0),
+        hooks=hooks,
+    )
+
+    ccp.credentials.get_credential("app", "safe", object="a")
+    ccp.credentials.get_credential("app", "safe", object="a")
+    ccp.credentials.get_credential("app", "safe", object="b")
+
+    summary = hooks.summary()["Credentials.get_credential"]
+    assert summary["requests"] == 3
+    assert summary["errors"] == 1
+    assert summary["mean_total"] > 0
+    assert hooks.cache_hits["Credentials.get_credential"] == 1
+    assert hooks.cache_misses["Credentials.get_credential"] == 2
+    assert hooks.retries["ccp.example.com"] == 1
+
+
+def test_tracer_splits_request_phases():
+    from pypas.instrumentation import Tracer
+
+    tracer = Tracer()
+    tracer.started = 0.0
+    tracer.events = {
+        "connection.connect_tcp.started": 1.0,
+        "connection.connect_tcp.complete": 3.0,
+        "connection.start_tls.started": 3.0,
+        "connection.start_tls.complete": 7.0,
+        "http11.send_request_headers.started": 7.0,
+        "http11.receive_response_headers.complete": 10.0,
+    }
+
+    timing = tracer.timing("Safes.list", "GET", "pvwa.example.com", 200)
+
+    assert (timing.pool_wait, timing.connect, timing.tls, timing.ttfb) == (1.0, 2.0, 4.0, 10.0)
+
+
+def test_default_hooks_do_not_trace():
+    from pypas.instrumentation import Hooks
+    from pypas.transport import Transport
+
+    assert Transport().hooks.enabled is False
+    assert Hooks().on_request(None) is None
@@ -0,0 +1,72 @@
+import pytest
+
+
+def make_specs():
+    from pypas.model.safe_member import SafeMemberType
+    from pypas.provisioning import MemberSpec, SafeSpec
+
+    return [
+        SafeSpec(
+            f"app{number}",
+            number_of_days_retention=7,
+            managing_cpm="PasswordManager",
+            members=[
+                MemberSpec("alice", ["useAccounts", "retrieveAccounts", "listAccounts"]),
+                MemberSpec("Auditors", ["viewAuditLog"], member_type=SafeMemberType.Group),
+            ],
+        )
+        for number in range(20)
+    ] + [SafeSpec("safe1", number_of_days_retention=7, members=[MemberSpec("alice", ["listAccounts"])])]
+
+
+def test_provision_creates_safes_and_members_idempotently(mock_server):
+    from pypas.provisioning import ProvisioningStatus, provision
+    from pypas.vault import Vault
+
+    with Vault(mock_server.url) as vault:
+        first = provision(vault, make_specs(), max_concurrency=4)
+        second = provision(vault, make_specs(), max_concurrency=4, update_existing=True)
+
+    assert [result.status for result in first] == [ProvisioningStatus.CREATED] * 20 + [ProvisioningStatus.EXISTS]
+    assert all(result.ok for result in first)
+    assert [member.member_name for member in first[0].members] == ["alice", "Auditors"]
+    assert {result.status for result in second} == {ProvisioningStatus.UPDATED}
+    assert {member.status for result in second for member in result.members} == {ProvisioningStatus.UPDATED}
+    assert mock_server.members[("app3", "alice")]["permissions"]["retrieveAccounts"] is True
+    assert mock_server.members[("app3", "auditors")]["memberType"] == "Group"
+    assert mock_server.requests["SafeMembers.add"] == 82
+
+
+def test_provision_validates_before_sending(mock_server):
+    from pypas.provisioning import MemberSpec, SafeSpec, provision
+    from pypas.vault import Vault
+
+    specs = [
+        SafeSpec("app", number_of_days_retention=7, number_of_versions_retention=5),
+        SafeSpec("APP", number_of_days_retention=7, members=[MemberSpec("alice", ["fly"])]),
+    ]
+
+    with Vault(mock_server.url) as vault, pytest.raises(ValueError) as error:
+        provision(vault, specs)
+
+    assert "listed more than once" in str(error.value)
+    assert "unknown permissions ['fly']" in str(error.value)
+    assert "Only one of" in str(error.value)
+    assert sum(mock_server.requests.values()) == 0
+
+
+def test_provision_encodes_names_of_existing_safes(mock_server):
+    from pypas.provisioning import MemberSpec, ProvisioningStatus, SafeSpec, provision
+    from pypas.vault import Vault
+
+    names = ["Ops #1", "50% ü", "a/b?c"]
+    specs = [
+        SafeSpec(name, number_of_days_retention=7, members=[MemberSpec("alice", ["listAccounts"])]) for name in names
+    ]
+    with Vault(mock_server.url) as vault:
+        provision(vault, specs)
+        results = provision(vault, specs, update_existing=True)
+
+    assert [result.status for result in results] == [ProvisioningStatus.UPDATED] * 3
+    assert [result.members[0].status for result in results] == [ProvisioningStatus.UPDATED] * 3
+    assert all((name, "alice") in mock_server.members for name in names)
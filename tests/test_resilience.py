@@ -0,0 +1,101 @@
+import httpx
+import pytest
+
+VAULT_BASE_URL = "https://pvwa.example.com/"
+SAFES_URL = f"{VAULT_BASE_URL}PasswordVault/API/Safes"
+
+
+def make_vault(handler, **retry):
+    from pypas.resilience import RetryPolicy
+    from pypas.vault import Vault
+
+    policy = RetryPolicy(backoff_factor=0, jitter=False, **retry)
+    return Vault(VAULT_BASE_URL, session=httpx.Client(transport=httpx.MockTransport(handler)), retry=policy)
+
+
+def flaky_handler(failures: int, calls: list, status: int = 503):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if len(calls) <= failures:
+            return httpx.Response(status)
+        return httpx.Response(200, json={})
+
+    return handler
+
+
+def test_idempotent_requests_are_retried():
+    calls = []
+    vault = make_vault(flaky_handler(2, calls))
+
+    assert vault.get_request(SAFES_URL).status_code == 200
+    assert calls == ["GET", "GET", "GET"]
+
+
+def test_post_requests_are_not_retried():
+    calls = []
+    vault = make_vault(flaky_handler(1, calls))
+
+    assert vault.post_request(SAFES_URL, body={}).status_code == 503
+    assert calls == ["POST"]
+
+
+def test_retry_after_is_honored():
+    from pypas.resilience import RetryPolicy
+
+    delays = []
+    responses = iter([httpx.Response(429, headers={"Retry-After": "7"}), httpx.Response(200)])
+    policy = RetryPolicy(jitter=False)
+
+    response = policy.send("GET", "pvwa.example.com", lambda: next(responses), sleep=delays.append)
+
+    assert response.status_code == 200
+    assert delays == [7.0]
+
+
+def test_circuit_opens_after_consecutive_failures():
+    from pypas.resilience import CircuitOpenError
+
+    calls = []
+    vault = make_vault(flaky_handler(100, calls), max_retries=0, failure_threshold=3)
+
+    for _ in range(3):
+        assert vault.get_request(SAFES_URL).status_code == 503
+    with pytest.raises(CircuitOpenError):
+        vault.get_request(SAFES_URL)
+    assert len(calls) == 3
+
+
+def test_retry_budget_limits_retries():
+    from pypas.resilience import RetryBudget
+
+    calls = []
+    vault = make_vault(flaky_handler(100, calls), budget=RetryBudget(ratio=0, min_tokens=2), failure_threshold=100)
+
+    vault.get_request(SAFES_URL)
+    vault.get_request(SAFES_URL)
+
+    assert len(calls) == 4
+
+
+def test_cancelled_trial_releases_the_circuit():
+    import asyncio
+
+    from pypas.resilience import RetryPolicy
+
+    policy = RetryPolicy(max_retries=0, failure_threshold=1, reset_timeout=0)
+    assert policy.send("GET", "pvwa", lambda: httpx.Response(503)).status_code == 503
+    assert policy.breaker("pvwa").open
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    async def cancel_trial():
+        trial = asyncio.ensure_future(policy.asend("GET", "pvwa", hang))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancel_trial())
+    assert policy.send("GET", "pvwa", lambda: httpx.Response(200)).status_code == 200
+    assert not policy.breaker("pvwa").open
@@ -0,0 +1,174 @@
+import asyncio
+
+import httpx
+
+VAULT_BASE_URL = "https://pvwa.example.com/"
+NUMBER_OF_SAFES = 57
+
+
+def make_safe(number: int) -> dict:
+    return {
+        "safeUrlId": f"safe{number}",
+        "safeName": f"safe{number}",
+        "safeNumber": number,
+        "description": "",
+        "location": "\\",
+        "Creator": {"id": "1", "name": "Administrator"},
+        "olacEnabled": False,
+        "managingCPM": "PasswordManager",
+        "numberOfVersionsRetention": None,
+        "numberOfDaysRetention": 7,
+        "autoPurgeEnabled": False,
+        "creationTime": 1700000000,
+        "lastModificationTime": 1700000000 + number,
+        "isExiredMember": False,
+    }
+
+
+def make_handler(requests: list, next_link: bool):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        safes = [make_safe(number) for number in range(offset, min(offset + limit, NUMBER_OF_SAFES))]
+        body = {"value": safes, "count": NUMBER_OF_SAFES}
+        if next_link:
+            has_next = offset + limit < NUMBER_OF_SAFES
+            body["nextLink"] = f"API/Safes?offset={offset + limit}&limit={limit}" if has_next else ""
+        return httpx.Response(200, json=body)
+
+    return handler
+
+
+def test_iter_safes_follows_next_link_with_prefetch():
+    from pypas.vault import Vault
+
+    requests = []
+    vault = Vault(VAULT_BASE_URL, session=httpx.Client(transport=httpx.MockTransport(make_handler(requests, True))))
+
+    safes = list(vault.Safes.iter_safes(page_size=10, prefetch=True))
+
+    assert [safe.safeNumber for safe in safes] == list(range(NUMBER_OF_SAFES))
+    assert len(requests) == 6
+
+
+def test_iter_safes_falls_back_to_offset():
+    from pypas.vault import Vault
+
+    requests = []
+    vault = Vault(VAULT_BASE_URL, session=httpx.Client(transport=httpx.MockTransport(make_handler(requests, False))))
+
+    iterator = vault.Safes.iter_safes(page_size=20)
+
+    assert next(iterator).safeName == "safe0"
+    assert len(requests) == 1
+    assert len(list(iterator)) == NUMBER_OF_SAFES - 1
+
+
+def test_async_iter_safes():
+    from pypas.vault import AsyncVault
+
+    requests = []
+
+    async def run():
+        session = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(requests, True)))
+        async with AsyncVault(VAULT_BASE_URL, session=session) as vault:
+            return [safe.safeNumber async for safe in vault.Safes.iter_safes(page_size=25, prefetch=True)]
+
+    assert asyncio.run(run()) == list(range(NUMBER_OF_SAFES))
+
+
+def test_safe_responses_are_parsed_once(monkeypatch):
+    import pypas.decoding
+    from pypas.vault import Vault
+
+    parsed = []
+    loads = pypas.decoding.loads
+
+    def counting_loads(content):
+        parsed.append(content)
+        return loads(content)
+
+    monkeypatch.setattr(pypas.decoding, "loads", counting_loads)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/Safes"):
+            return httpx.Response(200, json={"value": [make_safe(1), make_safe(2)], "count": 2})
+        return httpx.Response(200, json=make_safe(1))
+
+    vault = Vault(VAULT_BASE_URL, session=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    assert vault.Safes.get("safe1").safeNumber == 1
+    assert [safe.safeName for safe in vault.Safes.list()] == ["safe1", "safe2"]
+    assert len(parsed) == 2
+
+
+def test_iter_safes_against_mock_server():
+    from pypas.testing import MockServer, MockServerConfig
+    from pypas.vault import Vault
+
+    config = MockServerConfig(number_of_safes=250, error_rate=0.05, require_auth=True, seed=7)
+    with MockServer(config) as server, Vault(server.url) as vault:
+        vault.Authentication.logon("user", "password")
+        numbers = [safe.safeNumber for safe in vault.Safes.iter_safes(page_size=100, prefetch=True)]
+
+    assert numbers == list(range(250))
+    assert server.logons == 1
+
+
+def test_inventory_sync_fetches_only_changed_safes(tmp_path):
+    from pypas.inventory import ChangeType, SafeInventory
+    from pypas.testing import MockServer, MockServerConfig
+    from pypas.vault import Vault
+
+    changes = []
+    with MockServer(MockServerConfig(number_of_safes=50)) as server, Vault(server.url) as vault:
+        with SafeInventory(str(tmp_path / "inventory.db")) as inventory:
+            assert len(inventory.sync(vault, page_size=20)) == 50
+        server.modify(3, 1800000000)
+        server.delete(7)
+
+        with SafeInventory(str(tmp_path / "inventory.db")) as inventory:
+            inventory.sync(vault, page_size=20, on_change=changes.append)
+            assert inventory.sync(vault, page_size=20) == []
+            assert len(inventory) == 49
+            assert inventory.get("safe3").lastModificationTime == 1800000000
+            assert inventory.get("safe3").accounts[0].name == "account3"
+            assert inventory.synced_at is not None
+
+    assert [(change.type, change.safeUrlId) for change in changes] == [
+        (ChangeType.MODIFIED, "safe3"),
+        (ChangeType.DELETED, "safe7"),
+    ]
+    assert changes[-1].safe.safeNumber == 7
+    assert server.requests["Safes.get"] == 51
+
+
+def test_inventory_sync_treats_safes_deleted_after_the_listing_as_deleted():
+    from pypas.inventory import ChangeType, SafeInventory
+    from pypas.testing import MockServer, MockServerConfig
+    from pypas.vault import Vault
+
+    with MockServer(MockServerConfig(number_of_safes=10)) as server, Vault(server.url) as vault:
+        with SafeInventory() as inventory:
+            inventory.sync(vault)
+            server.modify(3, 1800000000)
+            iter_safes = vault.Safes.iter_safes
+
+            def list_then_delete(**kwargs):
+                yield from iter_safes(**kwargs)
+                server.delete(3)
+
+            vault.Safes.iter_safes = list_then_delete
+            changes = inventory.sync(vault)
+
+            assert [(change.type, change.safeUrlId) for change in changes] == [(ChangeType.DELETED, "safe3")]
+            assert len(inventory) == 9
+
+
+def test_safe_url_ids_are_interpolated_as_returned():
+    from pypas.api.safe_api import _get_url
+    from pypas.api.safe_member_api import _members_url
+
+    assert _get_url(VAULT_BASE_URL, "my%20safe") == f"{VAULT_BASE_URL}PasswordVault/API/Safes/my%20safe/"
+    assert _members_url(VAULT_BASE_URL, "my%20safe") == f"{VAULT_BASE_URL}PasswordVault/API/Safes/my%20safe/Members/"
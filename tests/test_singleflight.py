@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+def test_single_flight_coalesces_concurrent_calls_and_errors():
+    from pypas.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def function():
+        calls.append(1)
+        release.wait()
+        if len(calls) > 1:
+            raise ValueError("second flight")
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", function))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(set(map(id, results))) == 1
+    assert len(flight) == 0
+    with pytest.raises(ValueError):
+        flight.do("key", function)
+
+
+def test_async_single_flight_survives_cancelled_waiter():
+    from pypas.singleflight import AsyncSingleFlight
+
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def function():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("key", function))
+        others = [asyncio.ensure_future(flight.do("key", function)) for _ in range(4)]
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(run()) == ["value"] * 4
+    assert len(calls) == 1
+    assert len(flight) == 0
+
+
+def test_expired_cache_entry_is_fetched_once(mock_server):
+    from pypas.cache import CredentialCache
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider, CentralCredentialProvider
+    from pypas.testing import MockServerConfig
+    from pypas.vault import Vault
+
+    mock_server.config = MockServerConfig(latency=0.05)
+    with CentralCredentialProvider(mock_server.url, cache=CredentialCache()) as ccp, Vault(mock_server.url) as vault:
+        contents = ccp.map(lambda _: ccp.credentials.get_credential("app", "safe", object="a").Content, range(16))
+        safes = vault.map(vault.Safes.get, ["safe1"] * 16, max_workers=16)
+
+    async def run():
+        async with AsyncCentralCredentialProvider(mock_server.url) as ccp:
+            lookups = [ccp.credentials.get_credential("app", "safe", object="b") for _ in range(16)]
+            return [credential.Content for credential in await asyncio.gather(*lookups)]
+
+    assert contents == ["secret-a"] * 16
+    assert {safe.safeNumber for safe in safes} == {1}
+    assert asyncio.run(run()) == ["secret-b"] * 16
+    assert mock_server.requests["Credentials.get_credential"] == 2
+    assert mock_server.requests["Safes.get"] == 1
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+
+def test_spark_to_row_flattens_models():
+    from pypas.model.safe import Safe, SafeAccount, SafeCreator
+    from pypas.model.safe_member import SafeMemberPermissions, SafeMemberType
+    from pypas.decoding import safe_member_from_dict
+    from pypas.spark import to_row
+    from pypas.testing import mock_safe_member
+
+    safe = Safe(
+        "s",
+        "s",
+        1,
+        "",
+        "\\",
+        SafeCreator("1", "admin"),
+        False,
+        "",
+        None,
+        7,
+        False,
+        0,
+        0,
+        [SafeAccount("a", "b")],
+        False,
+    )
+    member = safe_member_from_dict(mock_safe_member("s", 3))
+
+    assert to_row(safe)[5] == ("1", "admin")
+    assert to_row(safe)[13] == [("a", "b")]
+    assert to_row(member)[5] == SafeMemberType.Group.name
+    assert to_row(member)[9] == to_row(SafeMemberPermissions.from_bitmask(member.permissions.to_bitmask()))
+
+
+def test_spark_vault_connection_is_cached_per_process(mock_server):
+    import pickle
+
+    from pypas.spark import VaultConnection
+
+    connection = VaultConnection(mock_server.url, "user", "password", page_size=10)
+
+    assert connection.vault() is connection.vault()
+    assert pickle.loads(pickle.dumps(connection)) == connection
+    assert "password" not in repr(connection)
+    assert mock_server.logons == 1
+
+
+def test_spark_users_are_listed_per_partition():
+    from pypas.spark import VaultConnection, _list_users
+    from pypas.testing import MockServer, MockServerConfig
+
+    with MockServer(MockServerConfig(number_of_users=25)) as server:
+        connection = VaultConnection(server.url, page_size=10)
+        rows = list(_list_users(connection, iter([10, 20]), extended_details=True))
+
+    assert [row[0] for row in rows] == list(range(11, 26))
+    assert rows[0][21] == [(1, "group0", "Vault")]
+
+
+@pytest.fixture(scope="module")
+def spark_session():
+    pytest.importorskip("pyspark")
+    from pyspark.sql import SparkSession
+
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [source, os.environ.get("PYTHONPATH")]))
+    session = SparkSession.builder.master("local[2]").appName("pypas").getOrCreate()
+    yield session
+    session.stop()
+
+
+def test_spark_safes_members_accounts_and_users_dataframes(spark_session):
+    from pypas.model.safe import Safe
+    from pypas.model.safe_member import SafeMember
+    from pypas.model.user import User
+    from pypas.spark import (
+        VaultConnection,
+        safe_accounts_dataframe,
+        safe_members_dataframe,
+        safes_dataframe,
+        schema_of,
+        users_dataframe,
+    )
+    from pypas.testing import MockServer, MockServerConfig
+
+    config = MockServerConfig(number_of_safes=45, members_per_safe=4, number_of_users=25, require_auth=True)
+    with MockServer(config) as server:
+        connection = VaultConnection(server.url, "user", "password", page_size=10)
+        safes = safes_dataframe(spark_session, connection, num_partitions=3)
+        members = safe_members_dataframe(spark_session, connection, safes, num_partitions=4)
+        accounts = safe_accounts_dataframe(spark_session, connection, ["safe1", "safe2"])
+        users = users_dataframe(spark_session, connection, extended_details=True, num_partitions=2)
+
+        assert safes.schema == schema_of(Safe)
+        assert members.schema == schema_of(SafeMember)
+        assert sorted(row.safeNumber for row in safes.collect()) == list(range(45))
+        assert members.count() == 45 * 4
+        assert members.filter("memberType = 'Group'").count() == 45
+        assert members.filter("permissions.manageSafe").count() == 45
+        assert [tuple(row) for row in accounts.orderBy("safeUrlId").collect()] == [
+            ("safe1", "1_1", "account1"),
+            ("safe2", "2_1", "account2"),
+        ]
+        assert users.schema == schema_of(User)
+        assert sorted(row.id for row in users.collect()) == list(range(1, 26))
+        assert users.filter("groupsMembership[0].groupName = 'group0'").count() == 25
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import httpx
+
+CCP_BASE_URL = "https://ccp.example.com/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    from pypas.throttle import TokenBucket
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert round(bucket.reserve(), 3) == 0.1
+    assert round(bucket.reserve(), 3) == 0.2
+    clock.now = 1
+    assert bucket.reserve() == 0
+
+
+def test_max_in_flight_limits_threads_and_records_metrics():
+    from pypas.central_credential_provider import CentralCredentialProvider
+    from pypas.throttle import Throttle
+
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            in_flight.append(request)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(request)
+        return httpx.Response(200, json={"Content": "secret"})
+
+    throttle = Throttle(max_in_flight=3)
+    session = httpx.Client(transport=httpx.MockTransport(handler))
+    ccp = CentralCredentialProvider(CCP_BASE_URL, session=session, throttle=throttle)
+
+    ccp.credentials.get_many([{"app_id": "app", "safe": "safe", "object": str(i)} for i in range(20)], 10)
+
+    assert max(peak) <= 3
+    assert throttle.metrics.requests == 20
+    assert throttle.metrics.wire_seconds >= 20 * 0.01
+    assert throttle.metrics.queued_seconds > 0
+
+
+def test_max_in_flight_limits_coroutines():
+    from pypas.central_credential_provider import AsyncCentralCredentialProvider
+    from pypas.throttle import Throttle
+
+    in_flight = []
+    peak = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        in_flight.append(request)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request)
+        return httpx.Response(200, json={"Content": "secret"})
+
+    async def run():
+        session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        ccp = AsyncCentralCredentialProvider(CCP_BASE_URL, session=session, throttle=Throttle(max_in_flight=2))
+        await asyncio.gather(*(ccp.credentials.get_credential("app", "safe", object=str(i)) for i in range(10)))
+
+    asyncio.run(run())
+
+    assert max(peak) == 2
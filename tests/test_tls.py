@@ -0,0 +1,156 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+
+@pytest.fixture
+def certificate(tmp_path):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not available")
+    certificate_path = tmp_path / "client.pem"
+    key_path = tmp_path / "client.key"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-subj",
+            "/CN=pypas",
+            "-days",
+            "1",
+            "-keyout",
+            str(key_path),
+            "-out",
+            str(certificate_path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return str(certificate_path), str(key_path)
+
+
+def test_ssl_context_is_cached_until_certificate_changes(certificate):
+    from pypas.tls import ClientCertificateCache
+
+    cache = ClientCertificateCache()
+    key, context = cache.context(*certificate)
+
+    assert cache.context(*certificate) == (key, context)
+
+    stat = os.stat(certificate[0])
+    os.utime(certificate[0], (stat.st_atime, stat.st_mtime + 10))
+    new_key, new_context = cache.context(*certificate)
+
+    assert new_context is not context
+    assert len(cache._contexts) == 1
+
+
+def test_certificate_client_is_pooled(certificate):
+    from pypas.transport import Transport
+
+    transport = Transport("https://ccp.example.com/")
+    client = transport.certificate_client(*certificate)
+
+    assert transport.certificate_client(*certificate) is client
+    transport.close()
+    assert client.is_closed
+
+
+def test_certificate_clients_are_pooled_per_key(certificate):
+    from pypas.transport import Transport
+
+    certificate_path, key_path = certificate
+    other_key_path = shutil.copy(key_path, key_path + ".copy")
+    transport = Transport("https://ccp.example.com/")
+    client = transport.certificate_client(certificate_path, key_path)
+    other = transport.certificate_client(certificate_path, other_key_path)
+
+    assert other is not client
+    assert transport.certificate_client(certificate_path, key_path) is client
+    assert not client.is_closed
+    transport.close()
+
+
+@pytest.fixture
+def https_server(certificate):
+    import ssl
+
+    from pypas.testing import MockServer, MockServerConfig
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(*certificate)
+    context.load_verify_locations(certificate[0])
+    context.verify_mode = ssl.CERT_REQUIRED
+    with MockServer(MockServerConfig(latency=0.3), ssl_context=context) as server:
+        yield server
+
+
+def rotate(certificate_path):
+    stat = os.stat(certificate_path)
+    os.utime(certificate_path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_replaced_certificate_client_drains_requests_in_flight(certificate, https_server):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from pypas.transport import Transport
+
+    transport = Transport(https_server.url, verify=False)
+    url = f"{https_server.url}PasswordVault/API/Safes"
+    client = transport.certificate_client(*certificate)
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(transport.request, "GET", url, cert=certificate) for _ in range(4)]
+        time.sleep(0.1)
+        rotate(certificate[0])
+
+        assert transport.certificate_client(*certificate) is not client
+        assert not client.is_closed
+        statuses = [future.result().status_code for future in futures]
+
+    assert statuses == [transport.request("GET", url, cert=certificate).status_code] * 4
+    assert client.is_closed
+    assert not transport._certificate_leases
+    transport.close()
+
+
+def test_replaced_async_certificate_client_drains_requests_in_flight(certificate, https_server):
+    import asyncio
+
+    from pypas.transport import AsyncTransport
+
+    async def run():
+        transport = AsyncTransport(https_server.url, verify=False)
+        url = f"{https_server.url}PasswordVault/API/Safes"
+        client = await transport.certificate_client(*certificate)
+        tasks = [asyncio.ensure_future(transport.request("GET", url, cert=certificate)) for _ in range(4)]
+        await asyncio.sleep(0.1)
+        rotate(certificate[0])
+
+        assert await transport.certificate_client(*certificate) is not client
+        assert not client.is_closed
+        statuses = [response.status_code for response in await asyncio.gather(*tasks)]
+        assert statuses == [(await transport.request("GET", url, cert=certificate)).status_code] * 4
+        assert client.is_closed
+        await transport.close()
+
+    asyncio.run(run())
+
+
+def test_close_closes_replaced_certificate_clients(certificate):
+    from pypas.transport import Transport
+
+    transport = Transport("https://ccp.example.com/")
+    client = transport.certificate_client(*certificate)
+    transport._lease(client)
+    rotate(certificate[0])
+    transport.certificate_client(*certificate)
+
+    assert not client.is_closed
+    transport.close()
+    assert client.is_closed
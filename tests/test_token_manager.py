@@ -0,0 +1,91 @@
+import threading
+import time
+
+import httpx
+
+VAULT_BASE_URL = "https://pvwa.example.com/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_vault(handler, clock=None):
+    from pypas.token_manager import TokenManager
+    from pypas.vault import Vault
+
+    token_manager = TokenManager(session_timeout=600, refresh_before=60, clock=clock or time.monotonic)
+    session = httpx.Client(transport=httpx.MockTransport(handler))
+    return Vault(VAULT_BASE_URL, session=session, token_manager=token_manager)
+
+
+def test_logon_token_is_sent_and_refreshed_before_timeout():
+    clock = FakeClock()
+    tokens = iter(["token1", "token2"])
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/Logon/"):
+            assert request.url.path == "/PasswordVault/api/auth/CyberArk/Logon/"
+            assert "Authorization" not in request.headers
+            return httpx.Response(200, json=next(tokens))
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={})
+
+    vault = make_vault(handler, clock)
+    vault.Authentication.logon("user", "password")
+
+    vault.get_request(f"{VAULT_BASE_URL}PasswordVault/API/Safes")
+    clock.now = 541
+    vault.get_request(f"{VAULT_BASE_URL}PasswordVault/API/Safes")
+
+    assert seen == ["token1", "token2"]
+
+
+def test_unauthorized_request_logs_on_again_once():
+    tokens = iter(["expired", "valid"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/Logon/"):
+            return httpx.Response(200, json=next(tokens))
+        if request.headers["Authorization"] != "valid":
+            return httpx.Response(401)
+        return httpx.Response(200, json={})
+
+    vault = make_vault(handler)
+    vault.Authentication.logon("user", "password")
+
+    assert vault.get_request(f"{VAULT_BASE_URL}PasswordVault/API/Safes").status_code == 200
+    assert vault.token_manager.logon_count == 1
+
+
+def test_concurrent_expired_token_causes_single_logon():
+    clock = FakeClock()
+    logons = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/Logon/"):
+            logons.append(request)
+            time.sleep(0.05)
+            return httpx.Response(200, json=f"token{len(logons)}")
+        return httpx.Response(200, json={})
+
+    vault = make_vault(handler, clock)
+    vault.Authentication.logon("user", "password")
+    clock.now = 1000
+
+    threads = [
+        threading.Thread(target=vault.get_request, args=(f"{VAULT_BASE_URL}PasswordVault/API/Safes",))
+        for _ in range(50)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(logons) == 2
+    assert vault.token_manager.token() == "token2"
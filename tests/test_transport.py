@@ -0,0 +1,124 @@
+import httpx
+
+CCP_BASE_URL = "https://ccp.example.com/"
+VAULT_BASE_URL = "https://pvwa.example.com/"
+
+
+def ccp_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"Content": "secret", "UserName": "user", "PasswordChangeInProcess": "False"})
+
+
+def test_pool_config_limits():
+    from pypas.transport import PoolConfig
+
+    pool = PoolConfig(max_connections=50, max_keepalive_connections=10, host_limits={"pvwa.example.com": 4})
+
+    assert pool.limits().max_connections == 50
+    assert pool.limits().max_keepalive_connections == 10
+    assert pool.limits(4).max_connections == 4
+    assert pool.limits(4).max_keepalive_connections == 4
+
+
+def test_transport_reuses_client():
+    from pypas.transport import PoolConfig, Transport
+
+    transport = Transport(VAULT_BASE_URL, pool=PoolConfig(host_limits={"pvwa.example.com": 4}))
+
+    assert transport.client is transport.client
+    transport.close()
+    assert transport._client is None
+
+
+def test_ccp_keeps_session_open_between_calls():
+    from pypas.central_credential_provider import CentralCredentialProvider
+
+    session = httpx.Client(transport=httpx.MockTransport(ccp_handler))
+    ccp = CentralCredentialProvider(CCP_BASE_URL, session=session)
+
+    ccp.credentials.get_credential("app", "safe", object="account")
+    ccp.credentials.get_credential("app", "safe", object="account")
+
+    assert ccp.get_session() is session
+    assert not session.is_closed
+    ccp.close()
+    assert session.is_closed
+
+
+def test_logon_uses_vault_transport():
+    from pypas.vault import Vault
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json="token")
+
+    vault = Vault(VAULT_BASE_URL, session=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    assert vault.Authentication.logon("user", "password") == "token"
+    assert requests[0].method == "POST"
+
+
+def test_threads_share_one_pool_of_connections():
+    import threading
+
+    from pypas.central_credential_provider import CentralCredentialProvider
+    from pypas.testing import MockServer, MockServerConfig
+    from pypas.transport import PoolConfig
+
+    sessions = set()
+
+    with MockServer(MockServerConfig(latency=0.005)) as server, CentralCredentialProvider(
+        server.url, pool=PoolConfig(max_connections=4)
+    ) as ccp:
+
+        def lookup(number: int):
+            sessions.add(id(ccp.get_session()))
+            return ccp.credentials.get_credential("app", "safe", object=str(number)).Content
+
+        threads = [threading.Thread(target=lookup, args=(number,)) for number in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        contents = ccp.map(lookup, range(64), max_workers=16)
+
+    assert contents == [f"secret-{number}" for number in range(64)]
+    assert len(sessions) == 1
+    assert server.requests["Credentials.get_credential"] == 80
+    assert server.connections <= 4
+
+
+def test_vault_map_reraises_and_safes_get_many_keeps_order(mock_server):
+    import httpx
+    import pytest
+
+    from pypas.vault import Vault
+
+    with Vault(mock_server.url) as vault:
+        safes = vault.Safes.get_many([f"safe{number}" for number in range(20)], max_workers=5)
+        with pytest.raises(httpx.HTTPStatusError):
+            vault.map(vault.Safes.get, ["safe1", "missing"])
+
+    assert [safe.safeNumber for safe in safes] == list(range(20))
+
+
+def test_vault_imap_streams_in_order_with_bounded_lookahead():
+    import itertools
+
+    from pypas.vault import Vault
+
+    consumed = []
+
+    def items():
+        for number in itertools.count():
+            consumed.append(number)
+            yield number
+
+    with Vault(VAULT_BASE_URL) as vault:
+        results = vault.imap(lambda number: number * 2, items(), max_workers=4)
+        first = list(itertools.islice(results, 10))
+        results.close()
+
+    assert first == [number * 2 for number in range(10)]
+    assert len(consumed) <= 10 + 2 * 4